@@ -0,0 +1,27 @@
+"""Near-duplicate angle briefs, found with ``app.utils.near_duplicates``.
+
+The evaluator asks for one regeneration when briefs repeat each other, and the
+batch drops any duplicates that remain before generating a master per angle.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.utils.near_duplicates import find_near_duplicates
+
+ANGLE_FIELDS = ("angle_name", "pain_point_focus", "key_message_variation", "brief")
+
+
+def angle_text(angle: Dict[str, Any]) -> str:
+    return "\n".join(str(angle.get(field) or "") for field in ANGLE_FIELDS)
+
+
+def near_duplicate_angles(angles: List[Any], threshold: Optional[float] = None) -> List[Tuple[int, int, float]]:
+    """``(later_index, earlier_index, similarity)`` for each near-duplicate pair of briefs."""
+    return find_near_duplicates(((i, angle_text(a)) for i, a in enumerate(angles) if isinstance(a, dict)), threshold)
+
+
+def drop_near_duplicate_angles(angles: List[Any]) -> Tuple[List[Any], List[Tuple[int, int, float]]]:
+    """The angles without the later brief of each near-duplicate pair, and the pairs."""
+    duplicates = near_duplicate_angles(angles)
+    dropped = {later for later, _, _ in duplicates}
+    return [a for i, a in enumerate(angles) if i not in dropped], duplicates
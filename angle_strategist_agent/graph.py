@@ -39,4 +39,4 @@ workflow.add_conditional_edges(
 )
 
 memory = MemorySaver()
-angle_strategist_graph = workflow.compile(checkpointer=memory)
+angle_strategist_graph = workflow.compile(checkpointer=memory, name="angle_strategist")
@@ -4,17 +4,22 @@ from typing import Dict, Any
 
 from langchain_core.messages import HumanMessage, SystemMessage
 
-from app.core.llm_factory import get_ollama_llm
+from app.core.llm_factory import lazy_ollama_llm
 from app.tools.mcp_bridge import execute_mcp_tool, parse_mcp_result
 from app.services.context_fetcher import fetch_campaign_context
 from app.utils.llm import parse_json_response
+from app.utils.projection import project_context
+from app.utils.prompt_budget import render_within_budget
 from app.prompts import ANGLE_STRATEGIST_PROMPT
 
+from .dedupe import near_duplicate_angles
 from .state import AngleStrategistState
 
 logger = logging.getLogger(__name__)
 
-llm = get_ollama_llm(temperature=0.4)
+llm = lazy_ollama_llm(temperature=0.4)
+
+DUPLICATE_FEEDBACK = "RETRY: Near-duplicate angle briefs:"
 
 async def retriever_node(state: AngleStrategistState) -> Dict[str, Any]:
     print("--- [R] Angle Strategist Retriever Node ---")
@@ -25,7 +30,7 @@ async def retriever_node(state: AngleStrategistState) -> Dict[str, Any]:
     if errors:
         context["_errors"] = errors
 
-    return {"context_data": context}
+    return {"context_data": project_context(context, "ANGLE_STRATEGIST_PROMPT")}
 
 
 async def generator_node(state: AngleStrategistState) -> Dict[str, Any]:
@@ -53,7 +58,7 @@ async def generator_node(state: AngleStrategistState) -> Dict[str, Any]:
     kpi_targets = campaign.get("kpi_targets", {})
     strategy = kpi_targets.get("strategy", {}) if isinstance(kpi_targets, dict) else {}
 
-    prompt_text = ANGLE_STRATEGIST_PROMPT.format(
+    values = dict(
         campaign_name=campaign.get("name", "Unknown Campaign"),
         campaign_goal=strategy.get("goal", campaign.get("goal", "")),
         brand_name=brand.get("brand_name", brand.get("brandName", "Brand")),
@@ -71,12 +76,16 @@ async def generator_node(state: AngleStrategistState) -> Dict[str, Any]:
         funnel_stage=state.get("funnel_stage", "Awareness"),
     )
 
+    suffix = ""
     if feedback and "RETRY" in feedback.upper():
-        prompt_text += f"\n\nPrevious feedback (please address this): {feedback}"
+        suffix = f"\n\nPrevious feedback (please address this): {feedback}"
+
+    instruction = "Generate the angle briefs now."
+    prompt_text = render_within_budget("ANGLE_STRATEGIST_PROMPT", ANGLE_STRATEGIST_PROMPT, values, suffix, [instruction])
 
     response = await llm.ainvoke([
         SystemMessage(content=prompt_text),
-        HumanMessage(content="Generate the angle briefs now."),
+        HumanMessage(content=instruction),
     ])
 
     try:
@@ -121,6 +130,16 @@ async def evaluator_node(state: AngleStrategistState) -> Dict[str, Any]:
             "feedback": f"RETRY: Please generate {num_angles} distinct angle briefs.",
         }
 
+    # One regeneration for repeated briefs; the batch drops any that remain.
+    duplicates = near_duplicate_angles(generated_angles)
+    if duplicates and not state.get("feedback", "").startswith(DUPLICATE_FEEDBACK):
+        later, earlier, similarity = duplicates[0]
+        return {
+            "next_node": "Generator",
+            "feedback": f"{DUPLICATE_FEEDBACK} brief #{later + 1} repeats brief #{earlier + 1} "
+                        f"({similarity:.0%} similar). Make every brief distinct.",
+        }
+
     return {
         "next_node": "FINISH",
         "feedback": "APPROVED: Angle briefs generated.",
@@ -0,0 +1,25 @@
+"""Guard for admin-only endpoints.
+
+Admin endpoints exist only when ``ADMIN_TOKEN`` is set; without it they
+answer 404 as if they were not there. Callers send the token as
+``Authorization: Bearer <token>`` or ``X-Admin-Token: <token>``.
+"""
+
+import hmac
+import os
+
+from fastapi import HTTPException, Request
+
+
+def require_admin(request: Request) -> None:
+    """FastAPI dependency: reject requests without the configured ADMIN_TOKEN."""
+    expected = os.getenv("ADMIN_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    supplied = request.headers.get("x-admin-token", "")
+    authorization = request.headers.get("authorization", "")
+    if not supplied and authorization.lower().startswith("bearer "):
+        supplied = authorization[7:].strip()
+    if not supplied or not hmac.compare_digest(supplied.encode(), expected.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
@@ -0,0 +1,93 @@
+"""Deferred construction of graphs and LLM clients.
+
+Importing a compiled graph pulls in LangGraph, every node module and the
+Ollama client, which dominated worker (and test suite) start-up. Module-level
+graphs and LLMs are instead bound to a ``LazyObject`` that builds the real
+object on first attribute access and forwards everything to it afterwards.
+
+Attribute writes and deletes are forwarded too, so
+``patch("app.services.batch_generator.master_content_graph.ainvoke")`` still
+patches the real graph, and replacing the module attribute itself
+(``patch("marketing_team.nodes.llm")``) works as before.
+
+``warm_up()`` builds everything up front; it is the ``graphs`` step of the
+start-up warm-up in ``app/core/warmup.py``.
+"""
+
+import importlib
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+_UNSET = object()
+_instances: List["LazyObject"] = []
+
+
+class LazyObject:
+    """Proxy that calls ``factory`` once, on first use, and delegates to the result."""
+
+    __slots__ = ("_factory", "_name", "_target", "_lock")
+
+    def __init__(self, factory: Callable[[], Any], name: str):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_target", _UNSET)
+        object.__setattr__(self, "_lock", threading.RLock())
+        _instances.append(self)
+
+    def _resolve(self) -> Any:
+        if self._target is _UNSET:
+            with self._lock:
+                if self._target is _UNSET:
+                    started = time.perf_counter()
+                    object.__setattr__(self, "_target", self._factory())
+                    logger.info(f"Built {self._name} in {time.perf_counter() - started:.2f}s")
+        return self._target
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._resolve(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._resolve(), name, value)
+
+    def __delattr__(self, name: str) -> None:
+        delattr(self._resolve(), name)
+
+    def __repr__(self) -> str:
+        if self._target is _UNSET:
+            return f"<LazyObject {self._name} (not built)>"
+        return f"<LazyObject {self._name}: {self._target!r}>"
+
+
+def resolve(obj: Any) -> Any:
+    """The real object behind a LazyObject (building it if needed); other objects unchanged."""
+    return obj._resolve() if isinstance(obj, LazyObject) else obj
+
+
+def is_built(obj: LazyObject) -> bool:
+    return obj._target is not _UNSET
+
+
+def lazy_import(module: str, attribute: str) -> LazyObject:
+    """``from module import attribute``, deferred until first use."""
+    return LazyObject(lambda: getattr(importlib.import_module(module), attribute), f"{module}.{attribute}")
+
+
+def warm_up() -> Dict[str, float]:
+    """Build every LazyObject created so far, including ones created while building others.
+
+    Returns build seconds by name.
+    """
+    timings: Dict[str, float] = {}
+    pending = [obj for obj in _instances if not is_built(obj)]
+    while pending:
+        for obj in pending:
+            started = time.perf_counter()
+            obj._resolve()
+            timings[obj._name] = round(time.perf_counter() - started, 3)
+        pending = [obj for obj in _instances if not is_built(obj)]
+    logger.info(f"Warm-up built {len(timings)} graphs/clients in {sum(timings.values()):.2f}s")
+    return timings
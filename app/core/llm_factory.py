@@ -13,4 +13,18 @@ def get_ollama_llm(temperature: float = 0, model: str = "qwen3:4b-instruct-2507-
 
     ollama_base_url = os.getenv("OLLAMA_BASE_URL", "http://192.168.1.6:11434")
     env_model = os.getenv("OLLAMA_MODEL", model)
-    return ChatOllama(model=env_model, temperature=temperature, base_url=ollama_base_url)
+    # Context window; unset keeps the server's default. Prompt budgets derive from it.
+    num_ctx = os.getenv("OLLAMA_NUM_CTX")
+    return ChatOllama(model=env_model, temperature=temperature, base_url=ollama_base_url,
+                      num_ctx=int(num_ctx) if num_ctx else None)
+
+
+def lazy_ollama_llm(temperature: float = 0, model: str = "qwen3:4b-instruct-2507-q4_K_M"):
+    """``get_ollama_llm`` deferred until first use, for module-level clients.
+
+    The client (and langchain_ollama) is only loaded when a node first calls
+    it, and reads OLLAMA_BASE_URL / OLLAMA_MODEL at that point.
+    """
+    from app.core.lazy import LazyObject
+
+    return LazyObject(lambda: get_ollama_llm(temperature, model), f"ChatOllama(temperature={temperature})")
@@ -0,0 +1,160 @@
+"""Event-loop lag monitor and blocking-call detector.
+
+A heartbeat task on the event loop sleeps ``LOOP_MONITOR_INTERVAL`` seconds
+and records how late it wakes up (``event_loop_lag_seconds``). A watchdog
+thread checks the heartbeat's deadline; when the loop is overdue by more than
+``LOOP_BLOCK_THRESHOLD`` seconds it captures the loop thread's stack with
+``sys._current_frames()`` while the blocking callback is still running, so
+the stack points at the sync call (``llm.invoke``, a large ``json.dumps``, ...).
+
+Recent lag samples and blocked calls are served at ``/debug/loop-lag``.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+LOOP_LAG_SECONDS = registry.histogram("event_loop_lag_seconds", "Event-loop scheduling delay of the heartbeat.",
+                                      LAG_BUCKETS)
+LOOP_BLOCKED = registry.counter("event_loop_blocked_total", "Times the event loop was blocked past the threshold.")
+LOOP_BLOCKED_SECONDS = registry.histogram("event_loop_blocked_duration_seconds",
+                                          "Duration of each event-loop block past the threshold.", LAG_BUCKETS)
+
+
+def _percentile(ordered: List[float], q: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return ordered[min(int(len(ordered) * q / 100), len(ordered) - 1)]
+
+
+class LoopMonitor:
+    """Heartbeat on the loop plus a watchdog thread that snapshots blocked stacks."""
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.25, keep_samples: int = 3000,
+                 keep_blocks: int = 50):
+        self.interval = interval
+        self.threshold = threshold
+        self.samples: Deque[float] = deque(maxlen=keep_samples)
+        self.blocks: Deque[Dict[str, Any]] = deque(maxlen=keep_blocks)
+        self._deadline: Optional[float] = None
+        self._stall: Optional[Dict[str, Any]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+        self._loop_thread_id: Optional[int] = None
+
+    def start(self) -> "LoopMonitor":
+        """Start on the running loop; call from a coroutine."""
+        self._loop_thread_id = threading.get_ident()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat(), name="loop-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor-watchdog", daemon=True)
+        self._watchdog.start()
+        return self
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+
+    async def _heartbeat(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            self._deadline = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(loop.time() - expected, 0.0)
+            self.samples.append(lag)
+            LOOP_LAG_SECONDS.observe(lag)
+
+    def _watch(self) -> None:
+        poll = min(self.interval, self.threshold) / 2
+        while not self._stopped.wait(poll):
+            deadline = self._deadline
+            if deadline is None:
+                continue
+            overdue = time.monotonic() - deadline
+            if overdue > self.threshold:
+                if self._stall is None:
+                    self._stall = self._capture(overdue)
+                else:
+                    self._stall["durationSeconds"] = round(overdue, 4)
+            elif self._stall is not None:
+                self._finish_stall()
+
+    def _capture(self, overdue: float) -> Dict[str, Any]:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_stack(frame) if frame is not None else []
+        LOOP_BLOCKED.inc()
+        logger.warning(f"Event loop blocked for over {self.threshold}s, in:\n{''.join(stack[-8:])}")
+        return {"startedAt": time.time() - overdue, "durationSeconds": round(overdue, 4),
+                "stack": [line.rstrip() for line in stack]}
+
+    def _finish_stall(self) -> None:
+        stall, self._stall = self._stall, None
+        LOOP_BLOCKED_SECONDS.observe(stall["durationSeconds"])
+        self.blocks.append(stall)
+
+    def snapshot(self) -> Dict[str, Any]:
+        ordered = sorted(self.samples)
+        lag = {f"p{q}": _percentile(ordered, q) for q in (50, 95, 99)}
+        lag["max"] = ordered[-1] if ordered else None
+        blocks = list(self.blocks) + ([dict(self._stall, ongoing=True)] if self._stall else [])
+        return {
+            "enabled": True,
+            "intervalSeconds": self.interval,
+            "thresholdSeconds": self.threshold,
+            "samples": len(ordered),
+            "lagSeconds": {k: round(v, 4) if v is not None else None for k, v in lag.items()},
+            "blocked": blocks[::-1],
+        }
+
+
+_monitor: Optional[LoopMonitor] = None
+
+
+def loop_monitor_enabled() -> bool:
+    return os.getenv("LOOP_MONITOR_ENABLED", "1").lower() not in ("0", "false", "no")
+
+
+def start_loop_monitor() -> Optional[LoopMonitor]:
+    """Start the process-wide monitor on the running loop (no-op when disabled or running)."""
+    global _monitor
+    if _monitor is not None or not loop_monitor_enabled():
+        return _monitor
+    _monitor = LoopMonitor(
+        interval=float(os.getenv("LOOP_MONITOR_INTERVAL", "0.1")),
+        threshold=float(os.getenv("LOOP_BLOCK_THRESHOLD", "0.25")),
+    ).start()
+    logger.info(f"Event loop monitor started (threshold {_monitor.threshold}s)")
+    return _monitor
+
+
+async def stop_loop_monitor() -> None:
+    global _monitor
+    monitor, _monitor = _monitor, None
+    if monitor is not None:
+        await monitor.stop()
+
+
+def loop_lag_snapshot() -> Dict[str, Any]:
+    if _monitor is None:
+        return {"enabled": False}
+    return _monitor.snapshot()
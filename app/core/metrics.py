@@ -0,0 +1,312 @@
+"""In-process metrics, rendered in Prometheus text format at ``/metrics``.
+
+A deliberately small registry (counters, gauges, histograms with labels) so
+the service does not need prometheus_client. What is recorded:
+
+- LangGraph graph and node durations, via a LangChain callback handler that
+  ``install_callback_metrics`` attaches to every run in the process
+- LLM requests, latency, prompt/completion tokens and tokens/sec per model and node
+- MCP calls and latency by tool and collection (``observe_mcp_call``)
+- SSE streams, events and bytes written (``app/utils/sse_writer.py``)
+
+Metrics are per process: batch worker processes keep their own.
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+RATE_BUCKETS = (1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 250)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._lock = threading.Lock()
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        super().__init__(name, help)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = DURATION_BUCKETS):
+        super().__init__(name, help)
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [bucket counts..., sum, count]
+        self._values: Dict[LabelKey, List[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[i] += 1
+            entry[-2] += value
+            entry[-1] += 1
+
+    def count(self, **labels) -> float:
+        entry = self._values.get(_label_key(labels))
+        return entry[-1] if entry else 0.0
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = [(key, list(entry)) for key, entry in self._values.items()]
+        lines = []
+        for key, entry in items:
+            for bound, count in zip(self.buckets, entry):
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', _format_value(bound))])} {_format_value(count)}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, [('le', '+Inf')])} {_format_value(entry[-1])}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(entry[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {_format_value(entry[-1])}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self.register(Counter(name, help))
+
+    def gauge(self, name: str, help: str) -> Gauge:
+        return self.register(Gauge(name, help))
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = DURATION_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, buckets))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+registry = Registry()
+
+GRAPH_RUN_SECONDS = registry.histogram("graph_run_duration_seconds", "LangGraph graph run duration.")
+NODE_SECONDS = registry.histogram("graph_node_duration_seconds", "LangGraph node duration by graph and node.")
+LLM_REQUESTS = registry.counter("llm_requests_total", "LLM requests by model, node and status.")
+LLM_SECONDS = registry.histogram("llm_request_duration_seconds", "LLM request duration by model and node.")
+LLM_PROMPT_TOKENS = registry.counter("llm_prompt_tokens_total", "Prompt tokens reported by the model.")
+LLM_COMPLETION_TOKENS = registry.counter("llm_completion_tokens_total", "Completion tokens reported by the model.")
+LLM_TOKENS_PER_SECOND = registry.histogram(
+    "llm_completion_tokens_per_second", "Completion tokens per second of each LLM request.", RATE_BUCKETS
+)
+MCP_CALLS = registry.counter("mcp_calls_total", "MCP tool calls by tool, collection and status.")
+MCP_SECONDS = registry.histogram("mcp_call_duration_seconds", "MCP tool call duration by tool.")
+SSE_STREAMS = registry.counter("sse_streams_total", "SSE responses finished.")
+SSE_EVENTS = registry.counter("sse_events_sent_total", "SSE events written to clients.")
+SSE_BYTES = registry.counter("sse_bytes_sent_total", "SSE bytes written to clients.")
+
+
+def observe_mcp_call(tool: str, collection: str, status: str, seconds: float) -> None:
+    MCP_CALLS.inc(tool=tool, collection=collection, status=status)
+    MCP_SECONDS.observe(seconds, tool=tool)
+
+
+def _usage_from_result(response: Any) -> Dict[str, int]:
+    """Prompt/completion tokens from an LLMResult, wherever the provider put them."""
+    try:
+        message = response.generations[0][0].message
+        usage = getattr(message, "usage_metadata", None) or {}
+        if usage:
+            return {"prompt": usage.get("input_tokens", 0), "completion": usage.get("output_tokens", 0)}
+    except (AttributeError, IndexError, TypeError):
+        pass
+    token_usage = (getattr(response, "llm_output", None) or {}).get("token_usage") or {}
+    return {"prompt": token_usage.get("prompt_tokens", 0), "completion": token_usage.get("completion_tokens", 0)}
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Times graph runs, graph nodes and LLM calls from LangChain callbacks."""
+
+    run_inline = True
+    raise_error = False
+
+    def __init__(self):
+        # run_id -> (labels, started) of active LLM runs
+        self._runs: Dict[UUID, Tuple[Dict[str, str], float]] = {}
+        # run_id -> (name, parent_run_id, started) of every active chain run
+        self._chains: Dict[UUID, Tuple[str, Optional[UUID], float]] = {}
+        # run_id of chain runs known to be graphs -> graph name
+        self._graphs: Dict[UUID, str] = {}
+        # run_id of node runs -> their labels
+        self._nodes: Dict[UUID, Dict[str, str]] = {}
+
+    def _graph_of(self, run_id: Optional[UUID]) -> str:
+        """Name of the nearest enclosing graph run, walking up the parent chain."""
+        while run_id is not None:
+            if run_id in self._graphs:
+                return self._graphs[run_id]
+            chain = self._chains.get(run_id)
+            run_id = chain[1] if chain else None
+        return "unknown"
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, tags=None, metadata=None, **kwargs):
+        name = kwargs.get("name") or (serialized or {}).get("name", "")
+        self._chains[run_id] = (name, parent_run_id, time.perf_counter())
+        node = (metadata or {}).get("langgraph_node")
+        if node and node == name:
+            # A node's parent run is the graph executing it, root or nested
+            # (a compiled graph called from another graph's node, or added as one).
+            if parent_run_id in self._chains:
+                self._graphs.setdefault(parent_run_id, self._chains[parent_run_id][0])
+            self._nodes[run_id] = {"graph": self._graph_of(parent_run_id), "node": node}
+
+    def _finish_chain(self, run_id, status: str) -> None:
+        chain = self._chains.pop(run_id, None)
+        graph = self._graphs.pop(run_id, None)
+        labels = self._nodes.pop(run_id, None)
+        if chain is None:
+            return
+        elapsed = time.perf_counter() - chain[2]
+        if graph is not None:
+            GRAPH_RUN_SECONDS.observe(elapsed, status=status, graph=graph)
+        if labels is not None:
+            NODE_SECONDS.observe(elapsed, status=status, **labels)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._finish_chain(run_id, "ok")
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        status = "cancelled" if type(error).__name__ == "CancelledError" else "error"
+        self._finish_chain(run_id, status)
+
+    def _start_llm(self, run_id, metadata, kwargs) -> None:
+        metadata = metadata or {}
+        model = metadata.get("ls_model_name") or (kwargs.get("invocation_params") or {}).get("model") or "unknown"
+        labels = {"model": model, "node": metadata.get("langgraph_node", "none")}
+        self._runs[run_id] = (labels, time.perf_counter())
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        self._start_llm(run_id, metadata, kwargs)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, metadata=None, **kwargs):
+        self._start_llm(run_id, metadata, kwargs)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        entry = self._runs.pop(run_id, None)
+        if entry is None:
+            return
+        labels, started = entry
+        elapsed = time.perf_counter() - started
+        usage = _usage_from_result(response)
+        LLM_REQUESTS.inc(status="ok", **labels)
+        LLM_SECONDS.observe(elapsed, **labels)
+        LLM_PROMPT_TOKENS.inc(usage["prompt"], **labels)
+        LLM_COMPLETION_TOKENS.inc(usage["completion"], **labels)
+        if usage["completion"] and elapsed > 0:
+            LLM_TOKENS_PER_SECOND.observe(usage["completion"] / elapsed, model=labels["model"])
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        entry = self._runs.pop(run_id, None)
+        if entry is not None:
+            labels, started = entry
+            LLM_REQUESTS.inc(status="error", **labels)
+            LLM_SECONDS.observe(time.perf_counter() - started, **labels)
+
+
+_handler: Optional[MetricsCallbackHandler] = None
+
+
+def metrics_enabled() -> bool:
+    return os.getenv("METRICS_ENABLED", "1").lower() not in ("0", "false", "no")
+
+
+def install_callback_metrics() -> Optional[MetricsCallbackHandler]:
+    """Attach one MetricsCallbackHandler to every LangChain run in this process.
+
+    Uses LangChain's configure hook, so graphs and LLMs need no per-call
+    ``callbacks=`` wiring. Idempotent; a no-op when METRICS_ENABLED is off.
+    """
+    global _handler
+    if _handler is not None or not metrics_enabled():
+        return _handler
+    from langchain_core.tracers.context import register_configure_hook
+
+    _handler = MetricsCallbackHandler()
+    # A default value makes the hook apply in every context, not just ones that set it.
+    register_configure_hook(ContextVar("metrics_handler", default=_handler), inheritable=True)
+    logger.info("LangChain metrics callback installed")
+    return _handler
+
+
+def render_metrics() -> str:
+    return registry.render()
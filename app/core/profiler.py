@@ -0,0 +1,167 @@
+"""On-demand sampling profiler for a live worker, served at ``/admin/profile``.
+
+While a capture runs, a daemon thread reads every thread's stack with
+``sys._current_frames()`` each ``interval`` and counts identical stacks. The
+result is in collapsed-stack format (``thread;outer;...;inner count`` per
+line), which flamegraph.pl, speedscope and inferno read directly. Nothing is
+installed or traced outside a capture.
+
+- ``wall`` mode counts every thread on every sample, idle ones included
+  (the event loop shows up waiting in ``select``).
+- ``cpu`` mode only counts threads the kernel reports as running
+  (``/proc/self/task/<tid>/stat`` state ``R``), so it needs Linux. A thread
+  waiting for the GIL can still be runnable, so this is an approximation.
+
+With ``memory=True`` a tracemalloc snapshot is taken at both ends and the
+top allocation growth by line is returned alongside.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+MODES = ("wall", "cpu")
+
+
+class ProfilerBusy(RuntimeError):
+    """Another capture is already running in this process."""
+
+
+def cpu_mode_supported() -> bool:
+    return os.path.isdir("/proc/self/task")
+
+
+def _running_native_ids() -> Set[int]:
+    running = set()
+    for tid in os.listdir("/proc/self/task"):
+        try:
+            with open(f"/proc/self/task/{tid}/stat") as f:
+                # The state follows the parenthesised command name, which may contain spaces.
+                state = f.read().rpartition(")")[2].split()[0]
+        except (OSError, IndexError):
+            continue
+        if state == "R":
+            running.add(int(tid))
+    return running
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+
+def collapse(frame, thread_name: str) -> str:
+    """One collapsed stack line (root first) for ``frame``, without the count."""
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    names.append(thread_name.replace(";", ":").replace(" ", "_"))
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    """Counts collapsed stacks of all threads, sampled from a background thread."""
+
+    def __init__(self, interval: float = 0.005, mode: str = "wall"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profile mode {mode!r}; expected one of {', '.join(MODES)}")
+        if mode == "cpu" and not cpu_mode_supported():
+            raise ValueError("cpu mode needs /proc (Linux)")
+        self.interval = interval
+        self.mode = mode
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def start(self) -> "SamplingProfiler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            self.sample(skip=me)
+
+    def sample(self, skip: Optional[int] = None) -> None:
+        threads = {t.ident: t for t in threading.enumerate()}
+        running = _running_native_ids() if self.mode == "cpu" else None
+        for ident, frame in sys._current_frames().items():
+            if ident == skip:
+                continue
+            thread = threads.get(ident)
+            if running is not None and (thread is None or thread.native_id not in running):
+                continue
+            self.counts[collapse(frame, thread.name if thread else f"thread-{ident}")] += 1
+        self.samples += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+
+def memory_diff(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, limit: int = 25) -> List[Dict[str, Any]]:
+    stats = after.compare_to(before, "lineno")[:limit]
+    return [
+        {
+            "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            "sizeDiffKb": round(stat.size_diff / 1024, 1),
+            "countDiff": stat.count_diff,
+            "sizeKb": round(stat.size / 1024, 1),
+        }
+        for stat in stats
+    ]
+
+
+_active = threading.Lock()
+
+
+async def capture_profile(seconds: float, mode: str = "wall", interval: float = 0.005,
+                          memory: bool = False) -> Dict[str, Any]:
+    """Sample this process for ``seconds`` while the event loop keeps serving requests."""
+    if not _active.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already being captured")
+    started_tracemalloc = False
+    try:
+        profiler = SamplingProfiler(interval, mode)
+        before = None
+        if memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracemalloc = True
+            # Snapshots and their diff walk every traced block; keep them off the event loop.
+            before = await asyncio.to_thread(tracemalloc.take_snapshot)
+        logger.info(f"Capturing a {seconds}s {mode} profile (memory={memory})")
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            await asyncio.to_thread(profiler.stop)
+        result: Dict[str, Any] = {
+            "mode": mode,
+            "seconds": round(time.perf_counter() - started, 3),
+            "intervalSeconds": interval,
+            "samples": profiler.samples,
+            "collapsed": profiler.collapsed(),
+        }
+        if before is not None:
+            after = await asyncio.to_thread(tracemalloc.take_snapshot)
+            result["memory"] = await asyncio.to_thread(memory_diff, before, after)
+        return result
+    finally:
+        if started_tracemalloc:
+            tracemalloc.stop()
+        _active.release()
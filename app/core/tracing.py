@@ -0,0 +1,415 @@
+"""Request-scoped trace spans: API stream -> LangGraph node -> LLM / tool -> MCP.
+
+Every streamed request gets a root span (opened by the SSE run driver), and
+the ``done`` event carries its ``traceId`` so a slow response can be looked
+up afterwards. Graph nodes, LLM calls (with token counts) and tool calls
+become child spans through a LangChain callback handler; ``execute_mcp_tool``
+opens its own span under whichever run is current.
+
+Finished spans are exported off the event loop by a background thread.
+Exporting is opt-in; by default spans only provide the ``traceId``:
+
+    TRACING_ENABLED      1 (default) / 0
+    TRACE_EXPORTER       none (default), jsonl or otlp
+    TRACE_JSONL_PATH     default: <tempdir>/tmcp_traces.jsonl (one span per line)
+    TRACE_JSONL_MAX_BYTES  rotate to ``<path>.1`` past this size, default 50 MB
+    TRACE_OTLP_ENDPOINT  OTLP/HTTP JSON endpoint, default http://localhost:4318/v1/traces
+"""
+
+import json
+import logging
+import os
+import queue
+import secrets
+import tempfile
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables.config import var_child_runnable_config
+
+from app.utils.sse import SSEEvent, sse_event
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "tmcp-agents"
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "attributes", "status", "start_ns", "end_ns")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None, kind: str = "internal",
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.status = "ok"
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def end(self, status: Optional[str] = None) -> None:
+        if self.end_ns is not None:
+            return
+        if status:
+            self.status = status
+        self.end_ns = time.time_ns()
+        _processor.submit(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        end = self.end_ns or time.time_ns()
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": end,
+            "durationMs": round((end - self.start_ns) / 1e6, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def tracing_enabled() -> bool:
+    return os.getenv("TRACING_ENABLED", "1").lower() not in ("0", "false", "no")
+
+
+# --- Exporters ---
+
+
+class SpanExporter:
+    def export(self, spans: List[Dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+
+class JsonlSpanExporter(SpanExporter):
+    """Appends spans to ``path``; past ``max_bytes`` the file is moved to ``<path>.1`` (one backup kept)."""
+
+    def __init__(self, path: str, max_bytes: int = 50 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+
+    def _rotate(self) -> None:
+        try:
+            if self.max_bytes > 0 and os.path.getsize(self.path) >= self.max_bytes:
+                os.replace(self.path, f"{self.path}.1")
+        except FileNotFoundError:
+            pass
+
+    def export(self, spans: List[Dict[str, Any]]) -> None:
+        self._rotate()
+        with open(self.path, "a", encoding="utf-8") as f:
+            for span in spans:
+                f.write(json.dumps(span, ensure_ascii=False, default=str) + "\n")
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OtlpHttpSpanExporter(SpanExporter):
+    """POSTs spans as OTLP/HTTP JSON to a collector (or any stand-in that accepts it)."""
+
+    KINDS = {"internal": 1, "server": 2, "client": 3}
+
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def _span(self, span: Dict[str, Any]) -> Dict[str, Any]:
+        otlp = {
+            "traceId": span["traceId"],
+            "spanId": span["spanId"],
+            "name": span["name"],
+            "kind": self.KINDS.get(span["kind"], 1),
+            "startTimeUnixNano": str(span["startTimeUnixNano"]),
+            "endTimeUnixNano": str(span["endTimeUnixNano"]),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span["attributes"].items()],
+            "status": {"code": 1 if span["status"] == "ok" else 2, "message": span["status"]},
+        }
+        if span["parentSpanId"]:
+            otlp["parentSpanId"] = span["parentSpanId"]
+        return otlp
+
+    def export(self, spans: List[Dict[str, Any]]) -> None:
+        body = {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+                "scopeSpans": [{"scope": {"name": __name__}, "spans": [self._span(s) for s in spans]}],
+            }]
+        }
+        request = urllib.request.Request(
+            self.endpoint, data=json.dumps(body).encode("utf-8"),
+            headers={"Content-Type": "application/json"}, method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+def create_exporter() -> Optional[SpanExporter]:
+    kind = os.getenv("TRACE_EXPORTER", "none").lower()
+    if kind == "jsonl":
+        return JsonlSpanExporter(
+            os.getenv("TRACE_JSONL_PATH", os.path.join(tempfile.gettempdir(), "tmcp_traces.jsonl")),
+            int(os.getenv("TRACE_JSONL_MAX_BYTES", str(50 * 1024 * 1024))),
+        )
+    if kind == "otlp":
+        return OtlpHttpSpanExporter(os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces"))
+    return None
+
+
+class BatchSpanProcessor:
+    """Queues finished spans and exports them in batches from a daemon thread."""
+
+    def __init__(self, batch_size: int = 256, interval: float = 1.0):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.exporter: Optional[SpanExporter] = None
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def configure(self, exporter: Optional[SpanExporter]) -> None:
+        self.exporter = exporter
+
+    def submit(self, span: Span) -> None:
+        if self.exporter is None:
+            return
+        self._queue.put(span)
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, name="span-exporter", daemon=True)
+                    self._thread.start()
+
+    def _drain(self, first: Optional[Span] = None) -> List[Span]:
+        batch = [first] if first is not None else []
+        while len(batch) < self.batch_size:
+            try:
+                span = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if span is not None:
+                batch.append(span)
+        return batch
+
+    def _export(self, batch: List[Span]) -> None:
+        if not batch or self.exporter is None:
+            return
+        try:
+            self.exporter.export([span.to_dict() for span in batch])
+        except Exception as e:
+            logger.warning(f"Dropped {len(batch)} spans: {e}")
+
+    def _loop(self) -> None:
+        while True:
+            try:
+                first = self._queue.get(timeout=self.interval)
+            except queue.Empty:
+                continue
+            self._export(self._drain(first))
+
+    def flush(self) -> None:
+        """Export everything queued so far (call on shutdown)."""
+        while not self._queue.empty():
+            self._export(self._drain())
+
+
+_processor = BatchSpanProcessor()
+
+
+# --- Span API ---
+
+
+def _parent_span() -> Optional[Span]:
+    """The innermost span: the current LangChain run's span if any, else the context span."""
+    config = var_child_runnable_config.get() or {}
+    callbacks = config.get("callbacks")
+    run_id = getattr(callbacks, "parent_run_id", None)
+    if run_id is not None and _handler is not None:
+        span = _handler.span_for(run_id)
+        if span is not None:
+            return span
+    return current_span.get()
+
+
+def start_span(name: str, kind: str = "internal", parent: Optional[Span] = None, **attributes) -> Optional[Span]:
+    """Open a span under ``parent`` (default: the innermost current span). None if tracing is off."""
+    if not tracing_enabled():
+        return None
+    parent = parent or _parent_span()
+    trace_id = parent.trace_id if parent else secrets.token_hex(16)
+    return Span(name, trace_id, parent.span_id if parent else None, kind, attributes)
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes) -> Iterator[Optional[Span]]:
+    """``with span("name"):`` opens a span, makes it current and ends it (status error on exceptions)."""
+    opened = start_span(name, kind, **attributes)
+    if opened is None:
+        yield None
+        return
+    token = current_span.set(opened)
+    status = None
+    try:
+        yield opened
+    except BaseException as e:
+        status = "cancelled" if type(e).__name__ == "CancelledError" else "error"
+        opened.set(error=repr(e))
+        raise
+    finally:
+        current_span.reset(token)
+        opened.end(status)
+
+
+def current_trace_id() -> Optional[str]:
+    active = current_span.get()
+    return active.trace_id if active else None
+
+
+def stamp_trace_id(event: str) -> str:
+    """Add ``traceId`` to a ``done`` event so the client can correlate it with the trace."""
+    trace_id = current_trace_id()
+    if trace_id and isinstance(event, SSEEvent) and event.event_type == "done" and "traceId" not in event.fields:
+        return sse_event("done", traceId=trace_id, **event.fields)
+    return event
+
+
+# --- LangChain integration ---
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """Turns graph nodes, LLM calls and tool calls into spans."""
+
+    run_inline = True
+    raise_error = False
+
+    def __init__(self):
+        # run_id -> parent run_id for every active run, to find the nearest span
+        self._parents: Dict[UUID, Optional[UUID]] = {}
+        self._spans: Dict[UUID, Span] = {}
+        self._lock = threading.Lock()
+
+    def span_for(self, run_id: Optional[UUID]) -> Optional[Span]:
+        with self._lock:
+            while run_id is not None:
+                span = self._spans.get(run_id)
+                if span is not None:
+                    return span
+                run_id = self._parents.get(run_id)
+        return None
+
+    def _open(self, run_id, parent_run_id, name: Optional[str] = None, **attributes) -> None:
+        with self._lock:
+            self._parents[run_id] = parent_run_id
+        if name is None:
+            return
+        parent = self.span_for(parent_run_id) or current_span.get()
+        opened = start_span(name, parent=parent, **attributes)
+        if opened is not None:
+            with self._lock:
+                self._spans[run_id] = opened
+
+    def _close(self, run_id, status: str = "ok", **attributes) -> None:
+        with self._lock:
+            self._parents.pop(run_id, None)
+            opened = self._spans.pop(run_id, None)
+        if opened is not None:
+            opened.set(**attributes)
+            opened.end(status)
+
+    @staticmethod
+    def _error_status(error: BaseException) -> str:
+        return "cancelled" if type(error).__name__ == "CancelledError" else "error"
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        name = kwargs.get("name") or (serialized or {}).get("name", "")
+        node = (metadata or {}).get("langgraph_node")
+        if parent_run_id is None:
+            self._open(run_id, parent_run_id, f"graph {name}", graph=name)
+        elif node and node == name:
+            self._open(run_id, parent_run_id, f"node {node}", node=node)
+        else:
+            self._open(run_id, parent_run_id)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._close(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._close(run_id, self._error_status(error), error=repr(error))
+
+    def _start_llm(self, run_id, parent_run_id, metadata, kwargs) -> None:
+        metadata = metadata or {}
+        model = metadata.get("ls_model_name") or (kwargs.get("invocation_params") or {}).get("model") or "unknown"
+        self._open(run_id, parent_run_id, f"llm {model}", model=model, node=metadata.get("langgraph_node", ""))
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        self._start_llm(run_id, parent_run_id, metadata, kwargs)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        self._start_llm(run_id, parent_run_id, metadata, kwargs)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        from app.core.metrics import _usage_from_result
+
+        usage = _usage_from_result(response)
+        opened = self._spans.get(run_id)
+        attributes = {"input_tokens": usage["prompt"], "output_tokens": usage["completion"]}
+        if opened is not None and usage["completion"]:
+            seconds = (time.time_ns() - opened.start_ns) / 1e9
+            attributes["tokens_per_second"] = round(usage["completion"] / seconds, 2) if seconds > 0 else 0.0
+        self._close(run_id, **attributes)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._close(run_id, self._error_status(error), error=repr(error))
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        name = kwargs.get("name") or (serialized or {}).get("name", "tool")
+        self._open(run_id, parent_run_id, f"tool {name}", tool=name)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._close(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._close(run_id, self._error_status(error), error=repr(error))
+
+
+_handler: Optional[TracingCallbackHandler] = None
+
+
+def install_tracing() -> Optional[TracingCallbackHandler]:
+    """Configure the exporter and attach span creation to every LangChain run. Idempotent."""
+    global _handler
+    if _handler is not None or not tracing_enabled():
+        return _handler
+    from langchain_core.tracers.context import register_configure_hook
+
+    _processor.configure(create_exporter())
+    _handler = TracingCallbackHandler()
+    register_configure_hook(ContextVar("tracing_handler", default=_handler), inheritable=True)
+    return _handler
+
+
+def flush_spans() -> None:
+    _processor.flush()
@@ -0,0 +1,134 @@
+"""Start-up warm-up and readiness gating (``/ready``).
+
+With ``WARMUP_ON_STARTUP`` set, the lifespan starts a background warm-up and
+``/ready`` answers 503 until every step has succeeded once:
+
+- ``graphs``: build the lazily constructed graphs and LLM clients (``app.core.lazy``)
+- ``ollama <host> <model>``: load each model into memory on each Ollama host
+  (an empty ``/api/chat``, which Ollama treats as a load request), so the first
+  request does not pay model load time
+- ``mcp``: open and initialize an MCP session and list the tools, which checks the
+  server is reachable and loads the mcp client
+
+Failed steps are retried every ``WARMUP_RETRY_SECONDS`` until they pass. The
+app keeps serving while warming; ``/health`` stays a plain liveness check.
+Without ``WARMUP_ON_STARTUP`` the worker reports ready immediately.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from app.core import lazy
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "qwen3:4b-instruct-2507-q4_K_M"
+
+Step = Callable[[], Awaitable[Any]]
+
+
+def warmup_on_startup() -> bool:
+    return os.getenv("WARMUP_ON_STARTUP", "false").lower() in ("1", "true", "yes")
+
+
+def _csv(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def ollama_hosts() -> List[str]:
+    """WARMUP_OLLAMA_HOSTS (comma-separated), defaulting to OLLAMA_BASE_URL."""
+    default = os.getenv("OLLAMA_BASE_URL", "http://192.168.1.6:11434")
+    return [host.rstrip("/") for host in _csv(os.getenv("WARMUP_OLLAMA_HOSTS", default))]
+
+
+def ollama_models() -> List[str]:
+    """WARMUP_OLLAMA_MODELS (comma-separated), defaulting to OLLAMA_MODEL."""
+    return _csv(os.getenv("WARMUP_OLLAMA_MODELS", os.getenv("OLLAMA_MODEL", DEFAULT_MODEL)))
+
+
+async def preload_ollama_model(host: str, model: str) -> None:
+    timeout = float(os.getenv("WARMUP_OLLAMA_TIMEOUT", "300"))
+    body = {"model": model, "messages": [], "stream": False, "keep_alive": os.getenv("OLLAMA_KEEP_ALIVE", "30m")}
+    async with httpx.AsyncClient(timeout=timeout) as client:
+        response = await client.post(f"{host}/api/chat", json=body)
+        response.raise_for_status()
+
+
+async def probe_mcp() -> None:
+    from app.tools.mcp_bridge import open_mcp_session
+
+    async with open_mcp_session() as session:
+        await session.list_tools()
+
+
+def warmup_steps() -> Dict[str, Step]:
+    steps: Dict[str, Step] = {"graphs": lambda: asyncio.to_thread(lazy.warm_up)}
+    for host in ollama_hosts():
+        for model in ollama_models():
+            steps[f"ollama {host} {model}"] = lambda host=host, model=model: preload_ollama_model(host, model)
+    steps["mcp"] = probe_mcp
+    return steps
+
+
+class Warmup:
+    """Runs the warm-up steps in the background and tracks readiness."""
+
+    def __init__(self):
+        self.status = "pending"
+        self.checks: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def start(self, steps: Optional[Dict[str, Step]] = None) -> None:
+        if not warmup_on_startup() and steps is None:
+            self.status = "ready"
+            return
+        self.status = "warming"
+        self._task = asyncio.create_task(self._run(steps or warmup_steps()), name="warmup")
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self, steps: Dict[str, Step]) -> None:
+        retry = float(os.getenv("WARMUP_RETRY_SECONDS", "5"))
+        started = time.perf_counter()
+        pending = dict(steps)
+        while True:
+            results = await asyncio.gather(*(self._check(name, step) for name, step in pending.items()))
+            pending = {name: step for (name, step), ok in zip(pending.items(), results) if not ok}
+            if not pending:
+                self.status = "ready"
+                logger.info(f"Warm-up complete in {time.perf_counter() - started:.1f}s; worker is ready")
+                return
+            logger.warning(f"Warm-up incomplete ({', '.join(pending)}); retrying in {retry}s")
+            await asyncio.sleep(retry)
+
+    async def _check(self, name: str, step: Step) -> bool:
+        started = time.perf_counter()
+        try:
+            await step()
+        except Exception as e:
+            self.checks[name] = {"ok": False, "seconds": round(time.perf_counter() - started, 3),
+                                 "error": f"{type(e).__name__}: {e}"[:300]}
+            return False
+        self.checks[name] = {"ok": True, "seconds": round(time.perf_counter() - started, 3)}
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"status": self.status, "checks": self.checks}
+
+
+warmup = Warmup()
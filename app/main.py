@@ -1,8 +1,18 @@
-from fastapi import FastAPI
-from fastapi.responses import StreamingResponse
+import time
+from contextlib import asynccontextmanager
+from functools import partial
+
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
+from app.core.admin import require_admin
+from app.core.loop_monitor import loop_lag_snapshot, start_loop_monitor, stop_loop_monitor
+from app.core.metrics import install_callback_metrics, render_metrics
+from app.core.profiler import ProfilerBusy, capture_profile
+from app.core.tracing import flush_spans, install_tracing
+from app.core.warmup import warmup
 from app.models.schemas import (
     ChatRequest, WorksheetRequest, BrandIdentityRequest, 
     CustomerProfileRequest, MarketingStrategyRequest,
@@ -16,13 +26,34 @@ from app.services.customer import customer_profile_event_generator
 from app.services.strategy import marketing_strategy_event_generator
 from app.services.master_content import master_content_event_generator
 from app.services.variant_generator import platform_variants_event_generator
-from app.services.batch_generator import batch_generate_event_stream
+from app.services.batch_generator import batch_generate_event_stream, batch_finish_in_background
 from app.services.content_briefs import content_briefs_event_generator
+from app.services.batch_jobs import batch_job_manager
+from app.utils.disconnect import guard_disconnect
+from app.utils.sse_runs import resumable_sse_response
+from app.utils.sse_writer import heartbeat_seconds, tracked_stream
 
 # Load environment variables
 load_dotenv()
 
-app = FastAPI(title="Marketing Agent API")
+# Record graph/node/LLM timings for /metrics and export trace spans
+install_callback_metrics()
+install_tracing()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_loop_monitor()
+    # Load models, graphs and the MCP connection in the background; /ready gates traffic.
+    warmup.start()
+    yield
+    await warmup.stop()
+    await stop_loop_monitor()
+    await batch_job_manager.shutdown()
+    flush_spans()
+
+
+app = FastAPI(title="Marketing Agent API", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -34,109 +65,186 @@ app.add_middleware(
 )
 
 @app.post("/chat")
-async def chat_endpoint(request: ChatRequest):
-    return StreamingResponse(
-        chat_event_generator(request.message, request.thread_id),
-        media_type="text/event-stream"
+async def chat_endpoint(request: ChatRequest, http_request: Request):
+    return resumable_sse_response(
+        http_request,
+        partial(chat_event_generator, request.message, request.thread_id),
+        body=request,
     )
 
 @app.post("/generate-worksheet")
-async def generate_worksheet(request: WorksheetRequest):
-    return StreamingResponse(
-        worksheet_event_generator(
+async def generate_worksheet(request: WorksheetRequest, http_request: Request):
+    return resumable_sse_response(
+        http_request,
+        partial(
+            worksheet_event_generator,
             business_description=request.businessDescription,
             target_audience=request.targetAudience,
             pain_points=request.painPoints,
             usp=request.uniqueSellingProposition,
             language=request.language,
         ),
-        media_type="text/event-stream"
+        body=request,
     )
 
 @app.post("/generate-brand-identity")
-async def generate_brand_identity(request: BrandIdentityRequest):
-    return StreamingResponse(
-        brand_identity_event_generator(
+async def generate_brand_identity(request: BrandIdentityRequest, http_request: Request):
+    return resumable_sse_response(
+        http_request,
+        partial(
+            brand_identity_event_generator,
             worksheet_id=request.worksheetId,
             language=request.language,
         ),
-        media_type="text/event-stream"
+        body=request,
     )
 
 @app.post("/generate-customer-profile")
-async def generate_customer_profile(request: CustomerProfileRequest):
-    return StreamingResponse(
-        customer_profile_event_generator(
+async def generate_customer_profile(request: CustomerProfileRequest, http_request: Request):
+    return resumable_sse_response(
+        http_request,
+        partial(
+            customer_profile_event_generator,
             brand_identity_id=request.brandIdentityId,
             language=request.language,
         ),
-        media_type="text/event-stream"
+        body=request,
     )
 
 
 @app.post("/generate-marketing-strategy")
-async def generate_marketing_strategy(request: MarketingStrategyRequest):
-    return StreamingResponse(
-        marketing_strategy_event_generator(
+async def generate_marketing_strategy(request: MarketingStrategyRequest, http_request: Request):
+    return resumable_sse_response(
+        http_request,
+        partial(
+            marketing_strategy_event_generator,
             worksheet_id=request.worksheetId,
             brand_identity_id=request.brandIdentityId,
             customer_profile_id=request.customerProfileId,
             goal=request.goal,
             language=request.language,
         ),
-        media_type="text/event-stream"
+        body=request,
     )
 
 
 @app.post("/generate-master-content")
-async def generate_master_content(request: MasterContentGenerationRequest):
-    return StreamingResponse(
-        master_content_event_generator(
+async def generate_master_content(request: MasterContentGenerationRequest, http_request: Request):
+    return resumable_sse_response(
+        http_request,
+        partial(
+            master_content_event_generator,
             campaign_id=request.campaignId,
             workspace_id=request.workspaceId,
             language=request.languagePreference,
         ),
-        media_type="text/event-stream"
+        body=request,
     )
 
 
 @app.post("/generate-platform-variants/{master_content_id}")
-async def generate_platform_variants(master_content_id: str, request: PlatformVariantGenerationRequest):
-    return StreamingResponse(
-        platform_variants_event_generator(
+async def generate_platform_variants(master_content_id: str, request: PlatformVariantGenerationRequest, http_request: Request):
+    return resumable_sse_response(
+        http_request,
+        partial(
+            platform_variants_event_generator,
             master_content_id=master_content_id,
             platforms=request.platforms,
             workspace_id=request.workspaceId,
             language=request.languagePreference,
         ),
-        media_type="text/event-stream"
+        body=request,
     )
 
 
 @app.post("/batch-generate-posts")
-async def batch_generate_posts(request: BatchGenerationRequest):
-    return StreamingResponse(
-        batch_generate_event_stream(
+async def batch_generate_posts(request: BatchGenerationRequest, http_request: Request):
+    return resumable_sse_response(
+        http_request,
+        partial(
+            batch_generate_event_stream,
             campaign_id=request.campaignId,
             workspace_id=request.workspaceId,
             language=request.language,
             platforms=request.platforms,
             num_masters=request.numMasters,
         ),
+        finish_in_background=batch_finish_in_background(),
+        body=request,
+    )
+
+
+@app.post("/batch-jobs", status_code=202)
+async def submit_batch_job(request: BatchGenerationRequest):
+    """Queue a batch to the background worker pool and return its job id immediately."""
+    job = await batch_job_manager.submit(
+        campaign_id=request.campaignId,
+        workspace_id=request.workspaceId,
+        language=request.language,
+        platforms=request.platforms,
+        num_masters=request.numMasters,
+    )
+    return job.to_dict()
+
+
+async def _get_batch_job(job_id: str):
+    job = await batch_job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Batch job {job_id} not found")
+    return job
+
+
+@app.get("/batch-jobs/{job_id}")
+async def get_batch_job(job_id: str):
+    return (await _get_batch_job(job_id)).to_dict()
+
+
+@app.get("/batch-jobs/{job_id}/result")
+async def get_batch_job_result(job_id: str):
+    job = await _get_batch_job(job_id)
+    if not job.finished:
+        raise HTTPException(status_code=409, detail=f"Batch job {job_id} is still {job.status}")
+    return {**job.to_dict(), "result": job.result}
+
+
+@app.get("/batch-jobs/{job_id}/events")
+async def stream_batch_job(job_id: str, http_request: Request):
+    """Attach to a job's SSE stream: past events are replayed, then live ones follow.
+
+    Resumes after the event named by a Last-Event-ID header.
+    """
+    await _get_batch_job(job_id)
+    start = 0
+    last_event_id = http_request.headers.get("last-event-id", "")
+    if last_event_id.startswith(f"{job_id}-") and last_event_id.rpartition("-")[2].isdigit():
+        start = int(last_event_id.rpartition("-")[2]) + 1
+    return StreamingResponse(
+        tracked_stream(
+            guard_disconnect(http_request, batch_job_manager.stream(job_id, start=start), heartbeat=heartbeat_seconds()),
+            label=f"batch job {job_id}",
+        ),
         media_type="text/event-stream"
     )
 
 
+@app.delete("/batch-jobs/{job_id}")
+async def cancel_batch_job(job_id: str):
+    await _get_batch_job(job_id)
+    return (await batch_job_manager.cancel(job_id)).to_dict()
+
+
 @app.post("/generate-content-briefs")
-async def generate_content_briefs(request: ContentBriefsGenerationRequest):
-    return StreamingResponse(
-        content_briefs_event_generator(
+async def generate_content_briefs(request: ContentBriefsGenerationRequest, http_request: Request):
+    return resumable_sse_response(
+        http_request,
+        partial(
+            content_briefs_event_generator,
             campaign_id=request.campaignId,
             workspace_id=request.workspaceId,
             language=request.language,
             angles_per_stage=request.anglesPerStage,
         ),
-        media_type="text/event-stream"
+        body=request,
     )
 
 
@@ -144,6 +252,47 @@ async def generate_content_briefs(request: ContentBriefsGenerationRequest):
 async def health_check():
     return {"status": "ok"}
 
+
+@app.get("/ready")
+async def readiness_check():
+    """503 until the start-up warm-up has loaded the models, graphs and MCP connection."""
+    return JSONResponse(warmup.snapshot(), status_code=200 if warmup.ready else 503)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition of this process's metrics."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/debug/loop-lag", dependencies=[Depends(require_admin)])
+async def loop_lag():
+    """Recent event-loop lag percentiles and the stacks of calls that blocked the loop."""
+    return loop_lag_snapshot()
+
+
+@app.get("/admin/profile", dependencies=[Depends(require_admin)])
+async def admin_profile(
+    seconds: float = Query(10, gt=0, le=120),
+    mode: str = Query("wall", pattern="^(wall|cpu)$"),
+    interval_ms: float = Query(5, ge=1, le=1000),
+    memory: bool = False,
+    format: str = Query("collapsed", pattern="^(collapsed|json)$"),
+):
+    """Sample this worker for ``seconds``; collapsed stacks for flamegraph tools, or JSON with a memory diff."""
+    if memory and format != "json":
+        raise HTTPException(status_code=400, detail="memory=true needs format=json")
+    try:
+        profile = await capture_profile(seconds, mode, interval_ms / 1000, memory)
+    except ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if format == "json":
+        return profile
+    filename = f"profile-{mode}-{int(time.time())}.collapsed"
+    return PlainTextResponse(profile["collapsed"], headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -135,7 +135,7 @@ Output format (MUST be valid JSON ONLY):
 """
 
 EDITOR_BRAND_GUARDIAN_PROMPT = """
-You are a brand guardian. Review the following master posts and platform variants for brand compliance and repetition.
+You are a brand guardian. Review the following master posts and platform variants for brand compliance.
 
 Brand Context:
 - Brand: {brand_name}
@@ -144,15 +144,15 @@ Brand Context:
 
 Checks:
 1) Brand voice compliance
-2) CTA presence
-3) Excessive vocabulary repetition across masters
-4) Platform-appropriate tone
+2) Platform-appropriate tone
+
+CTA presence, brand keyword usage, platform length limits and duplicated content are checked separately; report only brand voice and platform tone issues.
 
 Output format (MUST be valid JSON ONLY):
 {{
     "flags": [
         {{
-            "type": "brand_voice|cta_missing|duplication|platform_tone",
+            "type": "brand_voice|platform_tone",
             "target": "master|variant",
             "target_id": "string",
             "message": "string"
@@ -6,14 +6,8 @@ import uuid
 import operator
 from typing import Any, AsyncGenerator, Dict, List, TypedDict, Annotated
 
-from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import MemorySaver
-from langgraph.types import Send
-
-from angle_strategist_agent.graph import angle_strategist_graph
-from master_content_agent.graph import master_content_graph
-from variant_generator_agent.graph import variant_generator_graph
-from editor_brand_guardian_agent.graph import editor_brand_guardian_graph
+from angle_strategist_agent.dedupe import drop_near_duplicate_angles
+from app.core.lazy import lazy_import
 from app.tools.mcp_bridge import execute_mcp_tool, parse_mcp_result
 from app.utils.sse import sse_event
 from app.utils.state_factory import StateFactory
@@ -21,6 +15,11 @@ from app.utils.state_factory import StateFactory
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+angle_strategist_graph = lazy_import("angle_strategist_agent.graph", "angle_strategist_graph")
+master_content_graph = lazy_import("master_content_agent.graph", "master_content_graph")
+variant_generator_graph = lazy_import("variant_generator_agent.graph", "variant_generator_graph")
+editor_brand_guardian_graph = lazy_import("editor_brand_guardian_agent.graph", "editor_brand_guardian_graph")
+
 VALID_PLATFORMS = ["facebook", "instagram", "linkedin", "twitter", "tiktok", "youtube", "blog", "email"]
 
 
@@ -32,6 +31,17 @@ class MasterMapState(TypedDict):
     master_results: Annotated[List[Dict[str, Any]], operator.add]
 
 
+def batch_finish_in_background() -> bool:
+    """Whether a batch keeps running after its SSE client disconnects."""
+    return os.getenv("BATCH_FINISH_IN_BACKGROUND", "false").lower() in ("1", "true", "yes")
+
+
+def _cancel_pending(tasks: List[asyncio.Task]) -> None:
+    for task in tasks:
+        if not task.done():
+            task.cancel()
+
+
 async def _create_record(collection: str, data: dict) -> dict:
     result = await execute_mcp_tool("create_record", {"collection": collection, "data": data})
     parsed, err = parse_mcp_result(result)
@@ -92,6 +102,10 @@ async def _generate_master_for_angle(state: Dict[str, Any], semaphore: asyncio.S
 
 
 def _build_master_map_graph(semaphore: asyncio.Semaphore):
+    from langgraph.checkpoint.memory import MemorySaver
+    from langgraph.graph import END, START, StateGraph
+    from langgraph.types import Send
+
     workflow = StateGraph(MasterMapState)
 
     async def master_from_angle_node(state: Dict[str, Any]):
@@ -118,7 +132,7 @@ def _build_master_map_graph(semaphore: asyncio.Semaphore):
     workflow.add_edge("MasterFromAngle", END)
 
     memory = MemorySaver()
-    return workflow.compile(checkpointer=memory)
+    return workflow.compile(checkpointer=memory, name="batch_master_map")
 
 
 async def _generate_variants_for_master(
@@ -223,6 +237,23 @@ async def batch_generate_event_stream(
         yield sse_event("error", error=str(e), step="Angle generation")
         return
 
+    # Duplicates left after the evaluator's retry are dropped, so fewer masters
+    # than requested may be created; the done event lists them.
+    distinct, duplicates = drop_near_duplicate_angles(angles)
+    dropped_angles = [
+        {
+            "angleName": angles[later].get("angle_name", ""),
+            "duplicateOf": angles[earlier].get("angle_name", ""),
+            "similarity": round(similarity, 2),
+        }
+        for later, earlier, similarity in duplicates
+    ]
+    if len(distinct) < len(angles):
+        logger.info(f"Dropped {len(angles) - len(distinct)} near-duplicate angles: {duplicates}")
+        yield sse_event("status", status="active", agent="Batch",
+                        step=f"Dropped {len(angles) - len(distinct)} near-duplicate angle(s)")
+        angles = distinct
+
     yield sse_event("status", status="active", agent="Batch", step=f"Generated {len(angles)} angles. Creating master posts...")
 
     master_graph = _build_master_map_graph(semaphore)
@@ -246,15 +277,20 @@ async def batch_generate_event_stream(
 
     yield sse_event("status", status="active", agent="Batch", step=f"Created {len(master_results)} master posts. Generating variants...")
 
-    variant_tasks = []
+    queued_masters = []
     for idx, item in enumerate(master_results, start=1):
         master_record = item.get("master_record", {})
         if not master_record:
             continue
-        variant_tasks.append(
+        queued_masters.append(master_record)
+        yield sse_event("status", status="active", agent="Batch", step=f"Queued variants for master {idx}/{len(master_results)}")
+
+    variant_tasks = [
+        asyncio.create_task(
             _generate_variants_for_master(master_record, platforms, workspace_id, language, semaphore)
         )
-        yield sse_event("status", status="active", agent="Batch", step=f"Queued variants for master {idx}/{len(master_results)}")
+        for master_record in queued_masters
+    ]
 
     created_variants: List[dict] = []
     try:
@@ -265,6 +301,10 @@ async def batch_generate_event_stream(
         logger.error(f"Variant generation failed: {e}")
         yield sse_event("error", error=str(e), step="Variant generation")
         return
+    finally:
+        # gather() leaves siblings running when one fails, and the stream may be
+        # closed by a client disconnect; never leave LLM/MCP work orphaned.
+        _cancel_pending(variant_tasks)
 
     yield sse_event("status", status="active", agent="Batch", step="Running brand guardian checks...")
 
@@ -291,7 +331,9 @@ async def batch_generate_event_stream(
 
     yield sse_event(
         "done",
+        requestedMasters=num_masters,
         mastersCount=len(master_results),
         variantsCount=len(created_variants),
         editorFlags=editor_flags,
+        droppedAngles=dropped_angles,
     )
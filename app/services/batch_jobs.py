@@ -0,0 +1,333 @@
+"""Background job mode for batch generation.
+
+A batch takes minutes, which is longer than most proxies keep an idle SSE
+connection open. Jobs submitted here are queued to a small in-process worker
+pool that drives ``batch_generate_event_stream`` independently of any HTTP
+connection. Clients poll the job's status/result or attach to its event
+stream (replayed from the start, then live) whenever they like.
+
+With BATCH_JOB_BACKEND=process the same API is served from a SQLite queue
+consumed by separate worker processes (``app.services.batch_worker``). Both
+managers expose async ``submit``/``get``/``cancel``/``stream``; the process
+one runs its (blocking) SQLite calls in a thread so a busy queue file never
+stalls the event loop.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from app.services.batch_generator import batch_generate_event_stream
+from app.services.job_queue import (
+    FINISHED_STATES,
+    JOB_CANCELLED,
+    JOB_COMPLETED,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    SQLiteJobQueue,
+)
+from app.core.tracing import span, stamp_trace_id
+from app.utils.sse import parse_sse_event, with_event_id
+
+logger = logging.getLogger(__name__)
+
+
+def _job_summary(job_id, status, created_at, started_at, finished_at, step, events_count, error) -> Dict[str, Any]:
+    return {
+        "jobId": job_id,
+        "status": status,
+        "createdAt": created_at,
+        "startedAt": started_at,
+        "finishedAt": finished_at,
+        "progress": {
+            "step": step,
+            "eventsCount": events_count,
+        },
+        "error": error,
+    }
+
+
+class BatchJob:
+    """A single queued batch run and everything it has emitted so far."""
+
+    def __init__(self, params: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.params = params
+        self.status = JOB_QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.events: List[str] = []
+        self.step = ""
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def record(self, event: str) -> None:
+        self.events.append(event)
+        payload = parse_sse_event(event)
+        event_type = payload.get("type")
+        if event_type == "status":
+            self.step = payload.get("step", self.step)
+        elif event_type == "done":
+            self.result = {k: v for k, v in payload.items() if k not in ("type", "traceId")}
+        elif event_type == "error":
+            self.error = payload.get("error", "Unknown error")
+        self._notify()
+
+    def finish(self, status: str) -> None:
+        self.status = status
+        self.finished_at = time.time()
+        self._notify()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait_for_change(self) -> None:
+        await self._changed.wait()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return _job_summary(
+            self.id, self.status, self.created_at, self.started_at, self.finished_at,
+            self.step, len(self.events), self.error,
+        )
+
+
+class BatchJobManager:
+    """Queue and worker pool for background batch jobs.
+
+    Workers are started lazily on the running event loop the first time a job
+    is submitted. Finished jobs are kept (for polling) up to ``max_finished``.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_finished: Optional[int] = None):
+        self.workers = workers or int(os.getenv("BATCH_JOB_WORKERS", "2"))
+        self.max_finished = max_finished or int(os.getenv("BATCH_JOB_RETENTION", "100"))
+        self._jobs: "OrderedDict[str, BatchJob]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_workers(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._worker_tasks:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._worker_tasks = [
+            asyncio.create_task(self._worker(i)) for i in range(self.workers)
+        ]
+        # Requeue jobs that were waiting on a previous (now closed) loop.
+        for job in self._jobs.values():
+            if job.status == JOB_QUEUED:
+                self._queue.put_nowait(job.id)
+
+    async def submit(self, **params: Any) -> BatchJob:
+        """Queue a batch. ``params`` are passed to ``batch_generate_event_stream``."""
+        job = BatchJob(params)
+        self._jobs[job.id] = job
+        self._ensure_workers()
+        self._queue.put_nowait(job.id)
+        self._evict_finished()
+        logger.info(f"Queued batch job {job.id}")
+        return job
+
+    async def get(self, job_id: str) -> Optional[BatchJob]:
+        return self._jobs.get(job_id)
+
+    async def cancel(self, job_id: str) -> Optional[BatchJob]:
+        job = self._jobs.get(job_id)
+        if not job or job.finished:
+            return job
+        if job.task and not job.task.done():
+            job.task.cancel()
+        else:
+            job.finish(JOB_CANCELLED)
+        return job
+
+    async def stream(self, job_id: str, start: int = 0) -> AsyncGenerator[str, None]:
+        """Replay a job's events from ``start`` and follow it until it finishes.
+
+        Events carry ``<job_id>-<index>`` ids so clients can resume with Last-Event-ID.
+        """
+        job = self._jobs.get(job_id)
+        if not job:
+            return
+        index = start
+        while True:
+            while index < len(job.events):
+                yield with_event_id(job.events[index], f"{job_id}-{index}")
+                index += 1
+            if job.finished:
+                return
+            await job.wait_for_change()
+
+    async def shutdown(self) -> None:
+        for task in self._worker_tasks:
+            task.cancel()
+        for job in self._jobs.values():
+            if job.task and not job.task.done():
+                job.task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            if not job or job.status != JOB_QUEUED:
+                continue
+            job.task = asyncio.create_task(self._run(job))
+            # wait() rather than await: a cancelled job must not stop its worker.
+            await asyncio.wait([job.task])
+
+    async def _run(self, job: BatchJob) -> None:
+        job.status = JOB_RUNNING
+        job.started_at = time.time()
+        logger.info(f"Running batch job {job.id}")
+        try:
+            with span("batch job", job_id=job.id):
+                async for event in batch_generate_event_stream(**job.params):
+                    job.record(stamp_trace_id(event))
+        except asyncio.CancelledError:
+            job.finish(JOB_CANCELLED)
+            raise
+        except Exception as e:
+            logger.error(f"Batch job {job.id} crashed: {e}")
+            job.error = str(e)
+            job.finish(JOB_FAILED)
+            return
+        job.finish(JOB_COMPLETED if job.result is not None else JOB_FAILED)
+
+    def _evict_finished(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[: max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+
+class StoredBatchJob:
+    """Read-only view of a job row in the shared SQLite queue."""
+
+    def __init__(self, row: Dict[str, Any]):
+        self.id = row["id"]
+        self.status = row["status"]
+        self.result = row["result"]
+        self.error = row["error"]
+        self._row = row
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def to_dict(self) -> Dict[str, Any]:
+        row = self._row
+        return _job_summary(
+            self.id, self.status, row["created_at"], row["started_at"], row["finished_at"],
+            row["step"], row["events_count"], self.error,
+        )
+
+
+class ProcessBatchJobManager:
+    """Batch jobs executed by worker processes sharing one SQLite queue.
+
+    Same interface as ``BatchJobManager``. JSON parsing, prompt formatting and
+    event serialization for batches then run on other cores instead of the
+    API's event loop; events are fanned back through the queue's event log.
+    """
+
+    def __init__(
+        self,
+        queue_path: Optional[str] = None,
+        processes: Optional[int] = None,
+        jobs_per_worker: Optional[int] = None,
+        max_finished: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+    ):
+        self.queue_path = queue_path
+        self.processes = processes if processes is not None else int(os.getenv("BATCH_WORKER_PROCESSES", "2"))
+        self.jobs_per_worker = jobs_per_worker or int(os.getenv("BATCH_JOBS_PER_WORKER", "1"))
+        self.max_finished = max_finished or int(os.getenv("BATCH_JOB_RETENTION", "100"))
+        self.poll_interval = poll_interval or float(os.getenv("BATCH_JOB_POLL_INTERVAL", "0.25"))
+        self._queue: Optional[SQLiteJobQueue] = None
+        self._queue_lock = threading.Lock()
+        self._pool = None
+
+    @property
+    def queue(self) -> SQLiteJobQueue:
+        with self._queue_lock:
+            if self._queue is None:
+                self._queue = SQLiteJobQueue(self.queue_path)
+        return self._queue
+
+    def _ensure_pool(self) -> None:
+        if self._pool is not None or self.processes <= 0:
+            return
+        from app.services.batch_worker import BatchWorkerPool
+
+        expired = self.queue.fail_expired()
+        if expired:
+            logger.warning(f"Marked {expired} batch job(s) with an expired lease as failed")
+        self._pool = BatchWorkerPool(self.queue.path, self.processes, self.jobs_per_worker)
+        self._pool.start()
+
+    def _submit(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        self._ensure_pool()
+        job_id = self.queue.enqueue(params)
+        self.queue.purge_finished(self.max_finished)
+        logger.info(f"Queued batch job {job_id} for worker processes")
+        return self.queue.get(job_id)
+
+    async def submit(self, **params: Any) -> StoredBatchJob:
+        return StoredBatchJob(await asyncio.to_thread(self._submit, params))
+
+    async def get(self, job_id: str) -> Optional[StoredBatchJob]:
+        row = await asyncio.to_thread(lambda: self.queue.get(job_id))
+        return StoredBatchJob(row) if row else None
+
+    async def cancel(self, job_id: str) -> Optional[StoredBatchJob]:
+        await asyncio.to_thread(lambda: self.queue.request_cancel(job_id))
+        return await self.get(job_id)
+
+    async def stream(self, job_id: str, start: int = 0) -> AsyncGenerator[str, None]:
+        seq = start
+        while True:
+            row = await asyncio.to_thread(lambda: self.queue.get(job_id))
+            if row is None:
+                return
+            for seq, event in await asyncio.to_thread(self.queue.events_since, job_id, seq):
+                yield with_event_id(event, f"{job_id}-{seq}")
+                seq += 1
+            if row["status"] in FINISHED_STATES:
+                # Events written between the status read and the drain above.
+                for seq, event in await asyncio.to_thread(self.queue.events_since, job_id, seq):
+                    yield with_event_id(event, f"{job_id}-{seq}")
+                return
+            await asyncio.sleep(self.poll_interval)
+
+    async def shutdown(self) -> None:
+        if self._pool is not None:
+            await asyncio.to_thread(self._pool.stop)
+            self._pool = None
+
+
+def create_batch_job_manager():
+    """Pick the job backend from BATCH_JOB_BACKEND ("inprocess" or "process")."""
+    backend = os.getenv("BATCH_JOB_BACKEND", "inprocess").lower()
+    if backend == "process":
+        return ProcessBatchJobManager()
+    return BatchJobManager()
+
+
+batch_job_manager = create_batch_job_manager()
@@ -0,0 +1,186 @@
+"""Worker processes that execute batch jobs from the shared SQLite queue.
+
+Each worker runs its own event loop, claims queued jobs, drives
+``batch_generate_event_stream`` and appends every SSE event to the queue so
+the API process can fan them back out to clients. While a job runs its
+worker renews the job's lease (``heartbeat``); jobs whose lease lapses
+(``BATCH_JOB_LEASE_SECONDS``) belong to a dead worker and are failed.
+
+Workers are normally started by ``ProcessBatchJobManager``; extra ones can be
+run by hand against the same queue file:
+
+    python -m app.services.batch_worker --jobs 2
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import socket
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from app.services.batch_generator import batch_generate_event_stream
+from app.services.job_queue import (
+    JOB_CANCELLED,
+    JOB_COMPLETED,
+    JOB_FAILED,
+    SQLiteJobQueue,
+    default_queue_path,
+)
+from app.core.tracing import flush_spans, install_tracing, span, stamp_trace_id
+from app.utils.sse import parse_sse_event
+
+logger = logging.getLogger(__name__)
+
+
+async def execute_job(queue: SQLiteJobQueue, job_id: str, params: Dict[str, Any], poll_interval: float = 0.5) -> str:
+    """Run one claimed job to completion, renewing its lease and honouring cancel requests.
+
+    Returns the job's final status.
+    """
+    outcome: Dict[str, Any] = {"result": None, "error": None}
+
+    async def consume():
+        seq = 0
+        with span("batch job", job_id=job_id, worker_pid=os.getpid()):
+            async for event in batch_generate_event_stream(**params):
+                event = stamp_trace_id(event)
+                payload = parse_sse_event(event)
+                event_type = payload.get("type")
+                step = payload.get("step") if event_type == "status" else None
+                queue.append_event(job_id, seq, event, step=step)
+                seq += 1
+                if event_type == "done":
+                    outcome["result"] = {k: v for k, v in payload.items() if k not in ("type", "traceId")}
+                elif event_type == "error":
+                    outcome["error"] = payload.get("error", "Unknown error")
+
+    task = asyncio.create_task(consume())
+    while not task.done():
+        done, _ = await asyncio.wait([task], timeout=poll_interval)
+        if not done and queue.heartbeat(job_id):
+            task.cancel()
+            await asyncio.wait([task])
+
+    if task.cancelled():
+        status = JOB_CANCELLED
+    elif task.exception() is not None:
+        outcome["error"] = str(task.exception())
+        status = JOB_FAILED
+    else:
+        status = JOB_COMPLETED if outcome["result"] is not None else JOB_FAILED
+    queue.finish(job_id, status, result=outcome["result"], error=outcome["error"])
+    logger.info(f"Batch job {job_id} {status}")
+    return status
+
+
+async def worker_loop(
+    queue_path: str,
+    worker_id: str,
+    jobs_per_worker: int = 1,
+    poll_interval: float = 0.5,
+    stop: Optional[asyncio.Event] = None,
+) -> None:
+    """Claim and execute jobs until ``stop`` is set (or forever)."""
+    queue = SQLiteJobQueue(queue_path)
+    stop = stop or asyncio.Event()
+    expired = queue.fail_expired()
+    if expired:
+        logger.warning(f"Marked {expired} batch job(s) with an expired lease as failed")
+
+    async def slot(index: int):
+        name = f"{worker_id}/{index}"
+        while not stop.is_set():
+            claimed = queue.claim(name)
+            if claimed is None:
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            job_id, params = claimed
+            logger.info(f"Worker {name} picked up batch job {job_id}")
+            try:
+                await execute_job(queue, job_id, params, poll_interval)
+            except Exception as e:
+                logger.error(f"Worker {name} failed on job {job_id}: {e}")
+                queue.finish(job_id, JOB_FAILED, error=str(e))
+
+    try:
+        await asyncio.gather(*(slot(i) for i in range(jobs_per_worker)))
+    finally:
+        queue.close()
+
+
+def run_worker_process(queue_path: str, worker_id: str, jobs_per_worker: int = 1) -> None:
+    """Process entry point: load config and run a worker loop forever."""
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    install_tracing()
+    poll_interval = float(os.getenv("BATCH_WORKER_POLL_INTERVAL", "0.5"))
+    try:
+        asyncio.run(worker_loop(queue_path, worker_id, jobs_per_worker, poll_interval))
+    finally:
+        flush_spans()
+
+
+class BatchWorkerPool:
+    """A fixed set of spawned worker processes consuming one queue file."""
+
+    def __init__(self, queue_path: str, processes: int, jobs_per_worker: int = 1):
+        self.queue_path = queue_path
+        self.processes = processes
+        self.jobs_per_worker = jobs_per_worker
+        self._procs: List[multiprocessing.Process] = []
+        self._worker_ids: List[str] = []
+
+    def start(self) -> None:
+        ctx = multiprocessing.get_context("spawn")
+        host = socket.gethostname()
+        for i in range(self.processes):
+            worker_id = f"{host}-{os.getpid()}-{i}"
+            proc = ctx.Process(
+                target=run_worker_process,
+                args=(self.queue_path, worker_id, self.jobs_per_worker),
+                name=f"batch-worker-{i}",
+                daemon=True,
+            )
+            proc.start()
+            self._procs.append(proc)
+            self._worker_ids.append(worker_id)
+        logger.info(f"Started {self.processes} batch worker process(es) on {self.queue_path}")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Terminate the workers and fail the jobs they were still running."""
+        for proc in self._procs:
+            if proc.is_alive():
+                proc.terminate()
+        for proc in self._procs:
+            proc.join(timeout)
+        if self._worker_ids:
+            queue = SQLiteJobQueue(self.queue_path)
+            try:
+                stopped = sum(queue.fail_held_by(worker_id, "Batch worker was shut down")
+                              for worker_id in self._worker_ids)
+            finally:
+                queue.close()
+            if stopped:
+                logger.warning(f"Marked {stopped} batch job(s) interrupted by shutdown as failed")
+        self._procs = []
+        self._worker_ids = []
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a batch job worker against the shared queue.")
+    parser.add_argument("--queue", default=default_queue_path(), help="Path to the SQLite queue file")
+    parser.add_argument("--jobs", type=int, default=int(os.getenv("BATCH_JOBS_PER_WORKER", "1")),
+                        help="Jobs this worker runs concurrently")
+    args = parser.parse_args()
+    run_worker_process(args.queue, f"{socket.gethostname()}-{os.getpid()}", args.jobs)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,18 @@
 import logging
-from typing import AsyncGenerator
+import time
+from typing import AsyncGenerator, Dict
 
 from langchain_core.messages import HumanMessage
 
-from agent import app_graph
+from app.core.lazy import lazy_import
 from app.utils.sse import sse_event
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+app_graph = lazy_import("agent", "app_graph")
+
 
 async def chat_event_generator(message: str, thread_id: str) -> AsyncGenerator[str, None]:
     """
@@ -17,6 +20,8 @@ async def chat_event_generator(message: str, thread_id: str) -> AsyncGenerator[s
     """
     inputs = {"messages": [HumanMessage(content=message)]}
     config = {"configurable": {"thread_id": thread_id}}
+    # Tool start times by LangChain run id, for per-call latency
+    tool_started: Dict[str, float] = {}
 
     try:
         # Use astream_events to catch detailed execution steps
@@ -30,15 +35,21 @@ async def chat_event_generator(message: str, thread_id: str) -> AsyncGenerator[s
 
             # 2. Tool Execution Start
             elif event_type == "on_tool_start":
+                tool_started[event.get("run_id")] = time.perf_counter()
                 yield sse_event("tool_start", tool=event["name"], input=event["data"].get("input"))
 
-            # 3. Tool Execution End
+            # 3. Tool Execution End (tool calls of one step may run concurrently)
             elif event_type == "on_tool_end":
                 output = event["data"].get("output")
-                yield sse_event("tool_end", tool=event["name"], output=str(output))
+                started = tool_started.pop(event.get("run_id"), None)
+                duration_ms = round((time.perf_counter() - started) * 1000, 1) if started is not None else None
+                yield sse_event("tool_end", tool=event["name"], output=str(output), durationMs=duration_ms)
 
-            # 4. Agent Streaming Tokens
+            # 4. Agent Streaming Tokens (the Supervisor's tokens are its routing
+            # decision, reported once as a "route" event below)
             elif event_type == "on_chat_model_stream":
+                if event.get("metadata", {}).get("langgraph_node") == "Supervisor":
+                    continue
                 chunk = event["data"]["chunk"]
                 if chunk.content:
                     yield sse_event("chunk", content=chunk.content)
@@ -49,8 +60,20 @@ async def chat_event_generator(message: str, thread_id: str) -> AsyncGenerator[s
                 if name in ["Strategist", "Researcher", "CampaignManager", "ContentCreator", "Supervisor"]:
                     yield sse_event("status", status="active", agent=name)
 
-        # Final message when done
-        yield sse_event("done")
+            # 6. Routing Decision
+            elif event_type == "on_chain_end" and event["name"] == "Supervisor":
+                output = event["data"].get("output")
+                if isinstance(output, dict) and output.get("next"):
+                    yield sse_event("route", agent="Supervisor", next=output["next"])
+
+        # Final message when done, with the thread's accumulated token accounting
+        snapshot = await app_graph.aget_state(config)
+        usage = snapshot.values.get("token_usage") if snapshot else None
+        if usage:
+            logger.info(f"Thread {thread_id} token usage: {usage}")
+            yield sse_event("done", tokenUsage=usage)
+        else:
+            yield sse_event("done")
 
     except Exception as e:
         logger.error(f"Error in event generator: {e}")
@@ -0,0 +1,212 @@
+"""SQLite-backed batch job queue shared between the API and worker processes.
+
+The API process enqueues jobs and reads their status/events; worker processes
+(see ``app.services.batch_worker``) claim queued jobs, run them and append
+every SSE event they produce. SQLite in WAL mode gives us cross-process
+locking without running a separate broker.
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+FINISHED_STATES = (JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    worker TEXT,
+    heartbeat_at REAL,
+    step TEXT NOT NULL DEFAULT '',
+    result TEXT,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS job_events (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    event TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+"""
+
+
+def default_lease_seconds() -> float:
+    return float(os.getenv("BATCH_JOB_LEASE_SECONDS", "60"))
+
+
+def default_queue_path() -> str:
+    return os.getenv("BATCH_JOB_DB", os.path.join(tempfile.gettempdir(), "tmcp_batch_jobs.sqlite3"))
+
+
+class SQLiteJobQueue:
+    """A durable FIFO of batch jobs plus their event logs."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_queue_path()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            if "heartbeat_at" not in columns:  # queue files created before leases existed
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat_at REAL")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def enqueue(self, params: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, params, status, created_at) VALUES (?, ?, ?, ?)",
+                (job_id, json.dumps(params), JOB_QUEUED, time.time()),
+            )
+        return job_id
+
+    def claim(self, worker: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Atomically take the oldest queued job, or return None if there is none."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id, params FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                    (JOB_QUEUED,),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                now = time.time()
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, worker = ?, started_at = ?, heartbeat_at = ? WHERE id = ?",
+                    (JOB_RUNNING, worker, now, now, row["id"]),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return row["id"], json.loads(row["params"])
+
+    def append_event(self, job_id: str, seq: int, event: str, step: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO job_events (job_id, seq, event) VALUES (?, ?, ?)", (job_id, seq, event)
+            )
+            if step is not None:
+                self._conn.execute("UPDATE jobs SET step = ? WHERE id = ?", (step, job_id))
+
+    def finish(self, job_id: str, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, result = ?, error = ? WHERE id = ?",
+                (status, time.time(), json.dumps(result) if result is not None else None, error, job_id),
+            )
+
+    def request_cancel(self, job_id: str) -> None:
+        """Cancel a queued job immediately, or flag a running one for its worker."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+                (JOB_CANCELLED, time.time(), job_id, JOB_QUEUED),
+            )
+            self._conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?", (job_id, JOB_RUNNING)
+            )
+
+    def heartbeat(self, job_id: str) -> bool:
+        """Renew a running job's lease; returns whether a cancel was requested."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = ?", (time.time(), job_id, JOB_RUNNING)
+            )
+            row = self._conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def cancel_requested(self, job_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row["cancel_requested"])
+
+    def fail_expired(self, lease_seconds: Optional[float] = None,
+                     reason: str = "Worker stopped renewing its lease before the job finished") -> int:
+        """Mark running jobs whose worker has not heartbeated for ``lease_seconds`` as failed.
+
+        Jobs still heartbeating (in any process) are left alone. Expired ones
+        may have written partial records, so they are not retried.
+        """
+        lease = default_lease_seconds() if lease_seconds is None else lease_seconds
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, error = ? "
+                "WHERE status = ? AND COALESCE(heartbeat_at, started_at) < ?",
+                (JOB_FAILED, time.time(), reason, JOB_RUNNING, time.time() - lease),
+            )
+        return cursor.rowcount
+
+    def fail_held_by(self, worker: str, reason: str = "Worker stopped before the job finished") -> int:
+        """Mark running jobs claimed by ``worker`` (or any of its ``<worker>/<slot>`` slots) as failed."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, error = ? "
+                "WHERE status = ? AND (worker = ? OR substr(worker, 1, ?) = ?)",
+                (JOB_FAILED, time.time(), reason, JOB_RUNNING, worker, len(worker) + 1, f"{worker}/"),
+            )
+        return cursor.rowcount
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            count = self._conn.execute(
+                "SELECT COUNT(*) FROM job_events WHERE job_id = ?", (job_id,)
+            ).fetchone()[0]
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["events_count"] = count
+        return job
+
+    def events_since(self, job_id: str, seq: int) -> List[Tuple[int, str]]:
+        """Return (seq, event) pairs with a sequence number >= ``seq``."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, event FROM job_events WHERE job_id = ? AND seq >= ? ORDER BY seq",
+                (job_id, seq),
+            ).fetchall()
+        return [(row["seq"], row["event"]) for row in rows]
+
+    def purge_finished(self, keep: int) -> None:
+        """Drop all but the ``keep`` most recently finished jobs and their events."""
+        with self._lock:
+            stale = [
+                row["id"]
+                for row in self._conn.execute(
+                    "SELECT id FROM jobs WHERE status IN (?, ?, ?) ORDER BY finished_at DESC LIMIT -1 OFFSET ?",
+                    (*FINISHED_STATES, keep),
+                )
+            ]
+            for job_id in stale:
+                self._conn.execute("DELETE FROM job_events WHERE job_id = ?", (job_id,))
+                self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
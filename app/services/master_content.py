@@ -5,12 +5,14 @@ from typing import AsyncGenerator
 
 from langchain_core.messages import HumanMessage
 
-from master_content_agent.graph import master_content_graph
+from app.core.lazy import lazy_import
 from app.utils.sse import sse_event
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+master_content_graph = lazy_import("master_content_agent.graph", "master_content_graph")
+
 
 async def master_content_event_generator(
     campaign_id: str,
@@ -9,6 +9,8 @@ from app.core.llm_factory import get_ollama_llm
 from marketing_team.prompts import MARKETING_STRATEGY_PROMPT
 from app.utils.sse import sse_event
 from app.utils.llm import parse_json_response
+from app.utils.projection import project_section
+from app.utils.prompt_budget import render_within_budget
 
 async def marketing_strategy_event_generator(
     worksheet_id: str,
@@ -119,7 +121,7 @@ async def marketing_strategy_event_generator(
 """
 
         # Re-formatting with safe dumps
-        prompt = MARKETING_STRATEGY_PROMPT.format(
+        values = dict(
             worksheetContent=worksheet_content,
             brandName=brand_parsed.get("brand_name", "") or brand_parsed.get("brandName", ""),
             missionStatement=core_messaging.get("mission_statement", ""),
@@ -128,17 +130,20 @@ async def marketing_strategy_event_generator(
             icpSummary=icp_parsed.get("summary", ""),
             goals=safe_dump(psychographics.get("goals", [])),
             painPoints=safe_dump(psychographics.get("pain_points", [])),
-            interests=safe_dump(psychographics),
+            interests=safe_dump(project_section("MARKETING_STRATEGY_PROMPT", "psychographics", psychographics)),
             campaignType=campaign_type,
             productContext=product_context,
             customPromptSection=custom_prompt_section,
             language=language
         )
+        instruction = "Generate the marketing strategy based on the above context."
+        prompt = render_within_budget("MARKETING_STRATEGY_PROMPT", MARKETING_STRATEGY_PROMPT, values,
+                                      other_messages=[instruction])
 
         llm = get_ollama_llm(temperature=0.7)
         messages = [
             SystemMessage(content=prompt),
-            HumanMessage(content="Generate the marketing strategy based on the above context.")
+            HumanMessage(content=instruction)
         ]
 
         # --- Step 5: Stream Tokens ---
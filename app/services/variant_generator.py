@@ -5,12 +5,14 @@ from typing import AsyncGenerator
 
 from langchain_core.messages import HumanMessage
 
-from variant_generator_agent.graph import variant_generator_graph
+from app.core.lazy import lazy_import
 from app.utils.sse import sse_event
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+variant_generator_graph = lazy_import("variant_generator_agent.graph", "variant_generator_graph")
+
 
 async def platform_variants_event_generator(
     master_content_id: str,
@@ -1,17 +1,62 @@
 import os
 import asyncio
 import json
-from typing import Any, Dict, List, Optional, Tuple
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
-from contextlib import AsyncExitStack
-
-# Helper to run a tool via SSE
-from mcp.client.sse import sse_client
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from contextlib import AsyncExitStack, asynccontextmanager
 from contextvars import ContextVar
 
+from app.core.metrics import observe_mcp_call
+from app.core.tracing import start_span
+
+if TYPE_CHECKING:
+    from mcp import ClientSession
+
 auth_token_var: ContextVar[str] = ContextVar("auth_token", default="")
 
+# When set (see mcp_session), execute_mcp_* calls reuse this session instead of
+# opening a new SSE connection per call.
+shared_mcp_session: ContextVar[Optional["ClientSession"]] = ContextVar("shared_mcp_session", default=None)
+
+
+def sse_client(url: str, **kwargs):
+    """mcp's SSE client; the mcp package is imported on the first connection, not at start-up."""
+    from mcp.client.sse import sse_client as client
+
+    return client(url, **kwargs)
+
+
+@asynccontextmanager
+async def open_mcp_session():
+    """Connect to the standalone MCP server and yield an initialized session."""
+    from mcp import ClientSession
+
+    # URL of the standalone MCP server
+    sse_url = os.getenv("MCP_SERVER_URL", "http://localhost:7999/sse")
+
+    async with sse_client(sse_url) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            yield session
+
+@asynccontextmanager
+async def mcp_session():
+    """Share one MCP session across all execute_mcp_* calls in this context.
+
+    Concurrent calls are multiplexed over the session. Nested use reuses the
+    outer session. Must be entered and exited in the same task.
+    """
+    existing = shared_mcp_session.get()
+    if existing is not None:
+        yield existing
+        return
+    async with open_mcp_session() as session:
+        token = shared_mcp_session.set(session)
+        try:
+            yield session
+        finally:
+            shared_mcp_session.reset(token)
+
 def parse_mcp_result(result: Any) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
     """Parse MCP tool result. Returns (data, error_msg)."""
     if not result or not hasattr(result, "content") or not result.content:
@@ -26,28 +71,37 @@ def parse_mcp_result(result: Any) -> Tuple[Optional[Dict[str, Any]], Optional[st
         return None, f"JSON parse error: {e}. Raw: {text[:200]}"
 
 async def execute_mcp_tool(tool_name: str, arguments: dict) -> Any:
-    # URL of the standalone MCP server
-    sse_url = os.getenv("MCP_SERVER_URL", "http://localhost:7999/sse")
-
     token = auth_token_var.get()
     if token and tool_name in ["get_record", "list_records", "create_record", "update_record", "delete_record"] and "auth_token" not in arguments:
         arguments["auth_token"] = token
 
-    async with sse_client(sse_url) as (read, write):
-        async with ClientSession(read, write) as session:
-            await session.initialize()
+    collection = arguments.get("collection", "")
+    span = start_span(f"mcp {tool_name}", kind="client", tool=tool_name, collection=collection)
+    started = time.perf_counter()
+    status = "error"
+    try:
+        async with mcp_session() as session:
             result = await session.call_tool(tool_name, arguments)
-            return result
+        status = "error" if getattr(result, "isError", False) else "ok"
+        return result
+    finally:
+        observe_mcp_call(tool_name, collection, status, time.perf_counter() - started)
+        if span:
+            span.end(status)
 
 async def execute_mcp_read_resource(uri: str) -> Any:
-    # URL of the standalone MCP server
-    sse_url = os.getenv("MCP_SERVER_URL", "http://localhost:7999/sse")
-
-    async with sse_client(sse_url) as (read, write):
-        async with ClientSession(read, write) as session:
-            await session.initialize()
+    span = start_span("mcp read_resource", kind="client", uri=uri)
+    started = time.perf_counter()
+    status = "error"
+    try:
+        async with mcp_session() as session:
             result = await session.read_resource(uri)
-            return result
+        status = "ok"
+        return result
+    finally:
+        observe_mcp_call("read_resource", "", status, time.perf_counter() - started)
+        if span:
+            span.end(status)
 
 # Tool Wrappers
 from langchain_core.tools import tool
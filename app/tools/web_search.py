@@ -0,0 +1,162 @@
+"""Web search tool for the Researcher, with pluggable backends and a disk cache.
+
+Repeated chats about the same market tend to issue the same searches, and
+each DuckDuckGo round trip takes seconds. Results are cached on disk keyed by
+the normalised query (and backend), so a repeat is a file read.
+
+Config:
+    SEARCH_BACKEND      duckduckgo (default) or offline (canned results, no network)
+    SEARCH_CACHE_DIR    cache directory (default: <tempdir>/tmcp_search_cache)
+    SEARCH_CACHE_TTL    seconds a cached result stays valid (default 86400, 0 disables)
+"""
+
+import abc
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, Optional
+
+from langchain_core.tools import tool
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """Case-, whitespace- and Unicode-normalised form used as the cache key."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", query)).strip().casefold()
+
+
+class SearchBackend(abc.ABC):
+    """A search provider. Subclasses implement ``search``."""
+
+    name = "base"
+
+    @abc.abstractmethod
+    async def search(self, query: str) -> str:
+        """Return the raw result text for ``query``."""
+
+
+class DuckDuckGoBackend(SearchBackend):
+    """DuckDuckGo via langchain_community (imported on first use)."""
+
+    name = "duckduckgo"
+
+    def __init__(self):
+        self._runner = None
+
+    async def search(self, query: str) -> str:
+        if self._runner is None:
+            from langchain_community.tools import DuckDuckGoSearchRun
+
+            self._runner = DuckDuckGoSearchRun()
+        return await self._runner.ainvoke(query)
+
+
+class OfflineSearchBackend(SearchBackend):
+    """Deterministic canned results for tests and benchmarks; never touches the network."""
+
+    name = "offline"
+
+    def __init__(self, results: Optional[Dict[str, str]] = None, delay: float = 0.0):
+        self.results = {normalize_query(q): r for q, r in (results or {}).items()}
+        self.delay = delay
+        self.calls = 0
+
+    async def search(self, query: str) -> str:
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        key = normalize_query(query)
+        return self.results.get(key, f"Offline result for '{key}': no live search in this environment.")
+
+
+class SearchCache:
+    """One JSON file per (backend, normalised query), valid for ``ttl`` seconds."""
+
+    def __init__(self, directory: str, ttl: float):
+        self.directory = Path(directory)
+        self.ttl = ttl
+
+    def _path(self, backend: str, query: str) -> Path:
+        digest = hashlib.sha256(f"{backend}\n{normalize_query(query)}".encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.json"
+
+    def get(self, backend: str, query: str) -> Optional[str]:
+        if self.ttl <= 0:
+            return None
+        path = self._path(backend, query)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("created", 0) > self.ttl:
+            path.unlink(missing_ok=True)
+            return None
+        return entry.get("result")
+
+    def set(self, backend: str, query: str, result: str) -> None:
+        if self.ttl <= 0:
+            return
+        path = self._path(backend, query)
+        entry = {"backend": backend, "query": normalize_query(query), "created": time.time(), "result": result}
+        tmp = None
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            # A unique temp file per writer: concurrent writers of one key each replace it whole.
+            with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=self.directory, prefix=f"{path.stem}.",
+                                             suffix=".tmp", delete=False) as f:
+                tmp = Path(f.name)
+                f.write(json.dumps(entry, ensure_ascii=False))
+            tmp.replace(path)
+        except OSError as e:
+            logger.warning(f"Could not write search cache entry: {e}")
+            if tmp is not None:
+                tmp.unlink(missing_ok=True)
+
+
+_backends: Dict[str, SearchBackend] = {}
+
+
+def get_search_backend(name: Optional[str] = None) -> SearchBackend:
+    name = (name or os.getenv("SEARCH_BACKEND", "duckduckgo")).lower()
+    if name not in _backends:
+        if name == "offline":
+            _backends[name] = OfflineSearchBackend()
+        elif name == "duckduckgo":
+            _backends[name] = DuckDuckGoBackend()
+        else:
+            raise ValueError(f"Unknown SEARCH_BACKEND: {name}")
+    return _backends[name]
+
+
+def get_search_cache() -> SearchCache:
+    directory = os.getenv("SEARCH_CACHE_DIR", os.path.join(tempfile.gettempdir(), "tmcp_search_cache"))
+    return SearchCache(directory, float(os.getenv("SEARCH_CACHE_TTL", "86400")))
+
+
+async def cached_search(query: str, backend: Optional[SearchBackend] = None, cache: Optional[SearchCache] = None) -> str:
+    backend = backend or get_search_backend()
+    cache = cache or get_search_cache()
+    started = time.perf_counter()
+    cached = cache.get(backend.name, query)
+    if cached is not None:
+        logger.info(f"Search cache hit ({backend.name}) in {(time.perf_counter() - started) * 1000:.1f}ms: {query!r}")
+        return cached
+    result = await backend.search(query)
+    if result:
+        cache.set(backend.name, query, result)
+    logger.info(f"Search ({backend.name}) took {(time.perf_counter() - started) * 1000:.0f}ms: {query!r}")
+    return result
+
+
+@tool("duckduckgo_search")
+async def search_tool(query: str) -> str:
+    """A wrapper around DuckDuckGo Search. Useful for when you need to answer questions about current events. Input should be a search query."""
+    return await cached_search(query)
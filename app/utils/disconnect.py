@@ -0,0 +1,134 @@
+"""Stop SSE producers when the HTTP client goes away.
+
+StreamingResponse only notices a closed connection on its next write, so a
+generator that is awaiting a long LLM call keeps the graph, Ollama and MCP
+work alive for a browser tab that no longer exists. ``guard_disconnect`` runs
+the producer in its own task, polls the request for a disconnect and cancels
+the producer as soon as one is seen.
+
+The producer hands events over through a bounded queue
+(``SSE_BUFFER_EVENTS``), so a slow or stalled client still slows the
+producer down instead of letting it buffer a whole generation in memory.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, AsyncGenerator, AsyncIterator, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_COMMENT = ": heartbeat\n\n"
+
+_DONE = object()
+_DISCONNECTED = object()
+
+# Producers that were detached from their client with finish_in_background=True.
+# Holding a reference keeps them from being garbage collected mid-run.
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def disconnect_poll_interval() -> float:
+    return float(os.getenv("SSE_DISCONNECT_POLL_INTERVAL", "0.5"))
+
+
+def buffer_events() -> int:
+    return max(1, int(os.getenv("SSE_BUFFER_EVENTS", "32")))
+
+
+def _drain(queue: asyncio.Queue) -> None:
+    """Empty ``queue``, waking any producer blocked on a full queue."""
+    while True:
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+
+
+async def guard_disconnect(
+    request: Any,
+    events: AsyncIterator[str],
+    finish_in_background: bool = False,
+    poll_interval: Optional[float] = None,
+    heartbeat: Optional[float] = None,
+    max_buffered: Optional[int] = None,
+) -> AsyncGenerator[str, None]:
+    """Relay ``events`` to the client, cancelling them if the client disconnects.
+
+    Args:
+        request: The incoming Starlette request (anything with ``is_disconnected``).
+        events: The service's SSE event generator.
+        finish_in_background: Let the producer run to completion after a
+            disconnect instead of cancelling it. Its remaining events are dropped.
+        poll_interval: Seconds between disconnect checks.
+        heartbeat: If set (and > 0), send an SSE comment after this many idle
+            seconds so proxies do not time out a quiet stream.
+        max_buffered: Events the producer may run ahead of the client
+            (default ``SSE_BUFFER_EVENTS``).
+    """
+    interval = poll_interval if poll_interval is not None else disconnect_poll_interval()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max_buffered or buffer_events())
+    detached = asyncio.Event()
+
+    async def produce():
+        last: Any = _DONE
+        try:
+            async for event in events:
+                if not detached.is_set():
+                    await queue.put(event)
+        except Exception as e:
+            last = e
+        except asyncio.CancelledError:
+            # Cancelled while blocked on a full queue the generator is suspended
+            # at a yield, not an await: close it so its cleanup still runs.
+            aclose = getattr(events, "aclose", None)
+            if aclose is not None:
+                await aclose()
+            raise
+        # Nobody reads a detached queue; only a live consumer gets the end marker.
+        if not detached.is_set():
+            await queue.put(last)
+
+    def stop_producer():
+        if producer.done() or detached.is_set():
+            return
+        detached.set()
+        if finish_in_background:
+            logger.info("Client gone; finishing stream in background")
+            _background_tasks.add(producer)
+            producer.add_done_callback(_background_tasks.discard)
+            _drain(queue)
+        else:
+            producer.cancel()
+
+    async def watch():
+        while not producer.done():
+            if await request.is_disconnected():
+                stop_producer()
+                # The client is gone: drop what it never read and wake the consumer.
+                _drain(queue)
+                queue.put_nowait(_DISCONNECTED)
+                return
+            await asyncio.sleep(interval)
+
+    producer = asyncio.create_task(produce())
+    watcher = asyncio.create_task(watch())
+
+    try:
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout=heartbeat or None)
+            except asyncio.TimeoutError:
+                yield HEARTBEAT_COMMENT
+                continue
+            if item is _DONE:
+                break
+            if item is _DISCONNECTED:
+                logger.info("SSE client disconnected")
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        watcher.cancel()
+        stop_producer()
@@ -2,6 +2,11 @@
 
 import json
 
+_decoder = json.JSONDecoder()
+
+# Characters a JSON document can start with; anything else fails json.loads at index 0.
+_JSON_START = frozenset('{["-0123456789tfnNI')
+
 
 def parse_json_response(text: str) -> dict:
     """Extract and parse JSON from an LLM response that may contain extra text.
@@ -11,15 +16,25 @@ def parse_json_response(text: str) -> dict:
     2. Extract JSON from markdown code fences (```json ... ```)
     3. Find the outermost { ... } brace pair
 
+    Each candidate is decoded at most once: a document followed by trailing
+    prose is decoded in place instead of being re-parsed by strategy 3, and
+    candidates that cannot start a JSON value are skipped without a parse.
+
     Raises ValueError if no valid JSON can be found.
     """
     stripped = text.strip()
+    leading = None  # (value, end) of a JSON value at the start followed by extra text
 
     # Strategy 1: direct parse
-    try:
-        return json.loads(stripped)
-    except json.JSONDecodeError:
-        pass
+    if stripped[:1] in _JSON_START:
+        try:
+            value, end = _decoder.raw_decode(stripped)
+        except json.JSONDecodeError:
+            pass
+        else:
+            if end == len(stripped):
+                return value
+            leading = value, end
 
     # Strategy 2: markdown code fences
     if "```" in stripped:
@@ -27,6 +42,8 @@ def parse_json_response(text: str) -> dict:
             block = block.strip()
             if block.startswith("json"):
                 block = block[4:].strip()
+            if block[:1] not in _JSON_START:
+                continue
             try:
                 return json.loads(block)
             except json.JSONDecodeError:
@@ -36,6 +53,8 @@ def parse_json_response(text: str) -> dict:
     start = stripped.find("{")
     end = stripped.rfind("}")
     if start != -1 and end != -1 and end > start:
+        if leading is not None and start == 0 and leading[1] == end + 1:
+            return leading[0]  # the brace span is exactly the document decoded above
         try:
             return json.loads(stripped[start : end + 1])
         except json.JSONDecodeError:
@@ -0,0 +1,145 @@
+"""Per-template projection of context records.
+
+``fetch_campaign_context`` returns whole PocketBase records: ``expand`` trees
+(the campaign carries its product, brand and worksheet again), ids,
+timestamps and collection metadata, none of which a prompt reads. The saved
+masters and variants the guardian reviews carry SEO fields, scores and notes.
+
+``PROJECTIONS`` declares, per prompt template, which fields of each context
+section the template uses; ``project_context`` and ``project_section`` keep
+those and drop everything else, so graph state, checkpoints and any section
+serialized into a prompt only hold what the template needs. Every record
+keeps its ``id``.
+
+Paths are dotted (``kpi_targets.strategy.goal``). A JSON-encoded string met
+on the way down is decoded, since PocketBase json fields (``metadata``) may
+arrive as strings. The estimated tokens before and after are counted in
+``context_projection_tokens_total{template,stage}``.
+"""
+
+import json
+import logging
+from typing import Any, Dict, Iterable, Tuple
+
+from app.core.metrics import registry
+from app.utils.tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+PROJECTION_TOKENS = registry.counter(
+    "context_projection_tokens_total",
+    "Estimated context tokens before (stage=full) and after (stage=projected) projection, by template.",
+)
+
+BRAND_NAME = ("brand_name", "brandName")
+BRAND_VOICE = ("voice_and_tone", "voiceAndTone")
+PERSONA_NAME = ("persona_name", "personaName")
+PERSONA_DETAILS = PERSONA_NAME + (
+    "goals_and_motivations", "goalsAndMotivations", "pain_points_and_challenges", "painPointsAndChallenges",
+)
+
+PROJECTIONS: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    "MASTER_CONTENT_GENERATOR_PROMPT": {
+        "campaign": ("name", "goal"),
+        "brandIdentity": BRAND_NAME + BRAND_VOICE + ("mission_statement", "missionStatement", "keywords"),
+        "customerProfile": PERSONA_DETAILS,
+    },
+    "ANGLE_STRATEGIST_PROMPT": {
+        "campaign": ("name", "goal", "kpi_targets.strategy.goal"),
+        "brandIdentity": BRAND_NAME + BRAND_VOICE + ("keywords",),
+        "product": ("name", "usp", "key_features", "key_benefits"),
+        "customerProfile": PERSONA_DETAILS,
+    },
+    "PLATFORM_VARIANT_GENERATOR_PROMPT": {
+        "masterContent": (
+            "core_message", "extended_message",
+            "metadata.extended_message", "metadata.tone_markers", "metadata.call_to_action",
+        ),
+        "brandIdentity": BRAND_VOICE,
+        "customerProfile": PERSONA_NAME,
+    },
+    "EDITOR_BRAND_GUARDIAN_PROMPT": {
+        "brandIdentity": BRAND_NAME + BRAND_VOICE + ("keywords",),
+        "masters": (
+            "core_message", "extended_message",
+            "metadata.extended_message", "metadata.tone_markers", "metadata.call_to_action",
+        ),
+        "variants": ("platform", "adapted_copy", "metadata.call_to_action", "metadata.hashtags"),
+    },
+    "MARKETING_STRATEGY_PROMPT": {
+        # goals and pain_points are rendered on their own lines of the prompt.
+        "psychographics": ("interests", "values", "personality"),
+    },
+}
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, str) and value.lstrip()[:1] in ("{", "["):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _pick(record: Any, path: str, out: Dict[str, Any]) -> None:
+    if not isinstance(record, dict):
+        return
+    head, _, rest = path.partition(".")
+    if head not in record:
+        return
+    if not rest:
+        out[head] = record[head]
+        return
+    child: Dict[str, Any] = {}
+    _pick(_decode(record[head]), rest, child)
+    if child:
+        existing = out.setdefault(head, {})
+        if isinstance(existing, dict):
+            existing.update(child)
+
+
+def project(record: Any, paths: Iterable[str]) -> Any:
+    """Keep ``id`` and ``paths`` of a record (or of each record in a list)."""
+    if isinstance(record, list):
+        return [project(item, paths) for item in record]
+    if not isinstance(record, dict):
+        return record
+    out: Dict[str, Any] = {}
+    for path in ("id", *paths):
+        _pick(record, path, out)
+    return out
+
+
+def context_tokens(value: Any) -> int:
+    if not value:
+        return 0
+    return estimate_tokens(json.dumps(value, ensure_ascii=False, default=str))
+
+
+def _record_savings(template: str, full: Any, projected: Any) -> None:
+    before, after = context_tokens(full), context_tokens(projected)
+    PROJECTION_TOKENS.inc(before, template=template, stage="full")
+    PROJECTION_TOKENS.inc(after, template=template, stage="projected")
+    logger.debug(f"Projected context for {template}: ~{before} -> ~{after} tokens")
+
+
+def project_section(template: str, section: str, value: Any) -> Any:
+    """Project one context section (a record or a list of records) for ``template``."""
+    projected = project(value, PROJECTIONS[template][section])
+    _record_savings(template, value, projected)
+    return projected
+
+
+def project_context(context: Dict[str, Any], template: str) -> Dict[str, Any]:
+    """The sections of ``context`` that ``template`` reads, each projected to its fields.
+
+    Sections the template does not read are dropped; retrieval errors
+    (``_errors``) are kept for the evaluators.
+    """
+    fields = PROJECTIONS[template]
+    projected = {section: project(context[section], paths) for section, paths in fields.items() if section in context}
+    _record_savings(template, context, projected)
+    if "_errors" in context:
+        projected["_errors"] = context["_errors"]
+    return projected
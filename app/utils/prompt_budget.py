@@ -0,0 +1,131 @@
+"""Prompt size accounting and token budgets per template.
+
+Ollama silently truncates a prompt that does not fit the context window
+(``num_ctx``), losing instructions or context without any error.
+``render_within_budget`` renders a template, estimates its size
+(``app.utils.tokens``: UTF-8 bytes / 4, no tokenizer needed) together with
+the other messages of the call, and if it exceeds the budget trims the
+template's lowest-priority sections first (``TRIM_ORDER``): a section is
+shortened to what still fits, or emptied if that would leave too little.
+
+The budget is ``PROMPT_TOKEN_BUDGET_<TEMPLATE>``, else ``PROMPT_TOKEN_BUDGET``,
+else ``OLLAMA_NUM_CTX`` (default 4096, Ollama's default) minus
+``PROMPT_COMPLETION_RESERVE`` (default 1024) tokens left for the answer.
+
+Metrics, by template: ``prompt_tokens_estimated`` (after trimming),
+``prompt_sections_trimmed_total{section}`` and ``prompt_over_budget_total``
+(still too large once every trimmable section is empty).
+"""
+
+import logging
+import os
+from typing import Any, Dict, Sequence
+
+from app.core.metrics import registry
+from app.utils.tokens import MESSAGE_OVERHEAD_TOKENS, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+TOKEN_BUCKETS = (256, 512, 1024, 1536, 2048, 3072, 4096, 6144, 8192, 16384, 32768)
+
+PROMPT_TOKENS = registry.histogram(
+    "prompt_tokens_estimated", "Estimated prompt tokens per LLM call by template, after trimming.", buckets=TOKEN_BUCKETS
+)
+PROMPT_SECTIONS_TRIMMED = registry.counter(
+    "prompt_sections_trimmed_total", "Prompt sections shortened or dropped to fit the budget, by template and section."
+)
+PROMPT_OVER_BUDGET = registry.counter(
+    "prompt_over_budget_total", "Prompts still over budget after trimming every trimmable section, by template."
+)
+
+# Format fields each template may shorten, lowest priority first. Fields not
+# listed (campaign, brand name, the angle, the master message...) are never trimmed.
+TRIM_ORDER: Dict[str, Sequence[str]] = {
+    "MASTER_CONTENT_GENERATOR_PROMPT": (
+        "brand_mission", "persona_pain_points", "persona_goals", "brand_keywords", "brand_voice",
+    ),
+    "ANGLE_STRATEGIST_PROMPT": (
+        "product_features", "product_benefits", "brand_keywords", "persona_pain_points", "persona_goals",
+        "brand_voice", "product_usp",
+    ),
+    "PLATFORM_VARIANT_GENERATOR_PROMPT": ("platform_guidelines", "tone_markers", "brand_voice", "extended_message"),
+    "EDITOR_BRAND_GUARDIAN_PROMPT": ("brand_keywords",),
+    "MARKETING_STRATEGY_PROMPT": ("interests", "productContext", "painPoints", "goals", "worksheetContent"),
+}
+
+# Below this many tokens a shortened section is not worth keeping.
+MIN_SECTION_TOKENS = 16
+
+
+def context_window() -> int:
+    return int(os.getenv("OLLAMA_NUM_CTX", "4096"))
+
+
+def completion_reserve() -> int:
+    return int(os.getenv("PROMPT_COMPLETION_RESERVE", "1024"))
+
+
+def prompt_token_budget(template: str) -> int:
+    value = os.getenv(f"PROMPT_TOKEN_BUDGET_{template}") or os.getenv("PROMPT_TOKEN_BUDGET")
+    if value:
+        return int(value)
+    return context_window() - completion_reserve()
+
+
+def truncate_to_tokens(text: str, tokens: int) -> str:
+    """Cut ``text`` to about ``tokens`` estimated tokens, on a UTF-8 boundary."""
+    data = text.encode("utf-8")
+    limit = max(tokens, 1) * 4
+    if len(data) <= limit:
+        return text
+    # "…" is 3 bytes in UTF-8.
+    return data[:limit - 3].decode("utf-8", "ignore").rstrip() + "…"
+
+
+def messages_tokens(*texts: str) -> int:
+    """Estimated tokens of the chat messages with these contents."""
+    return sum(estimate_tokens(text) + MESSAGE_OVERHEAD_TOKENS for text in texts)
+
+
+def render_within_budget(
+    template: str,
+    prompt: str,
+    values: Dict[str, Any],
+    suffix: str = "",
+    other_messages: Sequence[str] = (),
+) -> str:
+    """``prompt.format(**values) + suffix``, trimmed to the template's budget.
+
+    ``template`` names the prompt (its constant's name) for the budget, trim
+    order and metrics; ``other_messages`` are the rest of the call's messages,
+    counted but never trimmed.
+    """
+    values = dict(values)
+    budget = prompt_token_budget(template)
+    fixed = messages_tokens(*other_messages)
+
+    def render():
+        text = prompt.format(**values) + suffix
+        return text, messages_tokens(text) + fixed
+
+    rendered, tokens = render()
+    for section in TRIM_ORDER.get(template, ()):
+        if tokens <= budget:
+            break
+        text = values.get(section)
+        if not isinstance(text, str) or not text:
+            continue
+        # The estimate is not additive (rounding, the ellipsis), so shorten until it fits.
+        while text and tokens > budget:
+            keep = estimate_tokens(text) - (tokens - budget)
+            shorter = truncate_to_tokens(text, keep) if keep >= MIN_SECTION_TOKENS else ""
+            text = values[section] = shorter if shorter != text else ""
+            rendered, tokens = render()
+        PROMPT_SECTIONS_TRIMMED.inc(template=template, section=section)
+        logger.info(f"Trimmed {section} of {template} to fit {budget} tokens (now ~{tokens})")
+
+    if tokens > budget:
+        PROMPT_OVER_BUDGET.inc(template=template)
+        logger.warning(f"{template} is ~{tokens} tokens, over its {budget} token budget after trimming")
+    PROMPT_TOKENS.observe(tokens, template=template)
+    return rendered
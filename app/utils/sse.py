@@ -1,7 +1,65 @@
 import json
+import os
+from typing import Any, Callable, Dict, Optional
 
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
 
-def sse_event(event_type: str, **kwargs) -> str:
+
+def _stdlib_dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _orjson_dumps(obj: Any) -> str:
+    try:
+        return orjson.dumps(obj).decode("utf-8")
+    except TypeError:
+        # orjson is stricter about keys/types; keep stdlib behaviour for those.
+        return _stdlib_dumps(obj)
+
+
+def _select_dumps(backend: str) -> Callable[[Any], str]:
+    if backend == "json" or orjson is None:
+        return _stdlib_dumps
+    return _orjson_dumps
+
+
+# Chosen once at import: sse_event runs for every streamed token.
+# SSE_JSON_BACKEND=json forces the stdlib encoder; the default uses orjson if installed.
+dumps = _select_dumps(os.getenv("SSE_JSON_BACKEND", "auto"))
+
+# 'data: {"type":"<event_type>"' per event type, built on first use.
+_envelopes: Dict[str, str] = {}
+
+
+def _envelope(event_type: str) -> str:
+    envelope = _envelopes.get(event_type)
+    if envelope is None:
+        envelope = _envelopes[event_type] = 'data: {"type":' + dumps(event_type)
+    return envelope
+
+
+class SSEEvent(str):
+    """A formatted event that remembers its type and fields.
+
+    It is still a plain ``str`` on the wire; the attributes let stream layers
+    (coalescing, metrics) inspect events without parsing the JSON back.
+    """
+
+    def __new__(cls, text: str, event_type: str, fields: Dict[str, Any]):
+        event = super().__new__(cls, text)
+        event.event_type = event_type
+        event.fields = fields
+        return event
+
+    @property
+    def payload(self) -> Dict[str, Any]:
+        return {"type": self.event_type, **self.fields}
+
+
+def sse_event(event_type: str, *, event_id: Optional[str] = None, **kwargs) -> str:
     """Format a Server-Sent Event data line.
 
     Usage:
@@ -9,6 +67,37 @@ def sse_event(event_type: str, **kwargs) -> str:
         yield sse_event("chunk", content="Hello")
         yield sse_event("done")
         yield sse_event("error", error="Something went wrong")
+
+    ``event_id`` adds an ``id:`` field so clients can resume with Last-Event-ID.
+    JSON is compact and UTF-8 (non-ASCII text is not ``\\u`` escaped).
     """
-    payload = {"type": event_type, **kwargs}
-    return f"data: {json.dumps(payload)}\n\n"
+    if not kwargs:
+        event = _envelope(event_type) + "}\n\n"
+    elif "type" in kwargs:
+        event = f"data: {dumps({'type': event_type, **kwargs})}\n\n"
+    elif event_type == "chunk" and len(kwargs) == 1 and isinstance(kwargs.get("content"), str):
+        event = _envelope(event_type) + ',"content":' + dumps(kwargs["content"]) + "}\n\n"
+    else:
+        # Splice the fields into the cached envelope instead of building a merged dict.
+        event = _envelope(event_type) + "," + dumps(kwargs)[1:] + "\n\n"
+    if event_id is not None:
+        event = with_event_id(event, event_id)
+    return SSEEvent(event, event_type, kwargs)
+
+
+def with_event_id(event: str, event_id: str) -> str:
+    """Prefix an already formatted event with an ``id:`` field."""
+    return f"id: {event_id}\n{event}"
+
+
+def parse_sse_event(event: str) -> dict:
+    """Recover the JSON payload from an ``sse_event`` string ({} if there is none)."""
+    if isinstance(event, SSEEvent):
+        return event.payload
+    for line in event.splitlines():
+        if line.startswith("data: "):
+            try:
+                return json.loads(line[6:])
+            except (json.JSONDecodeError, ValueError):
+                return {}
+    return {}
@@ -0,0 +1,234 @@
+"""Resumable SSE runs.
+
+Each streaming request becomes a *run*: the service generator is driven by a
+background task that coalesces token chunks (see ``sse_writer``), stamps
+every event with a monotonic id
+(``<run_id>-<seq>``) and keeps the latest events in a bounded ring buffer.
+Clients read from the run rather than from the generator, so after a network
+blip they can reconnect with a ``Last-Event-ID`` header, get the events they
+missed replayed from the buffer and continue following the live run.
+
+A run only resumes for the request that started it: the Last-Event-ID must
+come with the same path and request body, otherwise a new run is started.
+
+A run nobody is reading from is cancelled after a short grace period (so a
+closed tab still frees capacity), unless it was started with
+``finish_in_background``. Finished runs stay resumable for a TTL.
+"""
+
+import asyncio
+import hashlib
+import itertools
+import json
+import logging
+import os
+import uuid
+from collections import deque
+from typing import Any, AsyncGenerator, AsyncIterator, Callable, Dict, Optional, Tuple
+
+from fastapi.responses import StreamingResponse
+
+from app.core.tracing import span, stamp_trace_id
+from app.utils.disconnect import guard_disconnect
+from app.utils.sse import with_event_id
+from app.utils.sse_writer import ChunkCoalescer, heartbeat_seconds, tracked_stream
+
+logger = logging.getLogger(__name__)
+
+
+def replay_buffer_size() -> int:
+    return int(os.getenv("SSE_REPLAY_BUFFER", "1000"))
+
+
+def resume_grace_seconds() -> float:
+    return float(os.getenv("SSE_RESUME_GRACE_SECONDS", "10"))
+
+
+def resume_ttl_seconds() -> float:
+    return float(os.getenv("SSE_RESUME_TTL_SECONDS", "60"))
+
+
+def body_hash(body: Any) -> str:
+    """Stable digest of a request body (a pydantic model or JSON-able value)."""
+    if hasattr(body, "model_dump_json"):
+        raw = body.model_dump_json()
+    else:
+        raw = json.dumps(body, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class StreamRun:
+    """One producer, a ring buffer of its id-stamped events, and any readers."""
+
+    def __init__(self, run_id: str, buffer_size: int, finish_in_background: bool = False,
+                 path: str = "", body_hash: str = ""):
+        self.id = run_id
+        self.path = path
+        self.body_hash = body_hash
+        self.finish_in_background = finish_in_background
+        self.finished = False
+        self.task: Optional[asyncio.Task] = None
+        self.subscribers = 0
+        self._buffer: deque = deque(maxlen=buffer_size)
+        self._next_seq = 0
+        self._changed = asyncio.Event()
+        self._idle_handle: Optional[asyncio.TimerHandle] = None
+
+    def publish(self, event: str) -> None:
+        seq = self._next_seq
+        self._next_seq += 1
+        self._buffer.append((seq, with_event_id(event, f"{self.id}-{seq}")))
+        self._notify()
+
+    def finish(self) -> None:
+        self.finished = True
+        self._cancel_idle_timer()
+        self._notify()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def _events_after(self, seq: int):
+        if not self._buffer:
+            return []
+        first = self._buffer[0][0]
+        if seq + 1 < first:
+            logger.warning(f"Run {self.id}: events {seq + 1}..{first - 1} fell out of the replay buffer")
+        return list(itertools.islice(self._buffer, max(0, seq + 1 - first), None))
+
+    async def subscribe(self, after: int = -1) -> AsyncGenerator[str, None]:
+        """Yield events with a sequence number above ``after``, then follow the run."""
+        self.subscribers += 1
+        self._cancel_idle_timer()
+        cursor = after
+        try:
+            while True:
+                changed = self._changed
+                pending = self._events_after(cursor)
+                for seq, event in pending:
+                    yield event
+                    cursor = seq
+                if pending:
+                    continue
+                if self.finished:
+                    return
+                await changed.wait()
+        finally:
+            self.subscribers -= 1
+            if self.subscribers == 0:
+                self._on_idle()
+
+    def _on_idle(self) -> None:
+        if self.finished or self.finish_in_background or not self.task:
+            return
+        grace = resume_grace_seconds()
+        if grace <= 0:
+            self.task.cancel()
+            return
+        self._idle_handle = asyncio.get_running_loop().call_later(grace, self._cancel_if_idle)
+
+    def _cancel_if_idle(self) -> None:
+        self._idle_handle = None
+        if self.subscribers == 0 and self.task and not self.task.done():
+            logger.info(f"Run {self.id}: no client reattached, cancelling")
+            self.task.cancel()
+
+    def _cancel_idle_timer(self) -> None:
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+            self._idle_handle = None
+
+
+class RunRegistry:
+    """Live and recently finished runs, addressable by run id."""
+
+    def __init__(self):
+        self._runs: Dict[str, StreamRun] = {}
+
+    def start(self, events: AsyncIterator[str], finish_in_background: bool = False, name: str = "stream",
+              path: str = "", body_hash: str = "") -> StreamRun:
+        run = StreamRun(uuid.uuid4().hex[:12], replay_buffer_size(), finish_in_background, path, body_hash)
+        self._runs[run.id] = run
+        run.task = asyncio.create_task(self._drive(run, events, name))
+        return run
+
+    def get(self, run_id: str) -> Optional[StreamRun]:
+        return self._runs.get(run_id)
+
+    def resolve(
+        self, last_event_id: Optional[str], path: Optional[str] = None, body_hash: Optional[str] = None
+    ) -> Tuple[Optional[StreamRun], int]:
+        """Map a Last-Event-ID header to (run, last seen seq), or (None, -1).
+
+        When ``path`` / ``body_hash`` are given, a run started by a different
+        request is a miss too, so an id replayed against another endpoint never
+        attaches to (or leaks) that run's events.
+        """
+        if not last_event_id or "-" not in last_event_id:
+            return None, -1
+        run_id, _, seq = last_event_id.strip().rpartition("-")
+        run = self._runs.get(run_id)
+        if run is None or not seq.isdigit():
+            return None, -1
+        if (path is not None and run.path != path) or (body_hash is not None and run.body_hash != body_hash):
+            logger.warning(f"Last-Event-ID {last_event_id} belongs to another request; starting a new run")
+            return None, -1
+        return run, int(seq)
+
+    async def _drive(self, run: StreamRun, events: AsyncIterator[str], name: str = "stream") -> None:
+        coalescer = ChunkCoalescer(run.publish)
+        count = 0
+        with span(name, kind="server", run_id=run.id) as root:
+            try:
+                async for event in events:
+                    coalescer.push(stamp_trace_id(event))
+                    count += 1
+            except asyncio.CancelledError:
+                logger.info(f"Run {run.id} cancelled")
+                if root:
+                    root.status = "cancelled"
+            except Exception as e:
+                logger.error(f"Run {run.id} failed: {e}")
+                if root:
+                    root.status = "error"
+                    root.set(error=repr(e))
+            finally:
+                if root:
+                    root.set(events=count)
+                coalescer.close()
+                run.finish()
+                asyncio.get_running_loop().call_later(resume_ttl_seconds(), self._runs.pop, run.id, None)
+
+
+run_registry = RunRegistry()
+
+
+def resumable_sse_response(
+    request,
+    events_factory: Callable[[], AsyncIterator[str]],
+    finish_in_background: bool = False,
+    body: Any = None,
+) -> StreamingResponse:
+    """Stream a new run, or re-attach to an existing one named by Last-Event-ID.
+
+    ``events_factory`` is only called when a new run has to be started.
+    ``body`` is the parsed request body; a run is only resumed by a request
+    with the same path and body.
+    """
+    path, digest = request.url.path, body_hash(body)
+    run, last_seq = run_registry.resolve(request.headers.get("last-event-id"), path=path, body_hash=digest)
+    if run is None:
+        run = run_registry.start(
+            events_factory(), finish_in_background=finish_in_background, name=f"{request.method} {path}",
+            path=path, body_hash=digest,
+        )
+    else:
+        logger.info(f"Resuming run {run.id} after event {last_seq}")
+    return StreamingResponse(
+        tracked_stream(
+            guard_disconnect(request, run.subscribe(after=last_seq), heartbeat=heartbeat_seconds()),
+            label=f"{request.url.path} run {run.id}",
+        ),
+        media_type="text/event-stream",
+    )
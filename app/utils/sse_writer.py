@@ -0,0 +1,144 @@
+"""Write-side helpers for SSE streams: chunk coalescing and throughput stats.
+
+Every streamed LLM token used to become its own ``chunk`` event and socket
+write. ``ChunkCoalescer`` merges consecutive chunks that arrive within a
+short window into one event: the first chunk after a quiet period is sent
+immediately (so time-to-first-token is unchanged), later ones are batched
+until the window elapses or the buffer reaches its size limit. Any other
+event flushes the buffer first, so ordering is preserved.
+
+Idle heartbeats are sent by ``guard_disconnect`` (see ``heartbeat_seconds``).
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import AsyncGenerator, AsyncIterator, Callable, Dict, List, Optional
+
+from app.core.metrics import SSE_BYTES, SSE_EVENTS, SSE_STREAMS
+from app.utils.sse import SSEEvent, sse_event
+
+logger = logging.getLogger(__name__)
+
+# Process-wide totals across all finished streams.
+sse_totals: Dict[str, float] = {"streams": 0, "events": 0, "bytes": 0, "seconds": 0.0}
+
+
+def coalesce_window_seconds() -> float:
+    return float(os.getenv("SSE_COALESCE_WINDOW_MS", "40")) / 1000
+
+
+def coalesce_max_chars() -> int:
+    return int(os.getenv("SSE_COALESCE_MAX_CHARS", "1024"))
+
+
+def heartbeat_seconds() -> float:
+    return float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
+
+def _chunk_content(event: str) -> Optional[str]:
+    """The text of a plain ``chunk`` event, or None for anything else."""
+    if isinstance(event, SSEEvent) and event.event_type == "chunk" and event.fields.keys() == {"content"}:
+        content = event.fields["content"]
+        return content if isinstance(content, str) else None
+    return None
+
+
+class ChunkCoalescer:
+    """Merge bursts of ``chunk`` events before handing them to ``emit``.
+
+    ``push`` is synchronous and buffered text is flushed by a loop timer, so
+    the producer is iterated exactly as before (same task, same contextvars).
+    """
+
+    def __init__(self, emit: Callable[[str], None], window: Optional[float] = None, max_chars: Optional[int] = None):
+        self.emit = emit
+        self.window = coalesce_window_seconds() if window is None else window
+        self.max_chars = coalesce_max_chars() if max_chars is None else max_chars
+        self._buffer: List[str] = []
+        self._buffered = 0
+        self._last_emit = float("-inf")
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def push(self, event: str) -> None:
+        content = _chunk_content(event)
+        if content is None or self.window <= 0:
+            self.flush()
+            self._emit(event)
+            return
+        now = time.monotonic()
+        if not self._buffer and now - self._last_emit >= self.window:
+            self._emit(event)
+            return
+        self._buffer.append(content)
+        self._buffered += len(content)
+        if self._buffered >= self.max_chars:
+            self.flush()
+        elif self._timer is None:
+            delay = max(0.0, self._last_emit + self.window - now)
+            self._timer = asyncio.get_running_loop().call_later(delay, self.flush)
+
+    def flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._buffer:
+            return
+        content = "".join(self._buffer)
+        self._buffer.clear()
+        self._buffered = 0
+        self._emit(sse_event("chunk", content=content))
+
+    def close(self) -> None:
+        self.flush()
+
+    def _emit(self, event: str) -> None:
+        self._last_emit = time.monotonic()
+        self.emit(event)
+
+
+class SSEStreamStats:
+    """Counts what one stream wrote to its client."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.events = 0
+        self.bytes = 0
+
+    def record(self, event: str) -> None:
+        size = len(event.encode("utf-8"))
+        self.events += 1
+        self.bytes += size
+        SSE_EVENTS.inc()
+        SSE_BYTES.inc(size)
+
+    def summary(self) -> Dict[str, float]:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return {
+            "events": self.events,
+            "bytes": self.bytes,
+            "seconds": round(elapsed, 3),
+            "events_per_second": round(self.events / elapsed, 1),
+            "bytes_per_second": round(self.bytes / elapsed, 1),
+        }
+
+
+async def tracked_stream(events: AsyncIterator[str], label: str = "sse") -> AsyncGenerator[str, None]:
+    """Pass events through unchanged, logging bytes/events per second at the end."""
+    stats = SSEStreamStats()
+    try:
+        async for event in events:
+            stats.record(event)
+            yield event
+    finally:
+        summary = stats.summary()
+        SSE_STREAMS.inc()
+        sse_totals["streams"] += 1
+        sse_totals["events"] += summary["events"]
+        sse_totals["bytes"] += summary["bytes"]
+        sse_totals["seconds"] += summary["seconds"]
+        logger.info(
+            f"{label}: {summary['events']} events, {summary['bytes']} bytes in {summary['seconds']}s "
+            f"({summary['events_per_second']} ev/s, {summary['bytes_per_second']} B/s)"
+        )
@@ -0,0 +1,38 @@
+"""Cheap token estimates for prompt budgeting.
+
+The local models do not expose a tokenizer we can call cheaply, so this uses
+UTF-8 bytes / 4, which tracks BPE tokenizers closely enough for English and
+stays conservative for Vietnamese (diacritics take 2-3 bytes).
+"""
+
+import json
+from typing import Any, Iterable
+
+# Role markers and separators the chat template adds around every message.
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    if not text:
+        return 0
+    return (len(text.encode("utf-8")) + 3) // 4
+
+
+def message_text(message: Any) -> str:
+    """The text of a LangChain message, including any tool call arguments."""
+    content = getattr(message, "content", message)
+    if isinstance(content, list):
+        content = "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+    text = content if isinstance(content, str) else str(content)
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        text += json.dumps([call.get("args", {}) for call in tool_calls], ensure_ascii=False)
+    return text
+
+
+def estimate_message_tokens(message: Any) -> int:
+    return estimate_tokens(message_text(message)) + MESSAGE_OVERHEAD_TOKENS
+
+
+def estimate_messages_tokens(messages: Iterable[Any]) -> int:
+    return sum(estimate_message_tokens(message) for message in messages)
@@ -0,0 +1,147 @@
+"""Scaling of the batch pipeline across numMasters × platforms × BATCH_MAX_CONCURRENT.
+
+Runs ``batch_generate_event_stream`` directly (no HTTP) against the fake
+Ollama/MCP backends for every cell of the sweep. Each cell records wall
+time, LLM requests and MCP calls (counted by the fakes), masters and variants
+created, and peak RSS growth over the cell. Prints a table per concurrency
+level and can write/compare JSON.
+
+    python -m benchmarks.bench_batch_scaling --masters 1,2,5,10 --platforms 1,4,8 --concurrency 1,5,10
+    python -m benchmarks.bench_batch_scaling --output batch.json
+    python -m benchmarks.bench_batch_scaling --compare batch.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+from benchmarks.harness import change, environment, load_report, rss_mb, write_report
+
+ALL_PLATFORMS = ["facebook", "instagram", "linkedin", "twitter", "tiktok", "youtube", "blog", "email"]
+
+
+def _ints(text: str) -> List[int]:
+    return [int(v) for v in text.split(",") if v.strip()]
+
+
+async def run_cell(fakes, campaign_id: str, num_masters: int, platforms: List[str], concurrency: int,
+                   heap: bool) -> Dict[str, Any]:
+    from app.services.batch_generator import batch_generate_event_stream
+
+    os.environ["BATCH_MAX_CONCURRENT"] = str(concurrency)
+    llm_before, mcp_before = fakes.llm_requests, fakes.mcp_calls
+    rss_before = rss_mb()
+    peak = {"rss": rss_before}
+
+    async def sample_rss():
+        while True:
+            peak["rss"] = max(peak["rss"], rss_mb())
+            await asyncio.sleep(0.05)
+
+    sampler = asyncio.create_task(sample_rss())
+    if heap:
+        tracemalloc.reset_peak()
+    outcome: Dict[str, Any] = {"type": "incomplete"}
+    events = 0
+    started = time.perf_counter()
+    try:
+        async for event in batch_generate_event_stream(campaign_id, "bench", "English", platforms, num_masters):
+            events += 1
+            payload = json.loads(event.split("data: ", 1)[1])
+            if payload.get("type") in ("done", "error"):
+                outcome = payload
+    finally:
+        wall = time.perf_counter() - started
+        sampler.cancel()
+
+    variants = outcome.get("variantsCount", 0)
+    return {
+        "masters": num_masters,
+        "platforms": len(platforms),
+        "concurrency": concurrency,
+        "outcome": outcome["type"] if outcome["type"] != "error" else f"error: {outcome.get('error', '')[:80]}",
+        "wall_s": round(wall, 3),
+        "events": events,
+        "masters_created": outcome.get("mastersCount", 0),
+        "variants_created": variants,
+        "ms_per_variant": round(wall * 1000 / variants, 1) if variants else None,
+        "llm_requests": fakes.llm_requests - llm_before,
+        "mcp_calls": fakes.mcp_calls - mcp_before,
+        "peak_rss_growth_mb": round(peak["rss"] - rss_before, 1),
+        "peak_heap_mb": round(tracemalloc.get_traced_memory()[1] / 2**20, 1) if heap else None,
+    }
+
+
+def cell_key(cell: Dict[str, Any]) -> tuple:
+    return cell["masters"], cell["platforms"], cell["concurrency"]
+
+
+def print_table(cells: List[Dict[str, Any]], baseline: Optional[Dict[str, Any]] = None) -> None:
+    previous = {cell_key(c): c for c in (baseline or {}).get("results", [])}
+    header = (f"{'masters':>7}{'platf':>6}{'conc':>5}{'wall s':>9}{'ms/var':>8}{'llm':>6}{'mcp':>6}"
+              f"{'var':>5}{'rss+MB':>8}")
+    print(header + ("{:>10}".format("Δ wall") if previous else "") + "  outcome")
+    for cell in cells:
+        ms_per_variant = f"{cell['ms_per_variant']:.0f}" if cell["ms_per_variant"] else "-"
+        line = (f"{cell['masters']:>7}{cell['platforms']:>6}{cell['concurrency']:>5}{cell['wall_s']:>9.2f}"
+                f"{ms_per_variant:>8}{cell['llm_requests']:>6}{cell['mcp_calls']:>6}{cell['variants_created']:>5}"
+                f"{cell['peak_rss_growth_mb']:>8.1f}")
+        if previous:
+            old = previous.get(cell_key(cell))
+            line += f"{change(cell['wall_s'], old['wall_s']) if old else '-':>10}"
+        print(f"{line}  {cell['outcome']}")
+
+
+async def sweep(fakes, campaign_id: str, args) -> List[Dict[str, Any]]:
+    cells = []
+    for concurrency in _ints(args.concurrency):
+        for num_masters in _ints(args.masters):
+            for count in _ints(args.platforms):
+                cell = await run_cell(fakes, campaign_id, num_masters, ALL_PLATFORMS[:count], concurrency, args.heap)
+                print(f"  masters={num_masters} platforms={count} concurrency={concurrency}: "
+                      f"{cell['wall_s']:.2f}s, {cell['llm_requests']} LLM / {cell['mcp_calls']} MCP calls")
+                cells.append(cell)
+    return cells
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--masters", default="1,2,5", help="numMasters values (max 10)")
+    parser.add_argument("--platforms", default="1,4,8", help="platform counts (max 8)")
+    parser.add_argument("--concurrency", default="1,5", help="BATCH_MAX_CONCURRENT values")
+    parser.add_argument("--tps", type=float, default=100.0, help="fake LLM tokens/sec per stream")
+    parser.add_argument("--ttft", default="100", help="fake LLM time-to-first-token spec (ms)")
+    parser.add_argument("--mcp-latency", default="5", help="fake MCP per-call latency spec (ms)")
+    parser.add_argument("--heap", action="store_true", help="also record the Python heap peak (tracemalloc; slower)")
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--compare", help="baseline JSON from an earlier --output to diff against")
+    args = parser.parse_args()
+
+    if max(_ints(args.masters)) > 10 or max(_ints(args.platforms)) > len(ALL_PLATFORMS):
+        parser.error("BatchGenerationRequest allows at most 10 masters and 8 platforms")
+    logging.basicConfig(level=logging.WARNING)
+    os.environ.setdefault("SEARCH_BACKEND", "offline")
+
+    from benchmarks.fakes import SEED_IDS, fake_backends
+
+    if args.heap:
+        tracemalloc.start()
+    with fake_backends(args.tps, args.ttft, args.mcp_latency) as fakes:
+        cells = asyncio.run(sweep(fakes, SEED_IDS["campaign"], args))
+
+    baseline = load_report(args.compare) if args.compare else None
+    print()
+    print_table(cells, baseline)
+    if args.output:
+        settings = {k: v for k, v in vars(args).items() if k not in ("output", "compare")}
+        write_report(args.output, {"benchmark": "batch_scaling", "environment": environment(), "settings": settings,
+                                   "results": cells})
+
+
+if __name__ == "__main__":
+    main()
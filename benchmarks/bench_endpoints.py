@@ -0,0 +1,221 @@
+"""End-to-end benchmark of every SSE endpoint against the fake Ollama/MCP backends.
+
+Starts the fake backends and the app (uvicorn, in this process) on free
+ports, then drives each endpoint with ``--requests`` requests at
+``--concurrency``. Per endpoint it reports time-to-first-event, time-to-done
+(p50/p95/p99), events/sec, and the process RSS. The server and the load
+generator share the process, so RSS includes both. Results can be written as
+JSON and compared against an earlier run.
+
+    python -m benchmarks.bench_endpoints --concurrency 8 --requests 32 --output bench.json
+    python -m benchmarks.bench_endpoints --endpoints chat,batch --compare bench.json
+    python -m benchmarks.bench_endpoints --url http://staging:8000   # existing deployment, no fakes
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from contextlib import ExitStack
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.harness import change, environment, load_report, peak_rss_mb, rss_mb, summarize, write_report
+
+Scenario = Callable[[int, Dict[str, str]], Tuple[str, Dict[str, Any]]]
+
+PLATFORMS = ["facebook", "twitter"]
+
+SCENARIOS: Dict[str, Scenario] = {
+    "chat": lambda i, ids: ("/chat", {"message": "Research the home coffee market for remote workers",
+                                      "thread_id": f"bench-{i}"}),
+    "worksheet": lambda i, ids: ("/generate-worksheet", {"brandIds": [ids["brand"]], "customerIds": [ids["persona"]]}),
+    "brand-identity": lambda i, ids: ("/generate-brand-identity", {"worksheetId": ids["worksheet"]}),
+    "customer-profile": lambda i, ids: ("/generate-customer-profile", {"brandIdentityId": ids["brand"]}),
+    "strategy": lambda i, ids: ("/generate-marketing-strategy", {"worksheetId": ids["worksheet"],
+                                                                 "productId": ids["product"], "goal": "Grow subscriptions"}),
+    "master-content": lambda i, ids: ("/generate-master-content", {"campaignId": ids["campaign"], "workspaceId": "bench"}),
+    "variants": lambda i, ids: (f"/generate-platform-variants/{ids['master']}", {"platforms": PLATFORMS,
+                                                                                 "workspaceId": "bench"}),
+    "batch": lambda i, ids: ("/batch-generate-posts", {"campaignId": ids["campaign"], "workspaceId": "bench",
+                                                       "platforms": PLATFORMS, "numMasters": 2}),
+    "briefs": lambda i, ids: ("/generate-content-briefs", {"campaignId": ids["campaign"], "workspaceId": "bench",
+                                                           "anglesPerStage": 2}),
+}
+
+
+async def one_request(client: httpx.AsyncClient, path: str, body: Dict[str, Any]) -> Dict[str, Any]:
+    """Stream one SSE response; times are ms from sending the request."""
+    started = time.perf_counter()
+    result: Dict[str, Any] = {"status": None, "outcome": "incomplete", "ttfe_ms": None, "done_ms": None,
+                              "events": 0, "bytes": 0}
+    try:
+        async with client.stream("POST", path, json=body) as response:
+            result["status"] = response.status_code
+            if response.status_code != 200:
+                result["outcome"] = f"http_{response.status_code}"
+                await response.aread()
+                return result
+            async for line in response.aiter_lines():
+                result["bytes"] += len(line) + 1
+                if not line.startswith("data: "):
+                    continue  # ids, heartbeats, blank separators
+                if result["ttfe_ms"] is None:
+                    result["ttfe_ms"] = (time.perf_counter() - started) * 1000
+                result["events"] += 1
+                event_type = json.loads(line[6:]).get("type")
+                if event_type in ("done", "error"):
+                    result["outcome"] = event_type
+                    result["done_ms"] = (time.perf_counter() - started) * 1000
+    except httpx.HTTPError as e:
+        result["outcome"] = f"exception: {type(e).__name__}"
+    return result
+
+
+async def run_endpoint(client: httpx.AsyncClient, name: str, ids: Dict[str, str], requests: int,
+                       concurrency: int, measure_rss: bool) -> Dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+    scenario = SCENARIOS[name]
+    peak = {"rss": rss_mb()} if measure_rss else {}
+
+    async def sample_rss():
+        while True:
+            peak["rss"] = max(peak["rss"], rss_mb())
+            await asyncio.sleep(0.05)
+
+    async def limited(i):
+        async with semaphore:
+            return await one_request(client, *scenario(i, ids))
+
+    rss_before = rss_mb() if measure_rss else None
+    sampler = asyncio.create_task(sample_rss()) if measure_rss else None
+    started = time.perf_counter()
+    results = await asyncio.gather(*(limited(i) for i in range(requests)))
+    wall = time.perf_counter() - started
+    if sampler:
+        sampler.cancel()
+
+    ok = [r for r in results if r["outcome"] == "done"]
+    outcomes: Dict[str, int] = {}
+    for r in results:
+        outcomes[r["outcome"]] = outcomes.get(r["outcome"], 0) + 1
+    events = sum(r["events"] for r in results)
+    return {
+        "endpoint": name,
+        "requests": requests,
+        "concurrency": concurrency,
+        "ok": len(ok),
+        "outcomes": outcomes,
+        "wall_s": round(wall, 3),
+        "requests_per_s": round(requests / wall, 2),
+        "events_per_s": round(events / wall, 1),
+        "bytes": sum(r["bytes"] for r in results),
+        "ttfe_ms": summarize(r["ttfe_ms"] for r in results if r["ttfe_ms"] is not None),
+        "done_ms": summarize(r["done_ms"] for r in ok),
+        "rss_mb": {"before": round(rss_before, 1), "peak": round(peak["rss"], 1)} if measure_rss else None,
+    }
+
+
+def seed_ids(store) -> Dict[str, str]:
+    from benchmarks.fakes import SEED_IDS
+
+    master = store.create("master_contents", {
+        "campaign_id": SEED_IDS["campaign"],
+        "core_message": "Fresh beans at your door within 48 hours of roasting.",
+        "extended_message": "Skip the cafe queue: Lumen delivers freshly roasted coffee to home offices every month.",
+        "metadata": {"tone_markers": ["warm", "confident"], "call_to_action": "Start your subscription"},
+    })
+    return {**SEED_IDS, "master": master["id"]}
+
+
+def print_table(results: List[Dict[str, Any]], baseline: Optional[Dict[str, Any]] = None) -> None:
+    previous = {r["endpoint"]: r for r in (baseline or {}).get("results", [])}
+    header = f"{'endpoint':<17}{'ok':>7}{'ttfe p50':>10}{'p95':>9}{'done p50':>10}{'p95':>9}{'p99':>9}{'ev/s':>9}{'rss MB':>8}"
+    print(header + ("   Δ done p95  Δ ttfe p95" if previous else ""))
+    for r in results:
+        ttfe, done = r["ttfe_ms"], r["done_ms"]
+        fmt = lambda v: f"{v:.0f}" if v is not None else "-"
+        line = (f"{r['endpoint']:<17}{r['ok']:>3}/{r['requests']:<3}{fmt(ttfe['p50']):>10}{fmt(ttfe['p95']):>9}"
+                f"{fmt(done['p50']):>10}{fmt(done['p95']):>9}{fmt(done['p99']):>9}{r['events_per_s']:>9.0f}"
+                f"{fmt((r['rss_mb'] or {}).get('peak')):>8}")
+        old = previous.get(r["endpoint"])
+        if old:
+            line += f"   {change(done['p95'], old['done_ms']['p95']):>10}  {change(ttfe['p95'], old['ttfe_ms']['p95']):>10}"
+        print(line)
+        failures = {k: v for k, v in r["outcomes"].items() if k != "done"}
+        if failures:
+            print(f"{'':<17}not done: {failures}")
+
+
+async def drive(base_url: str, names: List[str], ids: Dict[str, str], args, measure_rss: bool) -> List[Dict[str, Any]]:
+    timeout = httpx.Timeout(args.timeout, connect=10.0)
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits) as client:
+        results = []
+        for name in names:
+            for i in range(args.warmup):
+                await one_request(client, *SCENARIOS[name](-1 - i, ids))
+            results.append(await run_endpoint(client, name, ids, args.requests, args.concurrency, measure_rss))
+            print(f"  {name}: {results[-1]['ok']}/{args.requests} done in {results[-1]['wall_s']}s")
+        return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--endpoints", default=",".join(SCENARIOS), help=f"comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=16, help="requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=1, help="unmeasured requests per endpoint first")
+    parser.add_argument("--tps", type=float, default=40.0, help="fake LLM tokens/sec per stream")
+    parser.add_argument("--ttft", default="200", help="fake LLM time-to-first-token spec (ms)")
+    parser.add_argument("--mcp-latency", default="5", help="fake MCP per-call latency spec (ms)")
+    parser.add_argument("--timeout", type=float, default=300.0, help="per-request read timeout (s)")
+    parser.add_argument("--url", help="benchmark an already running app instead (no fakes, no RSS)")
+    parser.add_argument("--ids", help="JSON object of record ids for --url mode (campaign, worksheet, brand, ...)")
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--compare", help="baseline JSON from an earlier --output to diff against")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    names = [n.strip() for n in args.endpoints.split(",") if n.strip()]
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(unknown)}")
+
+    with ExitStack() as stack:
+        if args.url:
+            base_url, measure_rss = args.url.rstrip("/"), False
+            ids = json.loads(args.ids) if args.ids else {}
+        else:
+            from benchmarks.fakes import BackgroundServer, fake_backends
+
+            os.environ.setdefault("SEARCH_BACKEND", "offline")
+            fakes = stack.enter_context(fake_backends(args.tps, args.ttft, args.mcp_latency))
+            ids = seed_ids(fakes.store)
+            # Imported only now, after the fakes set OLLAMA_BASE_URL / MCP_SERVER_URL.
+            from app.main import app
+
+            server = BackgroundServer(app).start()
+            stack.callback(server.stop)
+            base_url, measure_rss = server.url, True
+
+        print(f"Benchmarking {len(names)} endpoints at {base_url} "
+              f"(concurrency {args.concurrency}, {args.requests} requests each)")
+        results = asyncio.run(drive(base_url, names, ids, args, measure_rss))
+
+    baseline = load_report(args.compare) if args.compare else None
+    print()
+    print_table(results, baseline)
+    if measure_rss:
+        print(f"\npeak RSS of the process: {peak_rss_mb():.1f} MB")
+    if args.output:
+        settings = {k: v for k, v in vars(args).items() if k not in ("output", "compare")}
+        write_report(args.output, {"benchmark": "endpoints", "environment": environment(), "settings": settings,
+                                   "results": results})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Microbenchmark for the per-output LLM helpers: JSON extraction and prompt formatting.
+
+Times the original ``parse_json_response`` (direct parse, fence split, brace
+scan) against the current one over realistic model outputs, and the
+``PROMPT.format(...)`` call each generator node makes per LLM call. Every
+parse case is checked for equal results before it is timed.
+
+    python -m benchmarks.bench_llm_parsing [--number 20000] [--cases fenced,guardian]
+"""
+
+import argparse
+import json
+import timeit
+
+from app import prompts
+from app.utils.llm import parse_json_response
+
+MASTER = {
+    "core_message": "Cà phê rang mới giao tận nhà trong 48 giờ.",
+    "extended_message": "Bỏ qua hàng chờ ở quán: Lumen giao cà phê rang xay mỗi tháng cho dân văn phòng tại gia. " * 3,
+    "tone_markers": ["ấm áp", "tự tin", "gần gũi"],
+    "suggested_hashtags": ["#LumenCoffee", "#CaPheRangMoi", "#LamViecTaiNha"],
+    "call_to_action": "Đăng ký gói tháng ngay hôm nay",
+}
+
+ANGLES = [
+    {
+        "angle_name": f"Angle {i}",
+        "funnel_stage": "Awareness",
+        "psychological_angle": ["Fear", "Logic", "Emotion", "Social Proof"][i % 4],
+        "pain_point_focus": "Mất thời gian xếp hàng mua cà phê mỗi sáng",
+        "key_message_variation": "Cà phê ngon không cần rời bàn làm việc.",
+        "call_to_action_direction": "Download Ebook",
+        "brief": "Opening - hook về buổi sáng bận rộn. Body - lợi ích giao tận nhà. Closing - lời mời dùng thử.",
+    }
+    for i in range(6)
+]
+
+GUARDIAN = {
+    "flags": [
+        {
+            "type": ["brand_voice", "cta_missing", "duplication", "platform_tone"][i % 4],
+            "target": "variant" if i % 2 else "master",
+            "target_id": f"rec{i:012d}",
+            "message": f"Variant {i} repeats the phrase 'rang mới mỗi ngày' used in three other posts; " * 2,
+        }
+        for i in range(60)
+    ]
+}
+
+CASES = {
+    "clean": json.dumps(MASTER),
+    "fenced": f"```json\n{json.dumps(MASTER, indent=2)}\n```",
+    "prose + fence": "Here is the master content you asked for:\n\n"
+                     f"```json\n{json.dumps(MASTER, indent=4, ensure_ascii=False)}\n```\n\nLet me know if you want changes.",
+    "prose around": f"Sure! {json.dumps(MASTER, ensure_ascii=False)} Hope this helps.",
+    "trailing prose": f"{json.dumps(MASTER, ensure_ascii=False)}\n\nNote: the CTA targets trial sign-ups.",
+    "vietnamese": json.dumps(MASTER, ensure_ascii=False, indent=2),
+    "angle list": json.dumps(ANGLES, ensure_ascii=False, indent=2),
+    "fenced list": f"Các góc nội dung:\n```json\n{json.dumps(ANGLES, ensure_ascii=False)}\n```",
+    "guardian": json.dumps(GUARDIAN, ensure_ascii=False, indent=4),
+    "guardian fenced": f"Review complete.\n```json\n{json.dumps(GUARDIAN, ensure_ascii=False, indent=4)}\n```",
+    "guardian trailing": f"{json.dumps(GUARDIAN, ensure_ascii=False)}\nAll flags above are advisory.",
+}
+
+# Field values shaped like what the nodes pass in; long fields mimic real brand/persona records.
+PROMPT_ARGS = {
+    "MASTER_CONTENT_GENERATOR_PROMPT": dict(
+        campaign_name="Mùa thu ấm áp", campaign_goal="Tăng 20% đăng ký gói tháng", brand_name="Lumen Coffee",
+        brand_mission="Mang cà phê rang mới đến mọi bàn làm việc. " * 4, brand_keywords="rang mới, tiện lợi, ấm áp",
+        brand_voice=str({"personality": ["ấm áp", "tự tin"], "dos": ["nói ngắn"], "donts": ["phóng đại"]}),
+        persona_name="Minh, 29, lập trình viên", persona_goals="Tập trung làm việc, ít ra ngoài. " * 3,
+        persona_pain_points="Không có thời gian mua cà phê ngon. " * 3, language="Vietnamese",
+    ),
+    "PLATFORM_VARIANT_GENERATOR_PROMPT": dict(
+        platform="linkedin", core_message=MASTER["core_message"], extended_message=MASTER["extended_message"],
+        tone_markers=", ".join(MASTER["tone_markers"]), call_to_action=MASTER["call_to_action"], char_limit=3000,
+        platform_guidelines=prompts.PLATFORM_GUIDELINES["linkedin"]["best_practices"],
+        content_format=prompts.PLATFORM_GUIDELINES["linkedin"]["format"], brand_voice="ấm áp, tự tin",
+        persona_name="Minh", persona_characteristics="Lập trình viên làm việc tại nhà. " * 4, language="Vietnamese",
+    ),
+    "ANGLE_STRATEGIST_PROMPT": dict(
+        num_angles=3, funnel_stage="Awareness", campaign_name="Mùa thu ấm áp", campaign_goal="Tăng đăng ký",
+        brand_name="Lumen Coffee", brand_voice="ấm áp", brand_keywords="rang mới, tiện lợi",
+        product_name="Gói tháng", product_usp="Rang trong 48 giờ", product_features="Giao tận nhà, đổi vị. " * 3,
+        product_benefits="Tiết kiệm thời gian. " * 3, persona_name="Minh", persona_goals="Tập trung",
+        persona_pain_points="Xếp hàng", language="Vietnamese",
+    ),
+    "EDITOR_BRAND_GUARDIAN_PROMPT": dict(brand_name="Lumen Coffee", brand_voice="ấm áp, tự tin",
+                                         brand_keywords="rang mới, tiện lợi, ấm áp"),
+}
+
+
+def legacy_parse_json_response(text: str) -> dict:
+    """The original implementation, kept as the reference for results and timing."""
+    stripped = text.strip()
+    try:
+        return json.loads(stripped)
+    except json.JSONDecodeError:
+        pass
+    if "```" in stripped:
+        for block in stripped.split("```"):
+            block = block.strip()
+            if block.startswith("json"):
+                block = block[4:].strip()
+            try:
+                return json.loads(block)
+            except json.JSONDecodeError:
+                continue
+    start = stripped.find("{")
+    end = stripped.rfind("}")
+    if start != -1 and end != -1 and end > start:
+        try:
+            return json.loads(stripped[start : end + 1])
+        except json.JSONDecodeError:
+            pass
+    raise ValueError(f"Could not parse JSON from LLM response: {stripped[:200]}")
+
+
+def _rate(fn, number: int) -> float:
+    return number / timeit.timeit(fn, number=number)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20_000)
+    parser.add_argument("--cases", help=f"comma-separated subset of: {', '.join(CASES)}")
+    args = parser.parse_args()
+    names = [n.strip() for n in args.cases.split(",")] if args.cases else list(CASES)
+
+    print(f"{'parse case':<20} {'bytes':>7} {'legacy/s':>12} {'current/s':>12} {'speedup':>8}")
+    for name in names:
+        text = CASES[name]
+        if parse_json_response(text) != legacy_parse_json_response(text):
+            raise SystemExit(f"{name}: current result differs from legacy")
+        number = max(args.number * 1000 // max(len(text), 1000), 100)
+        legacy = _rate(lambda: legacy_parse_json_response(text), number)
+        current = _rate(lambda: parse_json_response(text), number)
+        print(f"{name:<20} {len(text.encode('utf-8')):>7} {legacy:>12,.0f} {current:>12,.0f} {current / legacy:>7.2f}x")
+
+    print(f"\n{'prompt':<36} {'chars':>7} {'formats/s':>12} {'µs each':>8}")
+    for name, kwargs in PROMPT_ARGS.items():
+        template = getattr(prompts, name)
+        rate = _rate(lambda: template.format(**kwargs), args.number)
+        print(f"{name:<36} {len(template.format(**kwargs)):>7} {rate:>12,.0f} {1e6 / rate:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
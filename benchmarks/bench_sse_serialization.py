@@ -0,0 +1,61 @@
+"""Microbenchmark for SSE event serialization.
+
+Compares the original ``sse_event`` (dict merge + ``json.dumps`` with ASCII
+escapes) against the current one with each available JSON backend, per hot
+event type. Prints events/second and bytes per event.
+
+    python -m benchmarks.bench_sse_serialization [--number 200000]
+"""
+
+import argparse
+import json
+import timeit
+
+from app.utils import sse
+
+CASES = {
+    "chunk (ascii)": ("chunk", {"content": "Hello"}),
+    "chunk (vietnamese)": ("chunk", {"content": "Xin chào, đây là nội dung"}),
+    "status": ("status", {"status": "active", "agent": "Supervisor", "step": "Routing..."}),
+    "tool_end": ("tool_end", {"tool": "search", "output": "x" * 200}),
+    "done": ("done", {}),
+}
+
+
+def legacy_sse_event(event_type, **kwargs):
+    payload = {"type": event_type, **kwargs}
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+def _backends():
+    """(name, dumps) pairs; dumps is None for the legacy implementation."""
+    yield "legacy", None
+    yield "json", sse._select_dumps("json")
+    if sse.orjson is not None:
+        yield "orjson", sse._select_dumps("orjson")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=200_000)
+    args = parser.parse_args()
+
+    original = sse.dumps
+    try:
+        print(f"{'case':<20} {'backend':<8} {'events/s':>12} {'bytes':>6}")
+        for case, (event_type, kwargs) in CASES.items():
+            for name, dumps in _backends():
+                fn = legacy_sse_event if dumps is None else sse.sse_event
+                if dumps is not None:
+                    sse.dumps = dumps
+                    sse._envelopes.clear()
+                size = len(fn(event_type, **kwargs).encode("utf-8"))
+                seconds = timeit.timeit(lambda: fn(event_type, **kwargs), number=args.number)
+                print(f"{case:<20} {name:<8} {args.number / seconds:>12,.0f} {size:>6}")
+    finally:
+        sse.dumps = original
+        sse._envelopes.clear()
+
+
+if __name__ == "__main__":
+    main()
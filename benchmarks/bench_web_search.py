@@ -0,0 +1,40 @@
+"""Cold vs cached latency of the Researcher's search tool, without network.
+
+Uses the offline backend with a simulated round-trip delay.
+
+    python -m benchmarks.bench_web_search [--queries 20] [--delay 1.0]
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+from app.tools.web_search import OfflineSearchBackend, SearchCache, cached_search
+
+
+async def run(queries: int, delay: float) -> None:
+    backend = OfflineSearchBackend(delay=delay)
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SearchCache(directory, ttl=3600)
+        for label in ("cold", "cached"):
+            timings = []
+            for i in range(queries):
+                started = time.perf_counter()
+                await cached_search(f"coffee market trends {i}", backend, cache)
+                timings.append((time.perf_counter() - started) * 1000)
+            print(f"{label:<7} p50={statistics.median(timings):9.2f}ms  max={max(timings):9.2f}ms")
+    print(f"backend calls: {backend.calls} for {queries * 2} searches")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--delay", type=float, default=1.0, help="simulated backend latency in seconds")
+    args = parser.parse_args()
+    asyncio.run(run(args.queries, args.delay))
+
+
+if __name__ == "__main__":
+    main()
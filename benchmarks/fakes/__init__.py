@@ -0,0 +1,101 @@
+"""Local stand-ins for Ollama and the MCP/PocketBase server, for load testing.
+
+Run them as processes (``python -m benchmarks.fakes.ollama_server``,
+``python -m benchmarks.fakes.mcp_server``) and point the app at them with
+``OLLAMA_BASE_URL`` / ``MCP_SERVER_URL``, or start both inside a benchmark
+with ``fake_backends()``.
+"""
+
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from benchmarks.fakes.store import SEED_IDS, RecordStore
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class BackgroundServer:
+    """Serve an ASGI app with uvicorn on a daemon thread."""
+
+    def __init__(self, app, port: Optional[int] = None, host: str = "127.0.0.1"):
+        import uvicorn
+
+        self.app = app
+        self.host = host
+        self.port = port or free_port()
+        self.server = uvicorn.Server(uvicorn.Config(app, host=host, port=self.port, log_level="warning", lifespan="on"))
+        self.thread = threading.Thread(target=self.server.run, name=f"fake-server-{self.port}", daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self, timeout: float = 10.0) -> "BackgroundServer":
+        self.thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if time.monotonic() > deadline or not self.thread.is_alive():
+                raise RuntimeError(f"Fake server on port {self.port} did not start")
+            time.sleep(0.02)
+        return self
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+
+class FakeBackends:
+    """The running fakes, their shared record store and call counters."""
+
+    def __init__(self, ollama: BackgroundServer, mcp: BackgroundServer, mcp_server, store: RecordStore):
+        self.ollama = ollama
+        self.mcp = mcp
+        self.mcp_server = mcp_server
+        self.store = store
+
+    @property
+    def llm_requests(self) -> int:
+        return self.ollama.app.state.requests
+
+    @property
+    def mcp_calls(self) -> int:
+        return self.mcp_server.calls
+
+
+@contextmanager
+def fake_backends(tokens_per_sec: float = 40.0, ttft: str = "200", mcp_latency: str = "0",
+                  words: int = 60, set_env: bool = True) -> Iterator[FakeBackends]:
+    """Start a fake Ollama and a fake MCP server; optionally point this process's env at them."""
+    from benchmarks.fakes.mcp_server import create_mcp_server
+    from benchmarks.fakes.ollama_server import Responder, create_ollama_app
+
+    store = RecordStore()
+    mcp_server = create_mcp_server(store, mcp_latency)
+    ollama = BackgroundServer(create_ollama_app(Responder(words=words), tokens_per_sec, ttft)).start()
+    mcp = BackgroundServer(mcp_server.sse_app()).start()
+    previous = {key: os.environ.get(key) for key in ("OLLAMA_BASE_URL", "MCP_SERVER_URL")}
+    if set_env:
+        os.environ["OLLAMA_BASE_URL"] = ollama.url
+        os.environ["MCP_SERVER_URL"] = f"{mcp.url}/sse"
+    try:
+        yield FakeBackends(ollama, mcp, mcp_server, store)
+    finally:
+        if set_env:
+            for key, value in previous.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+        ollama.stop()
+        mcp.stop()
+
+
+__all__ = ["BackgroundServer", "FakeBackends", "SEED_IDS", "RecordStore", "fake_backends", "free_port"]
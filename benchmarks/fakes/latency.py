@@ -0,0 +1,47 @@
+"""Latency distributions for the fake servers, parsed from short specs.
+
+    "0"                   no delay
+    "200"                 fixed 200 ms
+    "uniform:100:300"     uniform between 100 and 300 ms
+    "normal:200:50"       normal, mean 200 ms, stddev 50 ms (clamped at 0)
+    "lognormal:200:0.5"   lognormal, median 200 ms, sigma 0.5 (long tail, like real LLM queues)
+"""
+
+import math
+import random
+from typing import Optional
+
+
+class Latency:
+    def __init__(self, kind: str = "fixed", a: float = 0.0, b: float = 0.0, rng: Optional[random.Random] = None):
+        if kind not in ("fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        self.kind = kind
+        self.a = a
+        self.b = b
+        self.rng = rng or random.Random(0)
+
+    @classmethod
+    def parse(cls, spec: str, rng: Optional[random.Random] = None) -> "Latency":
+        parts = str(spec).strip().split(":")
+        if len(parts) == 1:
+            return cls("fixed", float(parts[0]), rng=rng)
+        if len(parts) != 3:
+            raise ValueError(f"Bad latency spec {spec!r}; expected e.g. '200' or 'uniform:100:300'")
+        return cls(parts[0], float(parts[1]), float(parts[2]), rng)
+
+    def sample_ms(self) -> float:
+        if self.kind == "fixed":
+            return self.a
+        if self.kind == "uniform":
+            return self.rng.uniform(self.a, self.b)
+        if self.kind == "normal":
+            return max(0.0, self.rng.gauss(self.a, self.b))
+        return self.a * math.exp(self.rng.gauss(0.0, self.b)) if self.a > 0 else 0.0
+
+    def sample(self) -> float:
+        """A delay in seconds."""
+        return self.sample_ms() / 1000
+
+    def __repr__(self) -> str:
+        return f"Latency({self.kind}, {self.a}, {self.b})"
@@ -0,0 +1,119 @@
+"""Fake MCP server: the PocketBase tools the agents call, over SSE, backed by memory.
+
+Exposes the same tool names and argument shapes as the real MCP server
+(``list_collections``, ``get_collection_schema``, ``list_records``,
+``get_record``, ``create_record``, ``update_record``, ``delete_record``) and
+answers with the same text conventions ``parse_mcp_result`` expects: a JSON
+document, or a string starting with ``Error:``. ``auth_token`` is accepted
+and ignored.
+
+    python -m benchmarks.fakes.mcp_server --port 7999 --latency uniform:5:20
+    MCP_SERVER_URL=http://localhost:7999/sse uvicorn app.main:app
+"""
+
+import argparse
+import asyncio
+import json
+from typing import Any, Dict, Optional
+
+from mcp.server.fastmcp import FastMCP
+
+from benchmarks.fakes.latency import Latency
+from benchmarks.fakes.store import RecordNotFound, RecordStore
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _data(data: Any) -> Dict[str, Any]:
+    if isinstance(data, str):
+        data = json.loads(data)
+    if not isinstance(data, dict):
+        raise ValueError("data must be a JSON object")
+    return data
+
+
+def create_mcp_server(store: Optional[RecordStore] = None, latency: str = "0",
+                      host: str = "127.0.0.1", port: int = 7999) -> FastMCP:
+    """A FastMCP server over ``store``; each tool call waits a ``latency`` sample first."""
+    store = store if store is not None else RecordStore()
+    delay = Latency.parse(latency)
+    server = FastMCP("fake-pocketbase", host=host, port=port)
+    server.store = store
+    server.calls = 0
+
+    async def call(fn, *args) -> str:
+        server.calls += 1
+        seconds = delay.sample()
+        if seconds:
+            await asyncio.sleep(seconds)
+        try:
+            return _dumps(fn(*args))
+        except RecordNotFound as e:
+            return f"Error: The requested resource wasn't found ({e})."
+        except (ValueError, TypeError) as e:
+            return f"Error: {e}"
+
+    @server.tool()
+    async def list_collections(auth_token: str = "") -> str:
+        """List collection names."""
+        return await call(lambda: sorted(store.collections))
+
+    @server.tool()
+    async def get_collection_schema(collection: str, auth_token: str = "") -> str:
+        """Fields of a collection."""
+        return await call(store.schema, collection)
+
+    @server.tool()
+    async def list_records(collection: str, page: int = 1, per_page: int = 30, filter: str = "", auth_token: str = "") -> str:
+        """Page through a collection's records."""
+        return await call(store.list, collection, page, per_page, filter)
+
+    @server.tool()
+    async def get_record(collection: str, record_id: str, expand: str = "", auth_token: str = "") -> str:
+        """Fetch one record, optionally expanding relations."""
+        return await call(store.get, collection, record_id, expand)
+
+    @server.tool()
+    async def create_record(collection: str, data: Any, auth_token: str = "") -> str:
+        """Create a record from a JSON object."""
+        return await call(lambda: store.create(collection, _data(data)))
+
+    @server.tool()
+    async def update_record(collection: str, record_id: str, data: Any, auth_token: str = "") -> str:
+        """Update fields of a record."""
+        return await call(lambda: store.update(collection, record_id, _data(data)))
+
+    @server.tool()
+    async def delete_record(collection: str, record_id: str, auth_token: str = "") -> str:
+        """Delete a record."""
+        def delete():
+            store.delete(collection, record_id)
+            return {"deleted": record_id}
+
+        return await call(delete)
+
+    @server.resource("pocketbase://collections")
+    def collections_resource() -> str:
+        """All collections and their record counts."""
+        return _dumps({name: len(records) for name, records in store.collections.items()})
+
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7999)
+    parser.add_argument("--latency", default="0", help="per-call delay spec, e.g. 10 or uniform:5:20 (ms)")
+    parser.add_argument("--empty", action="store_true", help="start without the seed records")
+    args = parser.parse_args()
+
+    server = create_mcp_server(RecordStore(seed=not args.empty), args.latency, args.host, args.port)
+    print(f"Fake MCP server on http://{args.host}:{args.port}/sse (latency {args.latency} ms)")
+    server.run(transport="sse")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""Fake Ollama server: the ``/api/chat`` API with scripted or templated replies.
+
+Streams NDJSON chunks exactly like Ollama (one ``message.content`` piece per
+line, then a ``done`` line with eval counts and durations), paced by a
+time-to-first-token distribution and a tokens/sec rate, so the app can be
+load-tested with no GPU. Replies are chosen per request:
+
+1. the first matching scripted rule (``--script rules.json``, then the
+   built-in ones that route the Supervisor and write thread summaries);
+2. otherwise, if the system prompt contains a JSON output schema (all the
+   generation prompts in ``app/prompts.py`` and ``marketing_team/prompts.py``
+   do), that schema filled in with placeholder text;
+3. otherwise a few sentences of placeholder prose.
+
+A script is a JSON list of ``{"match": "<regex over all message text>",
+"content": "<text>" | {...}, "tool_calls": [{"name": ..., "arguments": {...}}]}``.
+Each whitespace-delimited word counts as one token.
+
+    python -m benchmarks.fakes.ollama_server --port 11434 --tps 40 --ttft lognormal:300:0.4
+    OLLAMA_BASE_URL=http://localhost:11434 uvicorn app.main:app
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from benchmarks.fakes.latency import Latency
+
+WORDS = (
+    "campaign brand customer message value morning coffee ritual focus growth story audience "
+    "quality routine offer trust moment simple daily energy craft community results clear"
+).split()
+
+TOKEN = re.compile(r"\s*\S+")
+
+
+class Rule:
+    """Reply with ``content`` (text, JSON value, or callable of the messages) when ``match`` hits."""
+
+    def __init__(self, match: str, content: Union[str, Any, Callable[[List[Dict[str, Any]]], str]] = "",
+                 tool_calls: Optional[List[Dict[str, Any]]] = None):
+        self.pattern = re.compile(match, re.IGNORECASE | re.DOTALL)
+        self.content = content
+        self.tool_calls = tool_calls or []
+
+    def reply(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        content = self.content(messages) if callable(self.content) else self.content
+        if not isinstance(content, str):
+            content = json.dumps(content, ensure_ascii=False)
+        calls = [{"function": {"name": c["name"], "arguments": c.get("arguments", {})}} for c in self.tool_calls]
+        return {"content": content, "tool_calls": calls}
+
+
+def route_supervisor(messages: List[Dict[str, Any]]) -> str:
+    """Send a new user turn to the Researcher, and FINISH once a worker has answered it."""
+    turns = sum(1 for m in messages if m.get("role") != "system")
+    return "Researcher" if turns % 2 == 1 else "FINISH"
+
+
+DEFAULT_RULES = [
+    Rule(r"who should act next\?", route_supervisor),
+    Rule(r"You maintain the running summary", "The user is planning a campaign; the team shared research and drafts."),
+]
+
+
+def load_rules(path: str) -> List[Rule]:
+    with open(path, encoding="utf-8") as f:
+        return [Rule(r["match"], r.get("content", ""), r.get("tool_calls")) for r in json.load(f)]
+
+
+class Responder:
+    """Picks the reply text for a conversation (deterministic for a given seed)."""
+
+    def __init__(self, rules: Iterable[Rule] = (), words: int = 60, seed: int = 0):
+        self.rules = list(rules) + DEFAULT_RULES
+        self.words = words
+        self.rng = random.Random(seed)
+
+    def reply(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        text = "\n".join(str(m.get("content") or "") for m in messages)
+        for rule in self.rules:
+            if rule.pattern.search(text):
+                return rule.reply(messages)
+        system = "\n".join(str(m.get("content") or "") for m in messages if m.get("role") == "system")
+        schema = find_json_schema(system)
+        if schema is not None:
+            filled = fill_template(schema, self.rng, self.words, requested_count(messages))
+            return {"content": json.dumps(filled, ensure_ascii=False), "tool_calls": []}
+        return {"content": self.prose(self.words), "tool_calls": []}
+
+    def prose(self, words: int) -> str:
+        picked = [self.rng.choice(WORDS) for _ in range(max(1, words))]
+        sentences = [" ".join(picked[i:i + 12]).capitalize() + "." for i in range(0, len(picked), 12)]
+        return " ".join(sentences)
+
+
+def requested_count(messages: List[Dict[str, Any]]) -> int:
+    """How many items a list schema should get: "Generate 3 ..." in the request or the prompt."""
+    for message in reversed(messages):
+        found = re.search(r"\b(?:create|generate)\s+(\d+)\b", str(message.get("content") or ""), re.IGNORECASE)
+        if found:
+            return int(found.group(1))
+    return 1
+
+
+def find_json_schema(prompt: str) -> Optional[Any]:
+    """The first JSON object/array that follows a mention of "JSON" in the prompt."""
+    decoder = json.JSONDecoder()
+    for mention in re.finditer(r"JSON", prompt):
+        start = re.search(r"[\[{]", prompt[mention.end():])
+        if not start:
+            return None
+        try:
+            value, _ = decoder.raw_decode(prompt, mention.end() + start.start())
+            return value
+        except ValueError:
+            continue
+    return None
+
+
+def fill_template(schema: Any, rng: random.Random, words: int, count: int = 1, key: str = "", index: int = 0,
+                  item: bool = False) -> Any:
+    """Replace the schema's placeholder strings with text of the right shape.
+
+    ``a|b|c`` enumerations pick an option, ``#`` strings (hashtags, colours)
+    are kept, numbers are kept, list items become single words, and a
+    top-level list is repeated ``count`` times.
+    """
+    if isinstance(schema, dict):
+        return {k: fill_template(v, rng, words, key=k, index=index) for k, v in schema.items()}
+    if isinstance(schema, list):
+        items = [v for v in schema if v != "..."] or schema
+        if count > 1 and items:
+            return [fill_template(items[0], rng, words, key=key, index=i, item=True) for i in range(count)]
+        return [fill_template(value, rng, words, key=key, index=i, item=True) for i, value in enumerate(items)]
+    if isinstance(schema, str):
+        options = schema.split("|")
+        if len(options) > 1 and all(o and len(o) < 30 for o in options):
+            return options[index % len(options)].strip()
+        if schema.startswith("#"):
+            return schema
+        if item:
+            return rng.choice(WORDS)
+        label = key.replace("_", " ") or "value"
+        return f"{label}: " + " ".join(rng.choice(WORDS) for _ in range(max(3, words // 6)))
+    return schema
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def create_ollama_app(responder: Optional[Responder] = None, tokens_per_sec: float = 40.0,
+                      ttft: str = "0", seed: int = 0) -> FastAPI:
+    """An ASGI app speaking enough of the Ollama API for ChatOllama."""
+    responder = responder or Responder(seed=seed)
+    first_token = Latency.parse(ttft, random.Random(seed))
+    app = FastAPI(title="fake-ollama")
+    app.state.requests = 0
+
+    def final_chunk(model: str, prompt_tokens: int, tokens: int, started: int, first: int) -> Dict[str, Any]:
+        end = time.perf_counter_ns()
+        return {
+            "model": model, "created_at": _now(),
+            "message": {"role": "assistant", "content": ""},
+            "done_reason": "stop", "done": True,
+            "total_duration": end - started, "load_duration": 0,
+            "prompt_eval_count": prompt_tokens, "prompt_eval_duration": first - started,
+            "eval_count": tokens, "eval_duration": end - first,
+        }
+
+    @app.get("/")
+    async def root():
+        return "Ollama is running"
+
+    @app.get("/api/version")
+    async def version():
+        return {"version": "0.0.0-fake"}
+
+    @app.get("/api/tags")
+    async def tags():
+        return {"models": [{"name": "fake", "model": "fake", "size": 0, "details": {"family": "fake"}}]}
+
+    @app.post("/api/show")
+    async def show(request: Request):
+        body = await request.json()
+        return {"modelfile": "", "parameters": "", "template": "", "details": {"family": "fake"},
+                "model_info": {}, "capabilities": ["completion", "tools"], "model": body.get("model", "fake")}
+
+    @app.post("/api/chat")
+    async def chat(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        model = body.get("model", "fake")
+        messages = body.get("messages") or []
+        if not messages:
+            # Ollama treats an empty chat as "load the model" (used by the app's warm-up).
+            return JSONResponse({"model": model, "created_at": _now(), "message": {"role": "assistant", "content": ""},
+                                 "done_reason": "load", "done": True})
+        reply = responder.reply(messages)
+        pieces = TOKEN.findall(reply["content"]) or [""]
+        prompt_tokens = sum(len(TOKEN.findall(str(m.get("content") or ""))) for m in messages)
+        interval = 1 / tokens_per_sec if tokens_per_sec > 0 else 0.0
+        started = time.perf_counter_ns()
+
+        if body.get("stream", True) is False:
+            await asyncio.sleep(first_token.sample() + interval * len(pieces))
+            chunk = final_chunk(model, prompt_tokens, len(pieces), started, started)
+            chunk["message"] = {"role": "assistant", "content": reply["content"], "tool_calls": reply["tool_calls"]}
+            return JSONResponse(chunk)
+
+        async def stream():
+            await asyncio.sleep(first_token.sample())
+            first = time.perf_counter_ns()
+            t0 = time.perf_counter()
+            for i, piece in enumerate(pieces):
+                # Sleep to a schedule rather than per token so the rate holds at high tps.
+                delay = t0 + i * interval - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                message = {"role": "assistant", "content": piece}
+                if i == len(pieces) - 1 and reply["tool_calls"]:
+                    message["tool_calls"] = reply["tool_calls"]
+                yield json.dumps({"model": model, "created_at": _now(), "message": message, "done": False}) + "\n"
+            yield json.dumps(final_chunk(model, prompt_tokens, len(pieces), started, first)) + "\n"
+
+        return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--tps", type=float, default=40.0, help="tokens per second per stream (0 = no pacing)")
+    parser.add_argument("--ttft", default="200", help="time-to-first-token spec in ms, e.g. 200 or lognormal:300:0.4")
+    parser.add_argument("--words", type=int, default=60, help="length of templated/prose replies")
+    parser.add_argument("--script", help="JSON list of scripted rules, tried before the built-in ones")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    responder = Responder(load_rules(args.script) if args.script else (), args.words, args.seed)
+    app = create_ollama_app(responder, args.tps, args.ttft, args.seed)
+    print(f"Fake Ollama on http://{args.host}:{args.port} ({args.tps} tok/s, ttft {args.ttft} ms)")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
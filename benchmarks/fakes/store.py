@@ -0,0 +1,204 @@
+"""In-memory, PocketBase-shaped record store behind the fake MCP server.
+
+Records look like PocketBase's (``id``, ``collectionName``, ``created``,
+``updated`` plus fields), ``list_records`` pages like PocketBase, and
+``expand`` follows relation fields, including dotted chains such as
+``product_id.brand_id``. Only the filter forms the agents use are
+understood: ``field = 'v'``, ``!=``, ``~`` (contains), joined with ``&&``.
+"""
+
+import copy
+import itertools
+import re
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+# (collection, field) -> collection the relation points to
+RELATIONS = {
+    ("marketing_campaigns", "product_id"): "products_services",
+    ("marketing_campaigns", "worksheet_id"): "worksheets",
+    ("products_services", "brand_id"): "brand_identities",
+    ("worksheets", "brandRefs"): "brand_identities",
+    ("worksheets", "customerRefs"): "customer_personas",
+    ("master_contents", "campaign_id"): "marketing_campaigns",
+    ("platform_variants", "master_content_id"): "master_contents",
+    ("content_briefs", "campaign_id"): "marketing_campaigns",
+}
+
+SEED_IDS = {
+    "brand": "brand0000000001",
+    "persona": "persona00000001",
+    "product": "product00000001",
+    "worksheet": "worksheet000001",
+    "campaign": "campaign0000001",
+}
+
+FILTER_TERM = re.compile(r"""^\s*([\w.]+)\s*(!=|=|~)\s*(?:'([^']*)'|"([^"]*)"|(\S+))\s*$""")
+
+
+class RecordNotFound(KeyError):
+    pass
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%fZ")[:-4] + "Z"
+
+
+class RecordStore:
+    """Collections of dict records, safe to use from the server's threads."""
+
+    def __init__(self, seed: bool = True):
+        self.collections: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        if seed:
+            seed_records(self)
+
+    def _new_id(self) -> str:
+        return f"r{next(self._ids):014d}"
+
+    def create(self, collection: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        now = _now()
+        with self._lock:
+            record = {k: v for k, v in data.items() if k not in ("collectionName", "expand")}
+            record.setdefault("id", self._new_id())
+            record.update(collectionName=collection, created=now, updated=now)
+            self.collections.setdefault(collection, {})[record["id"]] = record
+            return copy.deepcopy(record)
+
+    def get(self, collection: str, record_id: str, expand: str = "") -> Dict[str, Any]:
+        with self._lock:
+            record = self.collections.get(collection, {}).get(record_id)
+            if record is None:
+                raise RecordNotFound(f"{collection}/{record_id}")
+            record = copy.deepcopy(record)
+            if expand:
+                self._expand(collection, record, [path.strip() for path in expand.split(",") if path.strip()])
+            return record
+
+    def update(self, collection: str, record_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            record = self.collections.get(collection, {}).get(record_id)
+            if record is None:
+                raise RecordNotFound(f"{collection}/{record_id}")
+            record.update({k: v for k, v in data.items() if k not in ("id", "collectionName", "created")})
+            record["updated"] = _now()
+            return copy.deepcopy(record)
+
+    def delete(self, collection: str, record_id: str) -> None:
+        with self._lock:
+            if self.collections.get(collection, {}).pop(record_id, None) is None:
+                raise RecordNotFound(f"{collection}/{record_id}")
+
+    def list(self, collection: str, page: int = 1, per_page: int = 30, filter: str = "") -> Dict[str, Any]:
+        page, per_page = max(1, int(page)), max(1, int(per_page))
+        with self._lock:
+            items = [r for r in self.collections.get(collection, {}).values() if _matches(r, filter)]
+            total = len(items)
+            window = copy.deepcopy(items[(page - 1) * per_page: page * per_page])
+        return {
+            "page": page,
+            "perPage": per_page,
+            "totalItems": total,
+            "totalPages": (total + per_page - 1) // per_page,
+            "items": window,
+        }
+
+    def schema(self, collection: str) -> Dict[str, Any]:
+        """Field names and JSON types, inferred from the records present."""
+        with self._lock:
+            fields: Dict[str, str] = {}
+            for record in self.collections.get(collection, {}).values():
+                for name, value in record.items():
+                    fields.setdefault(name, type(value).__name__)
+        relations = {field: target for (source, field), target in RELATIONS.items() if source == collection}
+        return {"name": collection, "fields": fields, "relations": relations}
+
+    def _expand(self, collection: str, record: Dict[str, Any], paths: List[str]) -> None:
+        heads: Dict[str, List[str]] = {}
+        for path in paths:
+            head, _, rest = path.partition(".")
+            heads.setdefault(head, [])
+            if rest:
+                heads[head].append(rest)
+        for field, rest in heads.items():
+            target = RELATIONS.get((collection, field))
+            value = record.get(field)
+            if not target or not value:
+                continue
+            expanded = [self._expanded(target, rid, rest) for rid in value] if isinstance(value, list) \
+                else self._expanded(target, value, rest)
+            record.setdefault("expand", {})[field] = expanded
+
+    def _expanded(self, collection: str, record_id: str, paths: List[str]) -> Optional[Dict[str, Any]]:
+        record = self.collections.get(collection, {}).get(record_id)
+        if record is None:
+            return None
+        record = copy.deepcopy(record)
+        if paths:
+            self._expand(collection, record, paths)
+        return record
+
+
+def _matches(record: Dict[str, Any], filter: str) -> bool:
+    if not filter or not filter.strip():
+        return True
+    for term in filter.split("&&"):
+        match = FILTER_TERM.match(term)
+        if not match:
+            continue  # unsupported syntax: don't filter on it
+        field, op, *values = match.groups()
+        expected = next(v for v in values if v is not None)
+        actual = record.get(field)
+        actual_text = "" if actual is None else str(actual).lower() if isinstance(actual, bool) else str(actual)
+        if op == "=" and actual_text != expected:
+            return False
+        if op == "!=" and actual_text == expected:
+            return False
+        if op == "~" and expected.lower() not in actual_text.lower():
+            return False
+    return True
+
+
+def seed_records(store: RecordStore) -> None:
+    """One brand, persona, product, worksheet and campaign with fixed ids (see SEED_IDS)."""
+    store.create("brand_identities", {
+        "id": SEED_IDS["brand"],
+        "brand_name": "Lumen Coffee",
+        "slogan": "Brewed for the early hours",
+        "mission_statement": "Bring specialty coffee to every home office.",
+        "keywords": ["craft", "warm", "focused", "sustainable", "modern"],
+        "voice_and_tone": {"personality": "warm, confident", "style": "conversational"},
+        "color_palette": ["#3B2F2F", "#C69C6D", "#F5F0E6", "#2E4A3F", "#E07A5F"],
+    })
+    store.create("customer_personas", {
+        "id": SEED_IDS["persona"],
+        "persona_name": "Remote Rachel",
+        "summary": "Remote product designer who works from home and cares about quality routines.",
+        "goals_and_motivations": ["stay focused through long days", "enjoy a small daily ritual"],
+        "pain_points_and_challenges": ["afternoon energy crash", "cafe coffee is expensive", "no time to shop"],
+    })
+    store.create("products_services", {
+        "id": SEED_IDS["product"],
+        "name": "Lumen Morning Subscription",
+        "usp": "Freshly roasted beans delivered within 48 hours of roasting",
+        "key_features": ["monthly delivery", "roast-to-door in 48h", "pause anytime"],
+        "key_benefits": ["better mornings", "saves money versus cafes", "zero effort"],
+        "brand_id": SEED_IDS["brand"],
+    })
+    store.create("worksheets", {
+        "id": SEED_IDS["worksheet"],
+        "title": "Lumen x Remote workers",
+        "content": "## Strategic Overview\nRemote workers want a reliable, affordable daily coffee ritual.",
+        "brandRefs": [SEED_IDS["brand"]],
+        "customerRefs": [SEED_IDS["persona"]],
+    })
+    store.create("marketing_campaigns", {
+        "id": SEED_IDS["campaign"],
+        "name": "Home Office Mornings",
+        "goal": "Grow subscriptions among remote workers by 20% this quarter",
+        "kpi_targets": {"strategy": {"goal": "Grow subscriptions among remote workers by 20% this quarter"}},
+        "product_id": SEED_IDS["product"],
+        "worksheet_id": SEED_IDS["worksheet"],
+    })
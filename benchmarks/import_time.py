@@ -0,0 +1,89 @@
+"""Import-time report for the app (or any module), from ``python -X importtime``.
+
+Imports the module in a fresh interpreter ``--repeat`` times, keeps the
+fastest run, and prints the total plus the heaviest modules by cumulative and
+by self time. Also lists which of the deferred heavy dependencies (LangGraph,
+the Ollama client, mcp) the import pulled in; with lazy construction none of
+them should load before the first request.
+
+    python -m benchmarks.import_time [--module app.main] [--top 20]
+    python -m benchmarks.import_time --output imports.json
+    python -m benchmarks.import_time --compare imports.json
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import Any, Dict, List, Optional
+
+from benchmarks.harness import change, environment, load_report, write_report
+
+DEFERRED = ("langgraph", "langchain_ollama", "ollama", "mcp", "langchain_community")
+
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """One entry per imported module: name, depth, self_ms, cumulative_ms."""
+    modules = []
+    for line in stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            modules.append({"name": name, "depth": (len(indent) - 1) // 2, "self_ms": int(own) / 1000,
+                            "cumulative_ms": int(cumulative) / 1000})
+    return modules
+
+
+def measure(module: str) -> Dict[str, Any]:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [os.getcwd(), os.getenv("PYTHONPATH")]))}
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True,
+                          env=env, check=True)
+    modules = parse_importtime(proc.stderr)
+    loaded = {m["name"] for m in modules}
+    return {
+        "total_ms": round(float(proc.stdout.strip().splitlines()[-1]) * 1000, 1),
+        "modules": len(modules),
+        "deferred_loaded": sorted(d for d in DEFERRED if d in loaded),
+        "top_cumulative": sorted((m for m in modules if m["depth"] <= 1 and m["name"] != module),
+                                 key=lambda m: -m["cumulative_ms"]),
+        "top_self": sorted(modules, key=lambda m: -m["self_ms"]),
+    }
+
+
+def print_report(result: Dict[str, Any], top: int, baseline: Optional[Dict[str, Any]] = None) -> None:
+    previous = (baseline or {}).get("result")
+    delta = f"  ({change(result['total_ms'], previous['total_ms'])} vs baseline)" if previous else ""
+    print(f"total {result['total_ms']:.0f} ms, {result['modules']} modules{delta}")
+    print(f"deferred dependencies loaded at import: {', '.join(result['deferred_loaded']) or 'none'}")
+    print(f"\n{'cumulative ms':>13}  direct import")
+    for m in result["top_cumulative"][:top]:
+        print(f"{m['cumulative_ms']:>13.1f}  {m['name']}")
+    print(f"\n{'self ms':>13}  module")
+    for m in result["top_self"][:top]:
+        print(f"{m['self_ms']:>13.1f}  {m['name']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters to try; the fastest is kept")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--output", help="write the result as JSON")
+    parser.add_argument("--compare", help="baseline JSON from an earlier --output to diff against")
+    args = parser.parse_args()
+
+    result = min((measure(args.module) for _ in range(args.repeat)), key=lambda r: r["total_ms"])
+    baseline = load_report(args.compare) if args.compare else None
+    print_report(result, args.top, baseline)
+    if args.output:
+        trimmed = {**result, "top_cumulative": result["top_cumulative"][:50], "top_self": result["top_self"][:50]}
+        write_report(args.output, {"benchmark": "import_time", "environment": environment(),
+                                   "settings": {"module": args.module}, "result": trimmed})
+
+
+if __name__ == "__main__":
+    main()
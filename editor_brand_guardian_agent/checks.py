@@ -0,0 +1,106 @@
+"""Deterministic brand guardian checks, run before any LLM review.
+
+These need no model: a missing call to action (``cta_missing``), brand
+keywords absent from a master (``keyword_coverage``), a variant longer than
+its platform's ``char_limit`` in ``PLATFORM_GUIDELINES`` (``length``), and
+near-duplicate copy (``duplication``, via ``app.utils.near_duplicates``):
+masters against masters, variants against the other masters' variants for
+the same platform. Flags use the guardian's schema (``type``, ``target``,
+``target_id``, ``message``); their types never overlap the LLM's
+``brand_voice``/``platform_tone`` review, which still sees every record.
+"""
+
+import json
+import os
+from typing import Any, Dict, List
+
+from app.prompts import PLATFORM_GUIDELINES
+from app.utils.near_duplicates import NearDuplicateIndex
+
+
+def _metadata(record: Dict[str, Any]) -> Dict[str, Any]:
+    metadata = record.get("metadata") or {}
+    if isinstance(metadata, str):
+        try:
+            metadata = json.loads(metadata)
+        except ValueError:
+            return {}
+    return metadata if isinstance(metadata, dict) else {}
+
+
+def _keywords(brand: Dict[str, Any]) -> List[str]:
+    keywords = brand.get("keywords") or []
+    if isinstance(keywords, str):
+        keywords = keywords.split(",")
+    return [str(k).strip() for k in keywords if str(k).strip()]
+
+
+def master_text(master: Dict[str, Any]) -> str:
+    extended = master.get("extended_message") or _metadata(master).get("extended_message", "")
+    return f"{master.get('core_message', '')}\n{extended}"
+
+
+def flag(type: str, target: str, target_id: Any, message: str) -> Dict[str, Any]:
+    return {"type": type, "target": target, "target_id": target_id, "message": message}
+
+
+def check_master(master: Dict[str, Any], keywords: List[str]) -> List[Dict[str, Any]]:
+    flags = []
+    master_id = master.get("id")
+    if not str(_metadata(master).get("call_to_action") or master.get("call_to_action") or "").strip():
+        flags.append(flag("cta_missing", "master", master_id, "Master has no call to action."))
+
+    min_keywords = int(os.getenv("GUARDIAN_MIN_KEYWORDS", "1"))
+    if keywords and min_keywords > 0:
+        text = master_text(master).casefold()
+        used = [k for k in keywords if k.casefold() in text]
+        if len(used) < min_keywords:
+            flags.append(flag("keyword_coverage", "master", master_id,
+                              f"Uses {len(used)} of the brand keywords ({', '.join(keywords)}); "
+                              f"expected at least {min_keywords}."))
+    return flags
+
+
+def check_variant(variant: Dict[str, Any]) -> List[Dict[str, Any]]:
+    flags = []
+    variant_id = variant.get("id")
+    platform = variant.get("platform") or ""
+    if not str(_metadata(variant).get("call_to_action") or "").strip():
+        flags.append(flag("cta_missing", "variant", variant_id, f"{platform} variant has no call to action."))
+
+    limit = PLATFORM_GUIDELINES.get(platform, {}).get("char_limit")
+    length = len(variant.get("adapted_copy") or "")
+    if limit and length > limit:
+        flags.append(flag("length", "variant", variant_id,
+                          f"{platform} copy is {length} characters, over the {limit} character limit."))
+    return flags
+
+
+def check_duplicates(masters: List[Dict[str, Any]], variants: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """A ``duplication`` flag on the later of each near-duplicate pair."""
+    flags = []
+    master_index = NearDuplicateIndex()
+    for master in masters:
+        for other, similarity in master_index.add(master.get("id"), master_text(master))[:1]:
+            flags.append(flag("duplication", "master", master.get("id"),
+                              f"Near-duplicate of master {other} ({similarity:.0%} similar)."))
+
+    platform_indexes: Dict[str, NearDuplicateIndex] = {}
+    for variant in variants:
+        index = platform_indexes.setdefault(variant.get("platform") or "", NearDuplicateIndex())
+        for other, similarity in index.add(variant.get("id"), variant.get("adapted_copy") or "")[:1]:
+            flags.append(flag("duplication", "variant", variant.get("id"),
+                              f"Near-duplicate of {variant.get('platform')} variant {other} ({similarity:.0%} similar)."))
+    return flags
+
+
+def run_checks(masters: List[Dict[str, Any]], variants: List[Dict[str, Any]],
+               brand: Dict[str, Any]) -> List[Dict[str, Any]]:
+    keywords = _keywords(brand)
+    flags = []
+    for master in masters:
+        flags.extend(check_master(master, keywords))
+    for variant in variants:
+        flags.extend(check_variant(variant))
+    flags.extend(check_duplicates(masters, variants))
+    return flags
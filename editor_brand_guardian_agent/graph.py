@@ -35,4 +35,4 @@ workflow.add_conditional_edges(
 )
 
 memory = MemorySaver()
-editor_brand_guardian_graph = workflow.compile(checkpointer=memory)
+editor_brand_guardian_graph = workflow.compile(checkpointer=memory, name="editor_brand_guardian")
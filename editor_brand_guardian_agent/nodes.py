@@ -1,39 +1,100 @@
+import asyncio
 import json
 import logging
-from typing import Dict, Any
+import os
+from typing import Dict, Any, List, Tuple
 
 from langchain_core.messages import HumanMessage, SystemMessage
 
-from app.core.llm_factory import get_ollama_llm
+from app.core.llm_factory import lazy_ollama_llm
+from app.core.metrics import registry
 from app.tools.mcp_bridge import execute_mcp_tool, parse_mcp_result
 from app.services.context_fetcher import fetch_campaign_context
 from app.utils.llm import parse_json_response
+from app.utils.projection import PROJECTIONS, context_tokens, project, project_context, project_section
+from app.utils.prompt_budget import messages_tokens, prompt_token_budget, render_within_budget
 from app.prompts import EDITOR_BRAND_GUARDIAN_PROMPT
 
+from .checks import run_checks
 from .state import EditorBrandGuardianState
 
 logger = logging.getLogger(__name__)
 
-llm = get_ollama_llm(temperature=0.2)
+llm = lazy_ollama_llm(temperature=0.2)
+
+TEMPLATE = "EDITOR_BRAND_GUARDIAN_PROMPT"
+REVIEW_PREFIX = "Review this content:\n"
+
+GUARDIAN_SHARDS = registry.counter("guardian_shards_total", "Brand guardian LLM review shards by status.")
+GUARDIAN_FLAGS = registry.counter("guardian_flags_total", "Brand guardian flags by type and source.")
+
+Shard = Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]
+
 
 def _serialize_content(master_contents, variants):
-    masters = []
-    for mc in master_contents:
-        masters.append({
-            "id": mc.get("id"),
-            "core_message": mc.get("core_message", ""),
-            "extended_message": mc.get("extended_message", ""),
-            "metadata": mc.get("metadata", {}),
-        })
-    variant_list = []
+    masters = project_section(TEMPLATE, "masters", list(master_contents))
+    variant_list = project_section(TEMPLATE, "variants", list(variants))
+    return json.dumps({"masters": masters, "variants": variant_list}, ensure_ascii=False)
+
+
+def _shard_content(master_contents, variants, max_tokens: int, max_items: int) -> List[Shard]:
+    """Pack content into shards of at most ``max_tokens`` (estimated, serialized)
+    and ``max_items`` records.
+
+    Each master is kept in one shard with its variants unless the group alone
+    is too large; a single record over ``max_tokens`` gets a shard of its own.
+    """
+    by_master: Dict[Any, List[Dict[str, Any]]] = {}
     for v in variants:
-        variant_list.append({
-            "id": v.get("id"),
-            "platform": v.get("platform"),
-            "adapted_copy": v.get("adapted_copy", ""),
-            "metadata": v.get("metadata", {}),
-        })
-    return json.dumps({"masters": masters, "variants": variant_list})
+        by_master.setdefault(v.get("master_content_id"), []).append(v)
+    groups = [[("masters", mc)] + [("variants", v) for v in by_master.pop(mc.get("id"), [])]
+              for mc in master_contents]
+    groups.extend([("variants", v)] for rest in by_master.values() for v in rest)
+
+    def tokens(item):
+        section, record = item
+        return context_tokens(project(record, PROJECTIONS[TEMPLATE][section])) + 1
+
+    shards: List[Shard] = []
+    current: Shard = ([], [])
+    size = count = 0
+    for group in groups:
+        sizes = [tokens(item) for item in group]
+        if count and (size + sum(sizes) > max_tokens or count + len(group) > max_items):
+            shards.append(current)
+            current, size, count = ([], []), 0, 0
+        for (section, record), item_size in zip(group, sizes):
+            if count and (size + item_size > max_tokens or count >= max_items):
+                shards.append(current)
+                current, size, count = ([], []), 0, 0
+            current[0 if section == "masters" else 1].append(record)
+            size += item_size
+            count += 1
+    if count:
+        shards.append(current)
+    return shards
+
+
+async def _review_shard(values: Dict[str, Any], shard: Shard, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    review = REVIEW_PREFIX + _serialize_content(*shard)
+    prompt_text = render_within_budget(TEMPLATE, EDITOR_BRAND_GUARDIAN_PROMPT, values, other_messages=[review])
+    retries = int(os.getenv("GUARDIAN_SHARD_RETRIES", "1"))
+    async with semaphore:
+        for attempt in range(retries + 1):
+            response = await llm.ainvoke([
+                SystemMessage(content=prompt_text),
+                HumanMessage(content=review),
+            ])
+            try:
+                results = parse_json_response(response.content)
+            except ValueError as e:
+                logger.warning(f"Editor guardian shard JSON parsing failed (attempt {attempt + 1}): {e}")
+                continue
+            if isinstance(results, dict) and isinstance(results.get("flags"), list):
+                GUARDIAN_SHARDS.inc(status="ok")
+                return results
+    GUARDIAN_SHARDS.inc(status="failed")
+    return {"_parse_error": True, "raw_text": response.content}
 
 
 async def retriever_node(state: EditorBrandGuardianState) -> Dict[str, Any]:
@@ -45,10 +106,13 @@ async def retriever_node(state: EditorBrandGuardianState) -> Dict[str, Any]:
     if errors:
         context["_errors"] = errors
 
-    return {"brand_context": context}
+    return {"brand_context": project_context(context, TEMPLATE)}
 
 
 async def validator_node(state: EditorBrandGuardianState) -> Dict[str, Any]:
+    """Deterministic checks (``checks.py``), then the LLM reviews all content in
+    bounded shards, concurrently; flags are merged, dropping LLM flags that
+    repeat a deterministic one (same type and target)."""
     print("--- [G] Editor Brand Guardian Validator Node ---")
 
     brand = state.get("brand_context", {}).get("brandIdentity", {})
@@ -63,25 +127,47 @@ async def validator_node(state: EditorBrandGuardianState) -> Dict[str, Any]:
     brand_voice_data = brand.get("voice_and_tone", brand.get("voiceAndTone", {}))
     brand_voice = str(brand_voice_data) if brand_voice_data else ""
 
-    prompt_text = EDITOR_BRAND_GUARDIAN_PROMPT.format(
+    values = dict(
         brand_name=brand.get("brand_name", brand.get("brandName", "Brand")),
         brand_voice=brand_voice,
         brand_keywords=safe_join(brand.get("keywords", [])),
     )
 
-    payload = _serialize_content(master_contents, variants)
+    # Shingling long copy is CPU-bound; keep it off the event loop.
+    flags = await asyncio.to_thread(run_checks, master_contents, variants, brand)
+    for f in flags:
+        GUARDIAN_FLAGS.inc(type=f["type"], source="checks")
 
-    response = await llm.ainvoke([
-        SystemMessage(content=prompt_text),
-        HumanMessage(content=f"Review this content:\n{payload}"),
-    ])
-
-    try:
-        results = parse_json_response(response.content)
-        return {"validation_results": results}
-    except ValueError as e:
-        logger.error(f"Editor guardian JSON parsing failed: {e}")
-        return {"validation_results": {"_parse_error": True, "raw_text": response.content}}
+    system_tokens = messages_tokens(EDITOR_BRAND_GUARDIAN_PROMPT.format(**values), REVIEW_PREFIX)
+    shards = _shard_content(
+        master_contents, variants,
+        max_tokens=max(prompt_token_budget(TEMPLATE) - system_tokens, 1),
+        max_items=int(os.getenv("GUARDIAN_SHARD_MAX_ITEMS", "12")),
+    )
+    if not shards:
+        return {"validation_results": {"flags": flags}}
+
+    semaphore = asyncio.Semaphore(int(os.getenv("GUARDIAN_MAX_CONCURRENT", "4")))
+    results = await asyncio.gather(*(_review_shard(values, shard, semaphore) for shard in shards))
+    logger.info(f"Editor guardian: {len(flags)} check flags, {len(shards)} LLM shards "
+                f"for {len(master_contents)} masters / {len(variants)} variants")
+
+    failed = [r for r in results if r.get("_parse_error")]
+    if len(failed) == len(results):
+        return {"validation_results": {"_parse_error": True, "raw_text": failed[-1]["raw_text"], "flags": flags}}
+
+    checked = {(f["type"], f["target_id"]) for f in flags}
+    seen = set()
+    for result in results:
+        for f in result.get("flags", []):
+            if not isinstance(f, dict) or (f.get("type"), f.get("target_id")) in checked:
+                continue
+            key = (f.get("type"), f.get("target_id"), f.get("message"))
+            if key not in seen:
+                seen.add(key)
+                flags.append(f)
+                GUARDIAN_FLAGS.inc(type=f.get("type", "unknown"), source="llm")
+    return {"validation_results": {"flags": flags, "shards": len(shards), "failed_shards": len(failed)}}
 
 
 async def evaluator_node(state: EditorBrandGuardianState) -> Dict[str, Any]:
@@ -0,0 +1,150 @@
+"""Keep the prompt sent to the LLM bounded as a /chat thread grows.
+
+``MarketingState.messages`` only ever grows (the checkpointer persists it per
+thread), so without compaction every agent step re-sends the whole thread.
+Before each LLM call the context is rebuilt as:
+
+    [system prompt] + [summary of older turns] + [newest messages within budget]
+
+Older turns are folded into ``state["summary"]`` by the Supervisor once the
+unsummarised history outgrows the budget, and bulky tool outputs (e.g.
+``list_records`` dumps) are truncated before they enter the agent loop.
+"""
+
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+
+from app.utils.prompt_budget import completion_reserve, context_window
+from app.utils.tokens import estimate_message_tokens, estimate_messages_tokens, estimate_tokens, message_text
+
+from .state import MarketingState
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = """You maintain the running summary of a conversation between a user and a marketing team of AI agents.
+Merge the previous summary and the new messages into one concise summary.
+Keep: the user's goals and constraints, decisions made, names and IDs of records created or updated, and open tasks.
+Drop greetings, tool call chatter and raw data dumps. Answer with the summary only."""
+
+
+def tool_schema_tokens(schemas: List[Dict[str, Any]]) -> int:
+    """Estimated prompt tokens taken by tool schemas bound to the model."""
+    return estimate_tokens(json.dumps(schemas, ensure_ascii=False)) if schemas else 0
+
+
+def context_token_budget(tool_tokens: int = 0) -> int:
+    """Tokens for system prompt, summary and recent messages.
+
+    ``CHAT_CONTEXT_TOKENS`` overrides; by default it is what is left of the
+    model's window (``prompt_budget.context_window``) after the completion
+    reserve and the ``tool_tokens`` of the bound tool schemas.
+    """
+    value = os.getenv("CHAT_CONTEXT_TOKENS")
+    if value:
+        return int(value)
+    return max(context_window() - completion_reserve() - tool_tokens, 0)
+
+
+def tool_output_max_chars() -> int:
+    return int(os.getenv("CHAT_TOOL_OUTPUT_MAX_CHARS", "4000"))
+
+
+def truncate_tool_output(message: Any, max_chars: Optional[int] = None) -> Any:
+    """Cut a ToolMessage's content to ``max_chars``, noting how much was dropped."""
+    limit = tool_output_max_chars() if max_chars is None else max_chars
+    if not isinstance(message, ToolMessage) or not isinstance(message.content, str) or len(message.content) <= limit:
+        return message
+    dropped = len(message.content) - limit
+    content = message.content[:limit] + f"\n...[truncated {dropped} characters]"
+    return message.model_copy(update={"content": content})
+
+
+def window_messages(messages: List[Any], budget: int) -> List[Any]:
+    """The newest messages whose estimated tokens fit in ``budget``.
+
+    The latest message is always kept. The window never starts with a
+    ToolMessage, whose tool call would have been cut off.
+    """
+    window: List[Any] = []
+    used = 0
+    for message in reversed(messages):
+        cost = estimate_message_tokens(message)
+        if window and used + cost > budget:
+            break
+        window.append(message)
+        used += cost
+    window.reverse()
+    while len(window) > 1 and isinstance(window[0], ToolMessage):
+        window.pop(0)
+    return window
+
+
+def unsummarized(state: MarketingState) -> List[Any]:
+    return state["messages"][state.get("summarized_count", 0):]
+
+
+def build_context(state: MarketingState, prompt: Optional[str] = None, budget: Optional[int] = None,
+                  tool_tokens: int = 0) -> List[Any]:
+    """System prompt, summary and the recent window of the thread, ready for an LLM call.
+
+    ``tool_tokens`` (schemas bound alongside) come out of the default budget.
+    """
+    budget = context_token_budget(tool_tokens) if budget is None else budget
+    head: List[Any] = [SystemMessage(content=prompt)] if prompt else []
+    if state.get("summary"):
+        head.append(SystemMessage(content=f"Summary of the earlier conversation:\n{state['summary']}"))
+    remaining = max(0, budget - estimate_messages_tokens(head))
+    return head + window_messages([truncate_tool_output(m) for m in unsummarized(state)], remaining)
+
+
+async def summarize_history(state: MarketingState, llm: Any, config: RunnableConfig,
+                            budget: Optional[int] = None) -> Dict[str, Any]:
+    """Fold older turns into the summary once unsummarised history exceeds ``budget``.
+
+    Keeps the newest half-budget of messages verbatim so summarisation runs
+    every few turns rather than on every turn. Returns state updates (or {}).
+    """
+    budget = context_token_budget() if budget is None else budget
+    pending = unsummarized(state)
+    if estimate_messages_tokens(pending) <= budget:
+        return {}
+    keep = len(window_messages(pending, budget // 2))
+    older = pending[: len(pending) - keep]
+    if not older:
+        return {}
+
+    transcript = "\n".join(f"{getattr(m, 'name', None) or m.type}: {message_text(truncate_tool_output(m))}" for m in older)
+    previous = state.get("summary") or "(none)"
+    request = [
+        SystemMessage(content=SUMMARY_PROMPT),
+        HumanMessage(content=f"Previous summary:\n{previous}\n\nNew messages:\n{transcript}"),
+    ]
+    result = await llm.ainvoke(request, config)
+    summarized_count = state.get("summarized_count", 0) + len(older)
+    logger.info(f"Summarized {len(older)} messages ({estimate_messages_tokens(older)} tokens) into the thread summary")
+    return {
+        "summary": result.content.strip(),
+        "summarized_count": summarized_count,
+        "token_usage": llm_call_usage(request, result),
+    }
+
+
+def llm_call_usage(prompt_messages: List[Any], result: Any) -> Dict[str, int]:
+    """Token counters for one LLM call: the estimate we sent, plus what the model reported."""
+    usage = {"llm_calls": 1, "estimated_prompt_tokens": estimate_messages_tokens(prompt_messages)}
+    reported = getattr(result, "usage_metadata", None) or {}
+    for key in ("input_tokens", "output_tokens"):
+        if isinstance(reported.get(key), int):
+            usage[key] = reported[key]
+    return usage
+
+
+def context_savings(state: MarketingState, context: List[Any], prompt: Optional[str] = None) -> Tuple[int, int]:
+    """(full history tokens, compacted context tokens) for logging and accounting."""
+    full = estimate_messages_tokens(state["messages"]) + (estimate_message_tokens(SystemMessage(content=prompt)) if prompt else 0)
+    return full, estimate_messages_tokens(context)
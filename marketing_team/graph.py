@@ -45,4 +45,4 @@ workflow.add_edge("ContentCreator", "Supervisor")
 
 # 4. Compile the graph
 memory = MemorySaver()
-marketing_graph = workflow.compile(checkpointer=memory)
+marketing_graph = workflow.compile(checkpointer=memory, name="marketing_team")
@@ -1,12 +1,21 @@
-from langchain_community.tools import DuckDuckGoSearchRun
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnableConfig
-from langgraph.prebuilt import ToolNode
+from langchain_core.utils.function_calling import convert_to_openai_tool
 
-from app.core.llm_factory import get_ollama_llm
+from app.core.lazy import LazyObject, resolve
+from app.core.llm_factory import lazy_ollama_llm
 from app.tools.mcp_bridge import all_tools
-
+from app.tools.web_search import search_tool
+
+from .compaction import (
+    build_context,
+    context_savings,
+    llm_call_usage,
+    summarize_history,
+    tool_schema_tokens,
+    truncate_tool_output,
+)
 from .prompts import (
     CAMPAIGN_MANAGER_PROMPT,
     CONTENT_CREATOR_PROMPT,
@@ -14,32 +23,50 @@ from .prompts import (
     STRATEGIST_PROMPT,
     SUPERVISOR_PROMPT,
 )
-from .state import MarketingState
+from .state import MarketingState, add_usage
+from .tool_executor import ConcurrentToolExecutor
 
 # --- LLM Configuration ---
-llm = get_ollama_llm(temperature=0)
+llm = lazy_ollama_llm(temperature=0)
 
 # --- Agent Nodes ---
 
 
 # --- Helper for Manual Tool Loop ---
 
-# Define the search tool
-search_tool = DuckDuckGoSearchRun()
+# (id(llm), tool names) -> (llm, llm_with_tools, tool_executor, schema tokens).
+# The llm is kept in the entry so its id cannot be reused while cached.
+_prepared_tools = {}
+
+
+def prepare_tools(tools):
+    """
+    Bind a tool set to the LLM and build its tool executor once, then reuse them.
+    The tool JSON schemas are converted here rather than on every agent step.
+    Also returns the schemas' estimated prompt tokens, which the context budget leaves room for.
+    """
+    key = (id(llm), tuple(tool.name for tool in tools))
+    entry = _prepared_tools.get(key)
+    if entry is None:
+        schemas = [convert_to_openai_tool(tool) for tool in tools]
+        entry = _prepared_tools[key] = (
+            llm, llm.bind_tools(schemas), ConcurrentToolExecutor(tools), tool_schema_tokens(schemas)
+        )
+    return entry[1], entry[2], entry[3]
+
 
 async def run_node_agent(state: MarketingState, prompt: str, name: str, config: RunnableConfig, tools=all_tools):
     """
     Runs an agent node with manual tool execution loop.
     Allows specifying custom tools for different agents.
     """
-    # 1. Bind tools to the LLM
-    llm_with_tools = llm.bind_tools(tools)
+    # 1. Bound LLM and tool executor for this specific set of tools (cached per tool set)
+    llm_with_tools, tool_executor, tool_tokens = prepare_tools(tools)
     
-    # Create a ToolNode for this specific set of tools
-    tool_executor = ToolNode(tools)
-    
-    # 2. Add system prompt to messages
-    messages = [SystemMessage(content=prompt)] + state["messages"]
+    # 2. System prompt + compacted history (summary and recent window, see compaction.py)
+    messages = build_context(state, prompt, tool_tokens=tool_tokens)
+    full_tokens, context_tokens = context_savings(state, messages, prompt)
+    usage = {"tokens_saved": full_tokens - context_tokens}
     
     # 3. Validation / Loop limit
     max_steps = 10
@@ -49,6 +76,7 @@ async def run_node_agent(state: MarketingState, prompt: str, name: str, config:
         # 4. Invoke LLM
         # IMPORTANT: Use ainvoke
         result = await llm_with_tools.ainvoke(messages, config)
+        usage = add_usage(usage, llm_call_usage(messages, result))
         messages.append(result)
         
         # 5. Check for tool calls
@@ -57,24 +85,26 @@ async def run_node_agent(state: MarketingState, prompt: str, name: str, config:
             return {
                 "messages": [
                     HumanMessage(content=result.content, name=name)
-                ]
+                ],
+                "token_usage": usage,
             }
         
-        # 6. Execute tools
-        # ToolNode expects a dict with "messages" (last message having tool_calls)
+        # 6. Execute tools (concurrently, sharing one MCP session per step)
+        # The executor expects a dict with "messages" (last message having tool_calls)
         # It returns a dict with "messages" (ToolMessages)
         tool_output = await tool_executor.ainvoke({"messages": [result]}, config)
         
-        # 7. Append tool outputs to history
+        # 7. Append tool outputs to history (bulky dumps truncated)
         for tool_msg in tool_output["messages"]:
-            messages.append(tool_msg)
+            messages.append(truncate_tool_output(tool_msg))
             
         step += 1
     
     return {
         "messages": [
             HumanMessage(content="Agent reached max steps without final answer.", name=name)
-        ]
+        ],
+        "token_usage": usage,
     }
 
 # --- Agent Nodes ---
@@ -85,9 +115,10 @@ async def strategist_node(state: MarketingState, config: RunnableConfig):
 async def campaign_manager_node(state: MarketingState, config: RunnableConfig):
     return await run_node_agent(state, CAMPAIGN_MANAGER_PROMPT, "CampaignManager", config)
 
+# Only Researcher gets the search tool
+researcher_tools = all_tools + [search_tool]
+
 async def researcher_node(state: MarketingState, config: RunnableConfig):
-    # Only Researcher gets the search tool
-    researcher_tools = all_tools + [search_tool]
     return await run_node_agent(state, RESEARCHER_PROMPT, "Researcher", config, tools=researcher_tools)
 
 async def content_creator_node(state: MarketingState, config: RunnableConfig):
@@ -103,8 +134,8 @@ options = ", ".join(members)
 # Ensure options are properly formatted in the prompt string
 next_step_prompt = f"Given the conversation above, who should act next? Select one of: {options} or FINISH."
 
-supervisor_chain = (
-    ChatPromptTemplate.from_messages(
+supervisor_chain = LazyObject(
+    lambda: ChatPromptTemplate.from_messages(
         [
             ("system", system_prompt),
             ("placeholder", "{messages}"),
@@ -114,21 +145,25 @@ supervisor_chain = (
             ),
         ]
     )
-    | llm
+    | resolve(llm),
+    "marketing_team.nodes.supervisor_chain",
 )
 
-def supervisor_node(state: MarketingState):
-    result = supervisor_chain.invoke(state)
-    next_agent = result.content.strip()
-    
-    # Simple parsing to clearer logic
-    if "Strategist" in next_agent:
-        return {"next": "Strategist"}
-    elif "CampaignManager" in next_agent:
-        return {"next": "CampaignManager"}
-    elif "Researcher" in next_agent:
-        return {"next": "Researcher"}
-    elif "ContentCreator" in next_agent:
-        return {"next": "ContentCreator"}
-    else:
-        return {"next": "FINISH"}
+def parse_route(content: str) -> str:
+    """Map the supervisor's reply to a member name, defaulting to FINISH."""
+    for member in members:
+        if member in content:
+            return member
+    return "FINISH"
+
+
+async def supervisor_node(state: MarketingState, config: RunnableConfig):
+    # Fold old turns into the thread summary when the history outgrows the budget
+    updates = await summarize_history(state, llm, config)
+    context = build_context({**state, **updates})
+
+    # ainvoke keeps the event loop free for other streams while the LLM decides.
+    result = await supervisor_chain.ainvoke({"messages": context}, config)
+    prompt_messages = [SystemMessage(content=system_prompt)] + context + [SystemMessage(content=next_step_prompt)]
+    usage = add_usage(updates.get("token_usage"), llm_call_usage(prompt_messages, result))
+    return {**updates, "next": parse_route(result.content.strip()), "token_usage": usage}
@@ -1,6 +1,15 @@
-from typing import Annotated, List, TypedDict, Union
+from typing import Annotated, Dict, List, NotRequired, TypedDict, Union
 from langgraph.graph.message import add_messages
 
+
+def add_usage(current: Dict[str, int], update: Dict[str, int]) -> Dict[str, int]:
+    """Sum token counters key by key."""
+    merged = dict(current or {})
+    for key, value in (update or {}).items():
+        merged[key] = merged.get(key, 0) + value
+    return merged
+
+
 class MarketingState(TypedDict):
     # Messages have the type "list". The `add_messages` function
     # in the annotation defines how this state key should be updated
@@ -8,3 +17,8 @@ class MarketingState(TypedDict):
     messages: Annotated[List, add_messages]
     # The next node to route to
     next: str
+    # Running summary of messages[:summarized_count] (see compaction.py)
+    summary: NotRequired[str]
+    summarized_count: NotRequired[int]
+    # Per-thread token accounting, accumulated across turns by the checkpointer
+    token_usage: NotRequired[Annotated[Dict[str, int], add_usage]]
@@ -0,0 +1,77 @@
+"""Concurrent execution of the tool calls an agent step emits.
+
+Replaces LangGraph's ToolNode in ``run_node_agent``: independent tool calls
+(e.g. several ``get_record`` lookups) run concurrently up to a per-step cap,
+and MCP-backed calls in the same step share one MCP session instead of each
+opening its own SSE connection.
+"""
+
+import asyncio
+import logging
+import os
+from contextlib import AsyncExitStack
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+
+from app.tools.mcp_bridge import all_tools, mcp_session
+
+logger = logging.getLogger(__name__)
+
+MCP_TOOL_NAMES = frozenset(tool.name for tool in all_tools)
+
+
+def tool_concurrency() -> int:
+    return int(os.getenv("AGENT_TOOL_CONCURRENCY", "4"))
+
+
+class ConcurrentToolExecutor:
+    """Run an AIMessage's tool calls concurrently; same call shape as ToolNode."""
+
+    def __init__(self, tools: List[Any], max_concurrency: Optional[int] = None):
+        self.tools_by_name = {tool.name: tool for tool in tools}
+        self.max_concurrency = max_concurrency
+
+    async def ainvoke(self, inputs: Dict[str, Any], config: Optional[RunnableConfig] = None) -> Dict[str, List[ToolMessage]]:
+        message: AIMessage = inputs["messages"][-1]
+        calls = message.tool_calls
+        limit = max(1, self.max_concurrency or tool_concurrency())
+        semaphore = asyncio.Semaphore(limit)
+
+        async def run(call):
+            async with semaphore:
+                return await self._run_call(call, config)
+
+        async with AsyncExitStack() as stack:
+            if sum(call["name"] in MCP_TOOL_NAMES for call in calls) > 1:
+                await self._share_mcp_session(stack)
+            results = await asyncio.gather(*(run(call) for call in calls))
+        return {"messages": list(results)}
+
+    async def _share_mcp_session(self, stack: AsyncExitStack) -> None:
+        try:
+            await stack.enter_async_context(mcp_session())
+        except Exception as e:
+            # Calls fall back to their own connections (and report their own errors).
+            logger.warning(f"Could not open shared MCP session: {e}")
+
+    async def _run_call(self, call: Dict[str, Any], config: Optional[RunnableConfig]) -> ToolMessage:
+        tool = self.tools_by_name.get(call["name"])
+        if tool is None:
+            available = ", ".join(self.tools_by_name)
+            return ToolMessage(
+                content=f"Error: {call['name']} is not a valid tool, try one of [{available}].",
+                name=call["name"], tool_call_id=call["id"], status="error",
+            )
+        try:
+            result = await tool.ainvoke({**call, "type": "tool_call"}, config)
+        except Exception as e:
+            logger.error(f"Tool {call['name']} failed: {e}")
+            return ToolMessage(
+                content=f"Error: {e!r}\n Please fix your mistakes.",
+                name=call["name"], tool_call_id=call["id"], status="error",
+            )
+        if isinstance(result, ToolMessage):
+            return result
+        return ToolMessage(content=str(result), name=call["name"], tool_call_id=call["id"])
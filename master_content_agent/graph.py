@@ -67,4 +67,4 @@ workflow.add_conditional_edges(
 
 # 4. Compile the graph
 memory = MemorySaver()
-master_content_graph = workflow.compile(checkpointer=memory)
+master_content_graph = workflow.compile(checkpointer=memory, name="master_content")
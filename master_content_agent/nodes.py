@@ -4,10 +4,12 @@ from typing import Dict, Any
 
 from langchain_core.messages import HumanMessage, SystemMessage
 
-from app.core.llm_factory import get_ollama_llm
+from app.core.llm_factory import lazy_ollama_llm
 from app.tools.mcp_bridge import execute_mcp_tool, parse_mcp_result
 from app.services.context_fetcher import fetch_campaign_context
 from app.utils.llm import parse_json_response
+from app.utils.projection import project_context
+from app.utils.prompt_budget import render_within_budget
 from app.prompts import MASTER_CONTENT_GENERATOR_PROMPT
 
 from .state import MasterContentState
@@ -15,7 +17,7 @@ from .state import MasterContentState
 logger = logging.getLogger(__name__)
 
 # Initialize LLM
-llm = get_ollama_llm(temperature=0.7)
+llm = lazy_ollama_llm(temperature=0.7)
 
 async def retriever_node(state: MasterContentState) -> Dict[str, Any]:
     """
@@ -31,7 +33,7 @@ async def retriever_node(state: MasterContentState) -> Dict[str, Any]:
     if errors:
         context["_errors"] = errors
 
-    return {"context_data": context}
+    return {"context_data": project_context(context, "MASTER_CONTENT_GENERATOR_PROMPT")}
 
 
 async def generator_node(state: MasterContentState) -> Dict[str, Any]:
@@ -58,7 +60,7 @@ async def generator_node(state: MasterContentState) -> Dict[str, Any]:
     brand_voice_data = brand.get("voice_and_tone", brand.get("voiceAndTone", {}))
     brand_voice = str(brand_voice_data) if brand_voice_data else ""
 
-    prompt_text = MASTER_CONTENT_GENERATOR_PROMPT.format(
+    values = dict(
         campaign_name=campaign.get("name", "Unknown Campaign"),
         campaign_goal=campaign.get("goal", ""),
         brand_name=brand.get("brand_name", brand.get("brandName", "Brand")),
@@ -71,13 +73,14 @@ async def generator_node(state: MasterContentState) -> Dict[str, Any]:
         language=language,
     )
 
+    suffix = ""
     if angle_context:
         angle_name = angle_context.get("angle_name", "")
         funnel_stage = angle_context.get("funnel_stage", "")
         psychological_angle = angle_context.get("psychological_angle", "")
         key_message_variation = angle_context.get("key_message_variation", "")
         brief = angle_context.get("brief", "")
-        prompt_text += (
+        suffix += (
             "\n\nAngle Context:\n"
             f"- Angle Name: {angle_name}\n"
             f"- Funnel Stage: {funnel_stage}\n"
@@ -89,11 +92,16 @@ async def generator_node(state: MasterContentState) -> Dict[str, Any]:
 
     # If there's feedback from a previous evaluation, append it
     if feedback and "RETRY" in feedback.upper():
-        prompt_text += f"\n\n**Previous feedback (please address this):** {feedback}"
+        suffix += f"\n\n**Previous feedback (please address this):** {feedback}"
+
+    instruction = "Generate the master content now."
+    prompt_text = render_within_budget(
+        "MASTER_CONTENT_GENERATOR_PROMPT", MASTER_CONTENT_GENERATOR_PROMPT, values, suffix, [instruction]
+    )
 
     response = await llm.ainvoke([
         SystemMessage(content=prompt_text),
-        HumanMessage(content="Generate the master content now."),
+        HumanMessage(content=instruction),
     ])
 
     # Parse the JSON from LLM response
@@ -46,4 +46,4 @@ workflow.add_conditional_edges(
 
 # 4. Compile the graph
 memory = MemorySaver()
-social_media_graph = workflow.compile(checkpointer=memory)
+social_media_graph = workflow.compile(checkpointer=memory, name="social_media_poster")
@@ -87,3 +87,105 @@ def test_generate_marketing_strategy_success(mock_strategy_gen, client: TestClie
     lines = list(response.iter_lines())
     lines = [line for line in lines if line.strip()]
     assert 'data: {"type": "thinking", "content": "Thinking..."}' in lines
+
+
+def test_chat_endpoint_resumes_with_last_event_id(client: TestClient):
+    calls = []
+
+    async def tracking_generator(*args, **kwargs):
+        calls.append(args)
+        yield "data: {\"type\": \"chunk\", \"content\": \"one\"}\n\n"
+        yield "data: {\"type\": \"chunk\", \"content\": \"two\"}\n\n"
+
+    with patch("app.main.chat_event_generator", side_effect=tracking_generator):
+        first = client.post("/chat", json={"message": "Hello", "thread_id": "t"})
+        first_id = [line for line in first.iter_lines() if line.startswith("id: ")][0][4:]
+
+        resumed = client.post("/chat", json={"message": "Hello", "thread_id": "t"},
+                              headers={"Last-Event-ID": first_id})
+        lines = [line for line in resumed.iter_lines() if line.strip()]
+
+    assert len(calls) == 1
+    assert 'data: {"type": "chunk", "content": "two"}' in lines
+    assert 'data: {"type": "chunk", "content": "one"}' not in lines
+
+
+def test_last_event_id_does_not_resume_across_endpoints_or_bodies(client: TestClient):
+    async def chat_generator(*args, **kwargs):
+        yield "data: {\"type\": \"chunk\", \"content\": \"chat secret\"}\n\n"
+        yield "data: {\"type\": \"done\"}\n\n"
+
+    with patch("app.main.chat_event_generator", side_effect=chat_generator), \
+            patch("app.main.brand_identity_event_generator", side_effect=mock_event_generator) as brand_gen:
+        first = client.post("/chat", json={"message": "Hello", "thread_id": "t"})
+        first_id = [line for line in first.iter_lines() if line.startswith("id: ")][0][4:]
+
+        other_endpoint = client.post("/generate-brand-identity", json={"worksheetId": "ws_1"},
+                                     headers={"Last-Event-ID": first_id})
+        other_lines = [line for line in other_endpoint.iter_lines() if line.strip()]
+        other_body = client.post("/chat", json={"message": "Bye", "thread_id": "t"},
+                                 headers={"Last-Event-ID": first_id})
+        body_lines = [line for line in other_body.iter_lines() if line.strip()]
+
+    assert brand_gen.call_count == 1
+    assert 'data: {"type": "thinking", "content": "Thinking..."}' in other_lines
+    assert not any("chat secret" in line for line in other_lines)
+    # same endpoint, different request: a fresh run from its first event
+    assert [line for line in body_lines if line.startswith("id: ")][0] != f"id: {first_id}"
+    assert any("chat secret" in line for line in body_lines)
+
+
+@pytest.mark.asyncio
+async def test_chat_supervisor_does_not_stall_event_loop():
+    """A slow supervisor LLM call must not block other work on the event loop."""
+    import asyncio
+    import time
+
+    import httpx
+    from langchain_core.messages import AIMessage
+
+    from app.main import app
+
+    decision = {}
+
+    async def slow_decision(*args, **kwargs):
+        decision["start"] = time.perf_counter()
+        await asyncio.sleep(0.3)
+        decision["end"] = time.perf_counter()
+        return AIMessage(content="FINISH")
+
+    def blocking_decision(*args, **kwargs):
+        decision["start"] = time.perf_counter()
+        time.sleep(0.3)
+        decision["end"] = time.perf_counter()
+        return AIMessage(content="FINISH")
+
+    supervisor_chain = MagicMock()
+    supervisor_chain.ainvoke.side_effect = slow_decision
+    supervisor_chain.invoke.side_effect = blocking_decision
+
+    stamps = []
+    stop = asyncio.Event()
+
+    async def ticker():
+        while not stop.is_set():
+            await asyncio.sleep(0.01)
+            stamps.append(time.perf_counter())
+
+    with patch("marketing_team.nodes.supervisor_chain", supervisor_chain):
+        ticks = asyncio.create_task(ticker())
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            response = await http.post("/chat", json={"message": "Hello", "thread_id": "loop_stall"})
+        stop.set()
+        await ticks
+
+    assert response.status_code == 200
+    assert '"type":"route"' in response.text and '"next":"FINISH"' in response.text
+    assert '"type":"done"' in response.text
+    supervisor_chain.invoke.assert_not_called()
+    # Only the decision window is measured, so unrelated startup work (graph
+    # compilation, imports) cannot fail the test. A call that blocks the loop
+    # lets no tick run inside the window; an awaited one lets ~30 through.
+    during = [t for t in stamps if decision["start"] < t < decision["end"]]
+    assert len(during) >= 5, f"event loop ticked only {len(during)} times during the supervisor call"
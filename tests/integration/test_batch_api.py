@@ -1,6 +1,6 @@
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch
 from app.main import app
 
 client = TestClient(app)
@@ -30,3 +30,33 @@ async def test_batch_generate_posts_endpoint():
         content = response.text
         assert 'data: {"type": "status", "step": "Generating angle briefs..."}' in content
         assert 'data: {"type": "done", "mastersCount": 1, "variantsCount": 1, "editorFlags": []}' in content
+
+
+def test_batch_job_endpoints(client: TestClient):
+    async def mock_batch_generate_event_stream(*args, **kwargs):
+        yield 'data: {"type": "status", "step": "Generating angle briefs..."}\n\n'
+        yield 'data: {"type": "done", "mastersCount": 1, "variantsCount": 1, "editorFlags": []}\n\n'
+
+    with patch("app.services.batch_jobs.batch_generate_event_stream", side_effect=mock_batch_generate_event_stream):
+        response = client.post(
+            "/batch-jobs",
+            json={
+                "campaignId": "camp1",
+                "workspaceId": "ws1",
+                "platforms": ["facebook"],
+                "numMasters": 1
+            }
+        )
+        assert response.status_code == 202
+        job_id = response.json()["jobId"]
+
+        events = client.get(f"/batch-jobs/{job_id}/events")
+        assert 'data: {"type": "done", "mastersCount": 1, "variantsCount": 1, "editorFlags": []}' in events.text
+
+        status = client.get(f"/batch-jobs/{job_id}").json()
+        assert status["status"] == "completed"
+
+        result = client.get(f"/batch-jobs/{job_id}/result").json()
+        assert result["result"]["mastersCount"] == 1
+
+    assert client.get("/batch-jobs/unknown").status_code == 404
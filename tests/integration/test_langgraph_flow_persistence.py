@@ -22,11 +22,11 @@ async def test_conditional_edges_routing():
         # invocation 2: Strategist runs (mocked)
         # invocation 3: Supervisor -> returns "FINISH"
         
-        # side_effect for supervisor chain invoke
-        mock_supervisor.invoke.side_effect = [
+        # side_effect for supervisor chain ainvoke
+        mock_supervisor.ainvoke = AsyncMock(side_effect=[
             AIMessage(content="Strategist"),
             AIMessage(content="FINISH")
-        ]
+        ])
         
         # mock worker node response
         mock_run_agent.return_value = {
@@ -72,10 +72,10 @@ async def test_state_persistence():
          patch("marketing_team.nodes.run_node_agent") as mock_run_agent:
              
         # Run 1: Supervisor -> Strategist -> Supervisor -> FINISH (to stop execution for this run)
-        mock_supervisor.invoke.side_effect = [
+        mock_supervisor.ainvoke = AsyncMock(side_effect=[
             AIMessage(content="Strategist"),
             AIMessage(content="FINISH") # Stop the first run
-        ]
+        ])
         mock_run_agent.return_value = {
             "messages": [HumanMessage(content="Strategist Output 1", name="Strategist")]
         }
@@ -100,10 +100,10 @@ async def test_state_persistence():
         # Let's reset side_effect for the next run or provide enough values initially.
         # But wait, 'ainvoke' creates a new loop? No, side_effect is on the mock object which persists in the block.
         
-        mock_supervisor.invoke.side_effect = [
+        mock_supervisor.ainvoke = AsyncMock(side_effect=[
             AIMessage(content="CampaignManager"),
             AIMessage(content="FINISH")
-        ]
+        ])
         
         mock_run_agent.return_value = {
             "messages": [HumanMessage(content="CampaignManager Output 2", name="CampaignManager")]
@@ -2,6 +2,7 @@ import pytest
 import asyncio
 from unittest.mock import patch, AsyncMock, MagicMock
 from app.services.batch_generator import batch_generate_event_stream, _generate_master_for_angle, _generate_variants_for_master
+from app.utils.sse import parse_sse_event
 
 @pytest.mark.asyncio
 async def test_batch_generate_event_stream_invalid_platforms():
@@ -115,3 +116,67 @@ async def test_generate_variants_for_master_success():
         result = await _generate_variants_for_master(master_record, platforms, "ws1", "English", semaphore)
         assert len(result) == 1
         assert result[0]["id"] == "v1"
+
+@pytest.mark.asyncio
+async def test_batch_generate_event_stream_cancels_sibling_variant_tasks_on_failure():
+    state = {"cancelled": False}
+
+    async def mock_angle_aget_state(*args, **kwargs):
+        return MagicMock(values={"generated_angles": [{"angle_name": "A1"}, {"angle_name": "A2"}]})
+
+    async def mock_gen_variants(master_record, *args, **kwargs):
+        if master_record["id"] == "m1":
+            raise ValueError("boom")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+        return []
+
+    with patch("app.services.batch_generator.angle_strategist_graph.ainvoke", new_callable=AsyncMock), \
+         patch("app.services.batch_generator.angle_strategist_graph.aget_state", new_callable=AsyncMock, side_effect=mock_angle_aget_state), \
+         patch("app.services.batch_generator._build_master_map_graph") as mock_build_master, \
+         patch("app.services.batch_generator._generate_variants_for_master", side_effect=mock_gen_variants):
+
+        mock_master_graph = MagicMock()
+        mock_master_graph.ainvoke = AsyncMock(return_value={"master_results": [
+            {"master_record": {"id": "m1"}}, {"master_record": {"id": "m2"}},
+        ]})
+        mock_build_master.return_value = mock_master_graph
+
+        events = [e async for e in batch_generate_event_stream("camp1", "ws1", "English", ["facebook"], 2)]
+        await asyncio.sleep(0)
+
+        assert "boom" in events[-1]
+        assert state["cancelled"] is True
+
+@pytest.mark.asyncio
+async def test_batch_generate_event_stream_reports_dropped_duplicate_angles():
+    message = "Lumen giúp người làm việc tại nhà tập trung suốt buổi sáng mà không cần ra quán"
+    angles = [
+        {"angle_name": "Focus", "key_message_variation": message},
+        {"angle_name": "Ritual", "key_message_variation": "Một nghi thức nhỏ mỗi sáng với hạt rang mới"},
+        {"angle_name": "Focus again", "key_message_variation": message},
+    ]
+
+    async def mock_master_ainvoke(state, *args, **kwargs):
+        return {"master_results": [{"master_record": {"id": a["angle_name"]}} for a in state["angles"]]}
+
+    with patch("app.services.batch_generator.angle_strategist_graph.ainvoke", new_callable=AsyncMock), \
+         patch("app.services.batch_generator.angle_strategist_graph.aget_state", new_callable=AsyncMock,
+               return_value=MagicMock(values={"generated_angles": angles})), \
+         patch("app.services.batch_generator._build_master_map_graph") as mock_build_master, \
+         patch("app.services.batch_generator._generate_variants_for_master", new_callable=AsyncMock, return_value=[]), \
+         patch("app.services.batch_generator.editor_brand_guardian_graph.ainvoke", new_callable=AsyncMock), \
+         patch("app.services.batch_generator.editor_brand_guardian_graph.aget_state", new_callable=AsyncMock,
+               return_value=MagicMock(values={"validation_results": {"flags": []}})):
+        mock_build_master.return_value = MagicMock(ainvoke=AsyncMock(side_effect=mock_master_ainvoke))
+
+        events = [parse_sse_event(e) async for e in batch_generate_event_stream("camp1", "ws1", "English", ["facebook"], 3)]
+
+    done = events[-1]
+    assert done["type"] == "done"
+    assert done["requestedMasters"] == 3 and done["mastersCount"] == 2
+    assert [(d["angleName"], d["duplicateOf"]) for d in done["droppedAngles"]] == [("Focus again", "Focus")]
+    assert done["droppedAngles"][0]["similarity"] >= 0.6
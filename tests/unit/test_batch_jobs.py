@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+from unittest.mock import patch
+
+from app.services.batch_jobs import BatchJobManager, JOB_CANCELLED, JOB_COMPLETED, JOB_FAILED
+from app.utils.sse import parse_sse_event, sse_event
+
+
+async def _wait_until_finished(job, timeout=1.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not job.finished:
+        assert asyncio.get_running_loop().time() < deadline, "job did not finish in time"
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_batch_job_runs_in_background_and_records_result():
+    async def mock_stream(**kwargs):
+        yield sse_event("status", status="active", agent="Batch", step="Generating angle briefs...")
+        yield sse_event("done", mastersCount=1, variantsCount=2, editorFlags=[])
+
+    manager = BatchJobManager(workers=1)
+    with patch("app.services.batch_jobs.batch_generate_event_stream", side_effect=mock_stream) as mock_gen:
+        job = await manager.submit(campaign_id="camp1", workspace_id="ws1", language="English",
+                             platforms=["facebook"], num_masters=1)
+        assert await manager.get(job.id) is job
+
+        await _wait_until_finished(job)
+
+    mock_gen.assert_called_once_with(campaign_id="camp1", workspace_id="ws1", language="English",
+                                     platforms=["facebook"], num_masters=1)
+    assert job.status == JOB_COMPLETED
+    assert job.result == {"mastersCount": 1, "variantsCount": 2, "editorFlags": []}
+    assert job.to_dict()["progress"] == {"step": "Generating angle briefs...", "eventsCount": 2}
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_batch_job_error_event_marks_job_failed():
+    async def mock_stream(**kwargs):
+        yield sse_event("error", error="Angle generation failed", step="Angle generation")
+
+    manager = BatchJobManager(workers=1)
+    with patch("app.services.batch_jobs.batch_generate_event_stream", side_effect=mock_stream):
+        job = await manager.submit(campaign_id="camp1")
+        await _wait_until_finished(job)
+
+    assert job.status == JOB_FAILED
+    assert job.error == "Angle generation failed"
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_batch_job_stream_replays_then_follows_live_events():
+    release = asyncio.Event()
+
+    async def mock_stream(**kwargs):
+        yield sse_event("status", status="active", agent="Batch", step="one")
+        await release.wait()
+        yield sse_event("done", mastersCount=1, variantsCount=1, editorFlags=[])
+
+    manager = BatchJobManager(workers=1)
+    with patch("app.services.batch_jobs.batch_generate_event_stream", side_effect=mock_stream):
+        job = await manager.submit(campaign_id="camp1")
+        while not job.events:
+            await asyncio.sleep(0.01)
+
+        async def attach():
+            return [parse_sse_event(e)["type"] async for e in manager.stream(job.id)]
+
+        reader = asyncio.create_task(attach())
+        await asyncio.sleep(0.01)
+        release.set()
+        received = await asyncio.wait_for(reader, 1.0)
+
+    assert received == ["status", "done"]
+    await manager.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_batch_job_cancel_stops_running_job_and_worker_keeps_serving():
+    async def slow_stream(**kwargs):
+        yield sse_event("status", status="active", agent="Batch", step="working")
+        await asyncio.sleep(10)
+        yield sse_event("done")
+
+    async def fast_stream(**kwargs):
+        yield sse_event("done", mastersCount=0, variantsCount=0, editorFlags=[])
+
+    manager = BatchJobManager(workers=1)
+    with patch("app.services.batch_jobs.batch_generate_event_stream", side_effect=[slow_stream(), fast_stream()]):
+        slow = await manager.submit(campaign_id="slow")
+        fast = await manager.submit(campaign_id="fast")
+        while not slow.events:
+            await asyncio.sleep(0.01)
+
+        await manager.cancel(slow.id)
+        await _wait_until_finished(slow)
+        await _wait_until_finished(fast)
+
+    assert slow.status == JOB_CANCELLED
+    assert fast.status == JOB_COMPLETED
+    await manager.shutdown()
@@ -0,0 +1,34 @@
+import json
+
+import httpx
+import pytest
+
+from benchmarks.bench_endpoints import one_request
+from benchmarks.harness import change, percentile, summarize
+
+
+def test_percentile_interpolates():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == pytest.approx(50.5)
+    assert percentile(values, 99) == pytest.approx(99.01)
+    assert percentile([], 50) is None
+    assert summarize([10.0])["p95"] == 10.0
+
+
+def test_change_reports_relative_delta():
+    assert change(110.0, 100.0) == "+10.0%"
+    assert change(None, 100.0) == "-"
+    assert change(5.0, None) == "-"
+
+
+@pytest.mark.asyncio
+async def test_one_request_times_first_event_and_done():
+    def handler(request):
+        body = "".join(f"data: {json.dumps(e)}\n\n" for e in ({"type": "chunk"}, {"type": "done"}))
+        return httpx.Response(200, text=": heartbeat\n\n" + body, headers={"content-type": "text/event-stream"})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://app") as client:
+        result = await one_request(client, "/chat", {"message": "hi"})
+
+    assert result["outcome"] == "done" and result["events"] == 2
+    assert 0 <= result["ttfe_ms"] <= result["done_ms"]
@@ -0,0 +1,129 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.tools import tool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from app.utils.prompt_budget import completion_reserve, context_window
+from app.utils.tokens import estimate_messages_tokens, estimate_tokens
+from marketing_team.compaction import (
+    build_context,
+    context_token_budget,
+    summarize_history,
+    tool_schema_tokens,
+    truncate_tool_output,
+    window_messages,
+)
+from marketing_team.state import MarketingState, add_usage
+
+
+def _turns(n, size=400):
+    return [HumanMessage(content=f"{i} " + "x" * size, name="User") for i in range(n)]
+
+
+def test_estimate_tokens_counts_utf8_bytes():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("Tiếng Việt") > estimate_tokens("Tieng Viet")
+
+
+def test_truncate_tool_output_only_touches_long_tool_messages():
+    long_output = ToolMessage(content="r" * 100, tool_call_id="call_1", name="list_records")
+    short_output = ToolMessage(content="ok", tool_call_id="call_2")
+    human = HumanMessage(content="h" * 100)
+
+    truncated = truncate_tool_output(long_output, max_chars=10)
+
+    assert truncated.content.startswith("r" * 10)
+    assert "truncated 90 characters" in truncated.content
+    assert truncated.tool_call_id == "call_1"
+    assert long_output.content == "r" * 100
+    assert truncate_tool_output(short_output, max_chars=10) is short_output
+    assert truncate_tool_output(human, max_chars=10) is human
+
+
+def test_window_keeps_newest_messages_within_budget():
+    messages = _turns(10)
+    window = window_messages(messages, budget=350)
+
+    assert window == messages[-3:]
+    assert estimate_messages_tokens(window) <= 350
+    # The latest message is kept even when it alone exceeds the budget
+    assert window_messages(messages, budget=1) == messages[-1:]
+
+
+def test_window_does_not_start_with_orphaned_tool_message():
+    call = AIMessage(content="", tool_calls=[{"name": "t", "args": {}, "id": "c1"}])
+    messages = [call, ToolMessage(content="x" * 400, tool_call_id="c1"), HumanMessage(content="next")]
+
+    window = window_messages(messages, budget=110)
+
+    assert window == messages[-1:]
+
+
+@tool
+def list_records(collection: str, filter: str = "", page: int = 1, per_page: int = 50) -> str:
+    """List records of a PocketBase collection, optionally filtered and paginated."""
+    return ""
+
+
+def test_default_budget_fits_the_model_window_with_tool_schemas(monkeypatch):
+    for name in ("CHAT_CONTEXT_TOKENS", "OLLAMA_NUM_CTX", "PROMPT_COMPLETION_RESERVE"):
+        monkeypatch.delenv(name, raising=False)
+    tool_tokens = tool_schema_tokens([convert_to_openai_tool(list_records)])
+    state: MarketingState = {"messages": _turns(40), "next": ""}
+
+    budget = context_token_budget(tool_tokens)
+    context = build_context(state, "System Prompt", tool_tokens=tool_tokens)
+
+    assert tool_tokens > 0
+    assert budget + tool_tokens + completion_reserve() == context_window() == 4096
+    assert estimate_messages_tokens(context) <= budget
+
+    monkeypatch.setenv("CHAT_CONTEXT_TOKENS", "500")
+    assert context_token_budget(tool_tokens) == 500
+
+
+def test_build_context_uses_summary_and_skips_summarized_messages():
+    messages = _turns(6, size=20)
+    state = MarketingState(messages=messages, next="", summary="User wants a coffee brand.", summarized_count=4)
+
+    context = build_context(state, "System Prompt", budget=10_000)
+
+    assert isinstance(context[0], SystemMessage) and context[0].content == "System Prompt"
+    assert "User wants a coffee brand." in context[1].content
+    assert context[2:] == messages[4:]
+
+
+@pytest.mark.asyncio
+async def test_summarize_history_is_noop_within_budget():
+    llm = MagicMock()
+    state = MarketingState(messages=_turns(2), next="")
+
+    assert await summarize_history(state, llm, {}, budget=10_000) == {}
+    llm.ainvoke.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_summarize_history_folds_older_turns():
+    llm = MagicMock()
+    llm.ainvoke = AsyncMock(return_value=AIMessage(content=" Summary so far. ",
+                                                   usage_metadata={"input_tokens": 50, "output_tokens": 5, "total_tokens": 55}))
+    state = MarketingState(messages=_turns(10), next="", summary="Earlier.", summarized_count=2)
+
+    updates = await summarize_history(state, llm, {}, budget=700)
+
+    assert updates["summary"] == "Summary so far."
+    # Half the budget (3 turns) stays verbatim; turns 2..6 are folded in
+    assert updates["summarized_count"] == 7
+    assert updates["token_usage"]["llm_calls"] == 1
+    assert updates["token_usage"]["input_tokens"] == 50
+    prompt = llm.ainvoke.call_args.args[0][1].content
+    assert "Earlier." in prompt and "2 xxx" in prompt and "7 xxx" not in prompt
+
+
+def test_add_usage_sums_counters():
+    assert add_usage({"llm_calls": 1, "input_tokens": 10}, {"llm_calls": 2, "output_tokens": 3}) == {
+        "llm_calls": 3, "input_tokens": 10, "output_tokens": 3,
+    }
+    assert add_usage(None, {"llm_calls": 1}) == {"llm_calls": 1}
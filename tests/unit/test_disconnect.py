@@ -0,0 +1,148 @@
+import asyncio
+
+import pytest
+
+from app.utils.disconnect import guard_disconnect
+
+
+class FakeRequest:
+    """Reports a disconnect once `disconnect_after` checks have been made."""
+
+    def __init__(self, disconnect_after=None):
+        self.disconnect_after = disconnect_after
+        self.checks = 0
+
+    async def is_disconnected(self):
+        self.checks += 1
+        return self.disconnect_after is not None and self.checks > self.disconnect_after
+
+
+@pytest.mark.asyncio
+async def test_guard_disconnect_passes_events_through():
+    async def events():
+        yield "data: 1\n\n"
+        yield "data: 2\n\n"
+
+    received = [e async for e in guard_disconnect(FakeRequest(), events(), poll_interval=0.01)]
+
+    assert received == ["data: 1\n\n", "data: 2\n\n"]
+
+
+@pytest.mark.asyncio
+async def test_guard_disconnect_cancels_producer_on_disconnect():
+    state = {"cancelled": False, "finished": False}
+
+    async def events():
+        yield "data: first\n\n"
+        try:
+            await asyncio.sleep(10)
+            state["finished"] = True
+            yield "data: never\n\n"
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+
+    received = [e async for e in guard_disconnect(FakeRequest(disconnect_after=1), events(), poll_interval=0.01)]
+    await asyncio.sleep(0.01)
+
+    assert received == ["data: first\n\n"]
+    assert state["cancelled"] is True
+    assert state["finished"] is False
+
+
+@pytest.mark.asyncio
+async def test_guard_disconnect_can_finish_in_background():
+    state = {"finished": False}
+
+    async def events():
+        yield "data: first\n\n"
+        await asyncio.sleep(0.05)
+        state["finished"] = True
+        yield "data: last\n\n"
+
+    received = [
+        e async for e in guard_disconnect(
+            FakeRequest(disconnect_after=1), events(), finish_in_background=True, poll_interval=0.01
+        )
+    ]
+    assert received == ["data: first\n\n"]
+
+    await asyncio.sleep(0.1)
+    assert state["finished"] is True
+
+
+@pytest.mark.asyncio
+async def test_guard_disconnect_cancels_producer_when_stream_is_closed():
+    state = {"cancelled": False}
+
+    async def events():
+        yield "data: first\n\n"
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+        yield "data: never\n\n"
+
+    stream = guard_disconnect(FakeRequest(), events(), poll_interval=0.01)
+    assert await stream.__anext__() == "data: first\n\n"
+    await stream.aclose()
+    await asyncio.sleep(0.01)
+
+    assert state["cancelled"] is True
+
+
+@pytest.mark.asyncio
+async def test_guard_disconnect_applies_backpressure_to_the_producer():
+    produced = []
+
+    async def events():
+        for i in range(100):
+            produced.append(i)
+            yield f"data: {i}\n\n"
+
+    stream = guard_disconnect(FakeRequest(), events(), poll_interval=0.01, max_buffered=4)
+    assert await stream.__anext__() == "data: 0\n\n"
+    await asyncio.sleep(0.05)  # a stalled client
+
+    assert len(produced) <= 4 + 2
+    rest = [e async for e in stream]
+    assert len(rest) == 99
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_a_producer_blocked_on_a_full_buffer():
+    state = {"closed": False, "produced": 0}
+
+    async def events():
+        try:
+            while True:
+                state["produced"] += 1
+                yield "data: x\n\n"
+        finally:
+            state["closed"] = True
+
+    stream = guard_disconnect(FakeRequest(disconnect_after=2), events(), poll_interval=0.01, max_buffered=2)
+    assert await stream.__anext__() == "data: x\n\n"
+    await asyncio.sleep(0.05)  # client stalls while the watcher sees it leave
+
+    assert state["closed"] is True and state["produced"] <= 4
+    assert [e async for e in stream] == []
+
+
+@pytest.mark.asyncio
+async def test_finish_in_background_unblocks_a_producer_on_a_full_buffer():
+    state = {"finished": False}
+
+    async def events():
+        for i in range(20):
+            yield f"data: {i}\n\n"
+        state["finished"] = True
+
+    stream = guard_disconnect(FakeRequest(disconnect_after=2), events(), finish_in_background=True,
+                              poll_interval=0.01, max_buffered=2)
+    assert await stream.__anext__() == "data: 0\n\n"
+    await asyncio.sleep(0.05)
+
+    assert state["finished"] is True
+    assert [e async for e in stream] == []
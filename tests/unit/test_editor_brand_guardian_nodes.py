@@ -1,6 +1,7 @@
+import json
 import pytest
 from unittest.mock import patch, AsyncMock
-from editor_brand_guardian_agent.nodes import validator_node
+from editor_brand_guardian_agent.nodes import _shard_content, validator_node
 from langchain_core.messages import AIMessage
 
 @pytest.mark.asyncio
@@ -9,8 +10,9 @@ async def test_validator_node_success():
         "brand_context": {
             "brandIdentity": {"brand_name": "Test Brand", "voice_and_tone": "Friendly"}
         },
-        "master_contents": [{"id": "m1", "core_message": "Test Master"}],
-        "variants": [{"id": "v1", "platform": "facebook", "adapted_copy": "Test Variant"}],
+        "master_contents": [{"id": "m1", "core_message": "Test Master", "metadata": {"call_to_action": "Buy"}}],
+        "variants": [{"id": "v1", "platform": "facebook", "adapted_copy": "Test Variant",
+                      "metadata": {"call_to_action": "Buy"}}],
         "feedback": ""
     }
 
@@ -31,7 +33,7 @@ async def test_validator_node_success():
 async def test_validator_node_parse_error():
     state = {
         "brand_context": {},
-        "master_contents": [],
+        "master_contents": [{"id": "m1", "core_message": "Test Master", "metadata": {"call_to_action": "Buy"}}],
         "variants": [],
         "feedback": ""
     }
@@ -46,3 +48,117 @@ async def test_validator_node_parse_error():
 
         assert "validation_results" in result
         assert result["validation_results"].get("_parse_error") is True
+
+
+MESSAGES = [
+    "Craft coffee keeps remote mornings focused.",
+    "Skip the cafe queue: craft beans arrive at your door.",
+    "Afternoon slump? A focused second cup beats another snack.",
+    "Roasted this week, brewed by you, craft in every sip.",
+    "Save money every month while your focused routine stays intact.",
+]
+
+
+def _master(i, **extra):
+    return {"id": f"m{i}", "core_message": MESSAGES[i],
+            "metadata": json.dumps({"call_to_action": "Subscribe"}), **extra}
+
+
+def _variant(i, master_id, platform="facebook", copy=None):
+    return {"id": f"v{i}", "master_content_id": master_id, "platform": platform,
+            "adapted_copy": copy or f"{MESSAGES[i % len(MESSAGES)]} Join us today!",
+            "metadata": json.dumps({"call_to_action": "Subscribe", "seo_title": "ignored"})}
+
+
+BRAND = {"brandIdentity": {"brand_name": "Lumen", "keywords": ["craft", "focused"]}}
+
+
+def _llm_reviewing(reply):
+    """An LLM mock that answers each review with reply(payload)."""
+    async def ainvoke(messages):
+        return AIMessage(content=reply(json.loads(messages[1].content.split("\n", 1)[1])))
+    mock_llm = AsyncMock()
+    mock_llm.ainvoke.side_effect = ainvoke
+    return mock_llm
+
+
+@pytest.mark.asyncio
+async def test_flagged_content_still_gets_the_llm_review_without_repeated_flags():
+    state = {
+        "brand_context": BRAND,
+        "master_contents": [
+            _master(1),
+            {"id": "m2", "core_message": "Coffee without the brand words.", "metadata": "{}"},
+        ],
+        "variants": [_variant(1, "m1"), _variant(2, "m1", platform="twitter", copy="x" * 300)],
+    }
+    reviewed = []
+
+    def reply(payload):
+        reviewed.extend(r["id"] for r in payload["masters"] + payload["variants"])
+        return json.dumps({"flags": [
+            {"type": "brand_voice", "target": "master", "target_id": "m2", "message": "Too formal"},
+            {"type": "cta_missing", "target": "master", "target_id": "m2", "message": "No CTA"},
+        ]})
+
+    with patch("editor_brand_guardian_agent.nodes.llm", _llm_reviewing(reply)):
+        result = await validator_node(state)
+
+    flags = [(f["type"], f["target_id"]) for f in result["validation_results"]["flags"]]
+    assert sorted(flags) == [("brand_voice", "m2"), ("cta_missing", "m2"), ("keyword_coverage", "m2"), ("length", "v2")]
+    assert sorted(reviewed) == ["m1", "m2", "v1", "v2"]
+
+
+@pytest.mark.asyncio
+async def test_llm_review_is_sharded_and_flags_are_merged(monkeypatch):
+    monkeypatch.setenv("GUARDIAN_SHARD_MAX_ITEMS", "4")
+    masters = [_master(i) for i in range(5)]
+    variants = [_variant(i, f"m{i}") for i in range(5)]
+    shards = []
+
+    def reply(payload):
+        shards.append(payload)
+        ids = [m["id"] for m in payload["masters"]]
+        return json.dumps({"flags": [{"type": "brand_voice", "target": "master", "target_id": i, "message": "Too formal"}
+                                     for i in ids] + [{"type": "duplication", "target": "master",
+                                                       "target_id": "m0", "message": "Repeats m0"}]})
+
+    with patch("editor_brand_guardian_agent.nodes.llm", _llm_reviewing(reply)):
+        result = await validator_node({"brand_context": BRAND, "master_contents": masters, "variants": variants})
+
+    assert len(shards) == 3 and all(len(s["masters"]) + len(s["variants"]) <= 4 for s in shards)
+    # each variant shares a shard with its master
+    assert all(v["id"][1:] in {m["id"][1:] for m in s["masters"]} for s in shards for v in s["variants"])
+    results = result["validation_results"]
+    assert results["shards"] == 3 and results["failed_shards"] == 0
+    assert sorted(f["target_id"] for f in results["flags"] if f["type"] == "brand_voice") == [f"m{i}" for i in range(5)]
+    assert sum(f["type"] == "duplication" for f in results["flags"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_shard_is_retried_then_skipped(monkeypatch):
+    monkeypatch.setenv("GUARDIAN_SHARD_MAX_ITEMS", "1")
+    calls = []
+
+    def reply(payload):
+        calls.append(payload["masters"][0]["id"])
+        if payload["masters"][0]["id"] == "m1":
+            return "not json"
+        return '{"flags": [{"type": "brand_voice", "target": "master", "target_id": "m0", "message": "Too formal"}]}'
+
+    with patch("editor_brand_guardian_agent.nodes.llm", _llm_reviewing(reply)):
+        result = await validator_node({"brand_context": BRAND, "master_contents": [_master(0), _master(1)],
+                                       "variants": []})
+
+    assert sorted(calls) == ["m0", "m1", "m1"]
+    results = result["validation_results"]
+    assert results["failed_shards"] == 1 and [f["target_id"] for f in results["flags"]] == ["m0"]
+
+
+def test_shards_are_bounded_by_tokens():
+    masters = [_master(i, extended_message="Cà phê rang mới mỗi sáng. " * 40) for i in range(4)]
+
+    shards = _shard_content(masters, [_variant(9, "gone")], max_tokens=400, max_items=50)
+
+    assert [len(m) for m, _ in shards] == [1, 1, 1, 1, 0] and shards[-1][1][0]["id"] == "v9"
+    assert len(_shard_content(masters, [], max_tokens=10_000, max_items=50)) == 1
@@ -0,0 +1,92 @@
+import json
+import random
+
+import httpx
+import pytest
+
+from app.prompts import ANGLE_STRATEGIST_PROMPT
+from benchmarks.fakes.latency import Latency
+from benchmarks.fakes.ollama_server import Responder, Rule, create_ollama_app, fill_template, find_json_schema
+from benchmarks.fakes.store import SEED_IDS, RecordNotFound, RecordStore
+
+
+def test_store_expands_dotted_relations():
+    store = RecordStore()
+    campaign = store.get("marketing_campaigns", SEED_IDS["campaign"], expand="product_id,product_id.brand_id,worksheet_id")
+
+    assert campaign["expand"]["worksheet_id"]["id"] == SEED_IDS["worksheet"]
+    product = campaign["expand"]["product_id"]
+    assert product["expand"]["brand_id"]["brand_name"] == "Lumen Coffee"
+    assert "expand" not in store.get("marketing_campaigns", SEED_IDS["campaign"])
+
+
+def test_store_lists_filters_and_pages():
+    store = RecordStore(seed=False)
+    for i in range(5):
+        store.create("master_contents", {"campaign_id": "c1" if i < 3 else "c2", "core_message": f"msg {i}"})
+
+    page = store.list("master_contents", page=2, per_page=2, filter="campaign_id = 'c1'")
+    assert page["totalItems"] == 3 and page["totalPages"] == 2
+    assert [r["core_message"] for r in page["items"]] == ["msg 2"]
+    assert store.list("master_contents", filter='core_message ~ "MSG 4"')["totalItems"] == 1
+
+
+def test_store_update_and_delete():
+    store = RecordStore(seed=False)
+    record = store.create("worksheets", {"title": "a"})
+    assert store.update("worksheets", record["id"], {"title": "b"})["title"] == "b"
+    store.delete("worksheets", record["id"])
+    with pytest.raises(RecordNotFound):
+        store.get("worksheets", record["id"])
+
+
+def test_latency_specs():
+    assert Latency.parse("0").sample() == 0
+    assert Latency.parse("250").sample() == 0.25
+    samples = [Latency.parse("uniform:100:300", random.Random(1)).sample_ms() for _ in range(50)]
+    assert all(100 <= s <= 300 for s in samples)
+    with pytest.raises(ValueError):
+        Latency.parse("gamma:1:2")
+
+
+def test_templated_reply_fills_the_prompt_schema():
+    prompt = ANGLE_STRATEGIST_PROMPT.format(
+        num_angles=3, funnel_stage="Awareness", campaign_name="c", campaign_goal="g", brand_name="b",
+        brand_voice="v", brand_keywords="k", product_name="p", product_usp="u", product_features="f",
+        product_benefits="b", persona_name="n", persona_goals="g", persona_pain_points="p", language="English",
+    )
+    messages = [{"role": "system", "content": prompt}, {"role": "user", "content": "Generate the angle briefs now."}]
+    angles = json.loads(Responder().reply(messages)["content"])
+
+    assert len(angles) == 3
+    assert all(a["brief"].startswith("brief: ") for a in angles)
+    assert [a["psychological_angle"] for a in angles] == ["Fear", "Emotion", "Logic"]
+
+
+def test_fill_template_keeps_numbers_and_hashtags():
+    schema = find_json_schema('Output (JSON): {"tags": ["#a", "#b"], "score": 4.5, "title": "string"}')
+    filled = fill_template(schema, random.Random(0), words=12)
+    assert filled["tags"] == ["#a", "#b"] and filled["score"] == 4.5
+    assert filled["title"].startswith("title: ")
+
+
+def test_supervisor_routes_once_then_finishes():
+    responder = Responder()
+    prompt = {"role": "system", "content": "Given the conversation above, who should act next? Select one of: ..."}
+    user = {"role": "user", "content": "hi"}
+    worker = {"role": "user", "content": "Researcher findings"}
+    assert responder.reply([user, prompt])["content"] == "Researcher"
+    assert responder.reply([user, worker, prompt])["content"] == "FINISH"
+
+
+@pytest.mark.asyncio
+async def test_fake_ollama_streams_ndjson_with_eval_counts():
+    responder = Responder([Rule("weather", "Sunny and warm today", [{"name": "lookup", "arguments": {"q": "x"}}])])
+    app = create_ollama_app(responder, tokens_per_sec=0)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://fake") as client:
+        response = await client.post("/api/chat", json={"model": "m", "messages": [{"role": "user", "content": "weather?"}]})
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert "".join(line["message"]["content"] for line in lines) == "Sunny and warm today"
+    assert lines[-2]["message"]["tool_calls"] == [{"function": {"name": "lookup", "arguments": {"q": "x"}}}]
+    assert lines[-1]["done"] is True and lines[-1]["eval_count"] == 4
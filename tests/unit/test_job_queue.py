@@ -0,0 +1,170 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from unittest.mock import patch
+
+from app.services.batch_jobs import ProcessBatchJobManager
+from app.services.batch_worker import execute_job, worker_loop
+from app.services.job_queue import (
+    JOB_CANCELLED,
+    JOB_COMPLETED,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    SQLiteJobQueue,
+)
+from app.utils.sse import sse_event
+
+
+@pytest.fixture
+def queue_path(tmp_path):
+    return str(tmp_path / "jobs.sqlite3")
+
+
+def test_claim_is_fifo_and_exclusive(queue_path):
+    queue = SQLiteJobQueue(queue_path)
+    first = queue.enqueue({"campaign_id": "c1"})
+    second = queue.enqueue({"campaign_id": "c2"})
+
+    other_process = SQLiteJobQueue(queue_path)
+    assert queue.claim("w1") == (first, {"campaign_id": "c1"})
+    assert other_process.claim("w2") == (second, {"campaign_id": "c2"})
+    assert queue.claim("w1") is None
+
+    assert queue.get(first)["status"] == JOB_RUNNING
+    assert queue.get(first)["worker"] == "w1"
+
+
+def test_request_cancel_queued_and_running(queue_path):
+    queue = SQLiteJobQueue(queue_path)
+    running = queue.enqueue({})
+    queue.claim("w1")
+    queued = queue.enqueue({})
+
+    queue.request_cancel(queued)
+    queue.request_cancel(running)
+
+    assert queue.get(queued)["status"] == JOB_CANCELLED
+    assert queue.get(running)["status"] == JOB_RUNNING
+    assert queue.cancel_requested(running) is True
+
+
+def test_fail_expired_only_fails_jobs_without_a_live_lease_and_purge_finished(queue_path):
+    queue = SQLiteJobQueue(queue_path)
+    stale = queue.enqueue({})
+    live = queue.enqueue({})
+    queue.claim("dead-worker/0")
+    SQLiteJobQueue(queue_path).claim("other-process/0")
+    queue.append_event(stale, 0, "data: {}\n\n")
+
+    time.sleep(0.05)
+    assert queue.heartbeat(live) is False
+    assert queue.fail_expired(lease_seconds=0.03) == 1
+    assert queue.get(stale)["status"] == JOB_FAILED and queue.get(stale)["error"]
+    assert queue.get(live)["status"] == JOB_RUNNING
+
+    queue.purge_finished(keep=0)
+    assert queue.get(stale) is None
+    assert queue.events_since(stale, 0) == []
+
+
+def test_fail_held_by_only_touches_that_workers_slots(queue_path):
+    queue = SQLiteJobQueue(queue_path)
+    ids = [queue.enqueue({}) for _ in range(3)]
+    for worker in ("host-1-1/0", "host-1-10/0", "host-1-1"):
+        queue.claim(worker)
+
+    assert queue.fail_held_by("host-1-1", "shut down") == 2
+    assert [queue.get(job_id)["status"] for job_id in ids] == [JOB_FAILED, JOB_RUNNING, JOB_FAILED]
+
+
+@pytest.mark.asyncio
+async def test_execute_job_writes_events_and_result(queue_path):
+    async def mock_stream(**kwargs):
+        yield sse_event("status", status="active", agent="Batch", step="Generating angle briefs...")
+        yield sse_event("done", mastersCount=2, variantsCount=4, editorFlags=[])
+
+    queue = SQLiteJobQueue(queue_path)
+    job_id = queue.enqueue({"campaign_id": "c1"})
+    queue.claim("w1")
+
+    with patch("app.services.batch_worker.batch_generate_event_stream", side_effect=mock_stream) as mock_gen:
+        status = await execute_job(queue, job_id, {"campaign_id": "c1"})
+
+    mock_gen.assert_called_once_with(campaign_id="c1")
+    job = queue.get(job_id)
+    assert status == JOB_COMPLETED
+    assert job["result"] == {"mastersCount": 2, "variantsCount": 4, "editorFlags": []}
+    assert job["step"] == "Generating angle briefs..."
+    assert [seq for seq, _ in queue.events_since(job_id, 0)] == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_execute_job_honours_cancel_request(queue_path):
+    async def slow_stream(**kwargs):
+        yield sse_event("status", status="active", agent="Batch", step="working")
+        await asyncio.sleep(10)
+        yield sse_event("done")
+
+    queue = SQLiteJobQueue(queue_path)
+    job_id = queue.enqueue({})
+    queue.claim("w1")
+
+    with patch("app.services.batch_worker.batch_generate_event_stream", side_effect=slow_stream):
+        run = asyncio.create_task(execute_job(queue, job_id, {}, poll_interval=0.01))
+        await asyncio.sleep(0.05)
+        queue.request_cancel(job_id)
+        status = await asyncio.wait_for(run, 1.0)
+
+    assert status == JOB_CANCELLED
+    assert queue.get(job_id)["status"] == JOB_CANCELLED
+
+
+@pytest.mark.asyncio
+async def test_process_manager_streams_events_written_by_worker(queue_path):
+    async def mock_stream(**kwargs):
+        yield sse_event("status", status="active", agent="Batch", step="one")
+        yield sse_event("done", mastersCount=1, variantsCount=1, editorFlags=[])
+
+    manager = ProcessBatchJobManager(queue_path=queue_path, processes=0, poll_interval=0.01)
+    job = await manager.submit(campaign_id="c1")
+    assert job.status == JOB_QUEUED
+
+    stop = asyncio.Event()
+    with patch("app.services.batch_worker.batch_generate_event_stream", side_effect=mock_stream):
+        worker = asyncio.create_task(worker_loop(queue_path, "test", poll_interval=0.01, stop=stop))
+        events = await asyncio.wait_for(
+            asyncio.ensure_future(_collect(manager.stream(job.id))), 2.0
+        )
+        stop.set()
+        await worker
+
+    assert len(events) == 2
+    finished = await manager.get(job.id)
+    assert finished.status == JOB_COMPLETED
+    assert finished.to_dict()["progress"] == {"step": "one", "eventsCount": 2}
+
+
+@pytest.mark.asyncio
+async def test_process_manager_keeps_serving_while_the_queue_is_locked(queue_path):
+    manager = ProcessBatchJobManager(queue_path=queue_path, processes=0, poll_interval=0.01)
+    job = await manager.submit(campaign_id="c1")
+
+    manager.queue._lock.acquire()  # e.g. a write waiting on SQLite's busy timeout
+    release = threading.Timer(0.5, manager.queue._lock.release)
+    release.start()
+    try:
+        lookup = asyncio.create_task(manager.get(job.id))
+        started = time.monotonic()
+        await asyncio.sleep(0.05)  # other requests on the loop still get served
+        assert time.monotonic() - started < 0.3
+        assert not lookup.done()
+        assert (await asyncio.wait_for(lookup, 2.0)).id == job.id
+    finally:
+        release.join()
+
+
+async def _collect(stream):
+    return [event async for event in stream]
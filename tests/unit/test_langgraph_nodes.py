@@ -7,7 +7,9 @@ from marketing_team.state import MarketingState
 from marketing_team.nodes import (
     run_node_agent,
     supervisor_node,
-    strategist_node
+    strategist_node,
+    researcher_tools,
+    search_tool
 )
 
 # --- Test run_node_agent ---
@@ -40,7 +42,7 @@ async def test_run_node_agent_simple_response():
 async def test_run_node_agent_with_tool_call():
     # This is a bit more complex. 
     # 1. LLM mocks returning a tool call
-    # 2. ToolNode mocks executing the tool
+    # 2. The tool executor mocks executing the tool
     # 3. LLM mocks returning final answer after tool output
     
     state = MarketingState(messages=[HumanMessage(content="Do something")], next="")
@@ -58,7 +60,7 @@ async def test_run_node_agent_with_tool_call():
     tool_output_msg = HumanMessage(content="Tool Result", name="test_tool", tool_call_id=tool_call_id)
     
     with patch("marketing_team.nodes.llm") as mock_llm, \
-         patch("marketing_team.nodes.ToolNode") as MockToolNode:
+         patch("marketing_team.nodes.ConcurrentToolExecutor") as MockExecutor:
         
         # Setup LLM chain
         mock_bound_llm = AsyncMock()
@@ -66,10 +68,10 @@ async def test_run_node_agent_with_tool_call():
         mock_bound_llm.ainvoke.side_effect = [tool_call_msg, final_response_msg]
         mock_llm.bind_tools.return_value = mock_bound_llm
         
-        # Setup ToolNode
+        # Setup tool executor
         mock_tool_executor = AsyncMock()
         mock_tool_executor.ainvoke.return_value = {"messages": [tool_output_msg]}
-        MockToolNode.return_value = mock_tool_executor
+        MockExecutor.return_value = mock_tool_executor
         
         result = await run_node_agent(state, "System Prompt", "TestAgent", config)
         
@@ -87,22 +89,26 @@ async def test_run_node_agent_with_tool_call():
 
 # --- Test supervisor_node ---
 
-def test_supervisor_node_routing():
+@pytest.mark.asyncio
+async def test_supervisor_node_routing():
     # Test routing to Strategist
     state = MarketingState(messages=[], next="")
+    config = RunnableConfig(configurable={"thread_id": "1"})
     
-    # supervisor_chain.invoke(state) returns a message with agent name
+    # supervisor_chain.ainvoke(state) returns a message with agent name
     with patch("marketing_team.nodes.supervisor_chain") as mock_chain:
-        mock_chain.invoke.return_value = AIMessage(content="Strategist")
+        mock_chain.ainvoke = AsyncMock(return_value=AIMessage(content="Strategist"))
         
-        result = supervisor_node(state)
+        result = await supervisor_node(state, config)
         assert result["next"] == "Strategist"
+        mock_chain.ainvoke.assert_awaited_once_with({"messages": []}, config)
+        mock_chain.invoke.assert_not_called()
         
     # Test routing to FINISH
     with patch("marketing_team.nodes.supervisor_chain") as mock_chain:
-        mock_chain.invoke.return_value = AIMessage(content="FINISH")
+        mock_chain.ainvoke = AsyncMock(return_value=AIMessage(content="FINISH"))
         
-        result = supervisor_node(state)
+        result = await supervisor_node(state, config)
         assert "FINISH" in result["next"] or result["next"] == "FINISH"
 
 # --- Test specific node (Strategist) ---
@@ -122,3 +128,54 @@ async def test_strategist_node_calls_run_agent():
         args, kwargs = mock_run_agent.call_args
         assert args[1] is not None # Prompt should be passed
         assert args[2] == "Strategist"
+
+
+@pytest.mark.asyncio
+async def test_run_node_agent_binds_each_tool_set_once():
+    state = MarketingState(messages=[HumanMessage(content="Hello")], next="")
+    config = RunnableConfig(configurable={"thread_id": "1"})
+
+    with patch("marketing_team.nodes.llm") as mock_llm, \
+         patch("marketing_team.nodes.ConcurrentToolExecutor") as MockExecutor:
+        mock_bound_llm = AsyncMock()
+        mock_bound_llm.ainvoke.return_value = AIMessage(content="Hi")
+        mock_llm.bind_tools.return_value = mock_bound_llm
+
+        for _ in range(3):
+            await run_node_agent(state, "System Prompt", "TestAgent", config)
+        await run_node_agent(state, "System Prompt", "Researcher", config, tools=researcher_tools)
+        await run_node_agent(state, "System Prompt", "Researcher", config, tools=researcher_tools)
+
+        assert mock_llm.bind_tools.call_count == 2
+        assert MockExecutor.call_count == 2
+        # Schemas are precomputed dicts, not converted again by bind_tools
+        schemas = mock_llm.bind_tools.call_args_list[-1].args[0]
+        assert all(isinstance(schema, dict) and schema["type"] == "function" for schema in schemas)
+        assert schemas[-1]["function"]["name"] == search_tool.name
+
+
+@pytest.mark.asyncio
+async def test_run_node_agent_truncates_tool_output_and_reports_usage(monkeypatch):
+    from langchain_core.messages import ToolMessage
+
+    monkeypatch.setenv("CHAT_TOOL_OUTPUT_MAX_CHARS", "50")
+    state = MarketingState(messages=[HumanMessage(content="List records")], next="")
+    config = RunnableConfig(configurable={"thread_id": "1"})
+    tool_call_msg = AIMessage(content="", tool_calls=[{"name": "list_records", "args": {}, "id": "call_1"}])
+
+    with patch("marketing_team.nodes.llm") as mock_llm, \
+         patch("marketing_team.nodes.ConcurrentToolExecutor") as MockExecutor:
+        mock_bound_llm = AsyncMock()
+        mock_bound_llm.ainvoke.side_effect = [tool_call_msg, AIMessage(content="Done.")]
+        mock_llm.bind_tools.return_value = mock_bound_llm
+        mock_tool_executor = AsyncMock()
+        mock_tool_executor.ainvoke.return_value = {
+            "messages": [ToolMessage(content="r" * 5000, tool_call_id="call_1", name="list_records")]
+        }
+        MockExecutor.return_value = mock_tool_executor
+
+        result = await run_node_agent(state, "System Prompt", "TestAgent", config)
+
+    tool_messages = [m for m in mock_bound_llm.ainvoke.call_args_list[1].args[0] if isinstance(m, ToolMessage)]
+    assert len(tool_messages) == 1 and len(tool_messages[0].content) < 100
+    assert result["token_usage"]["llm_calls"] == 2
@@ -8,7 +8,8 @@ from marketing_team.nodes import supervisor_node
 
 # --- Testing the Routing Logic (Supervisor) ---
 
-def test_supervisor_routing_continue_to_agent():
+@pytest.mark.asyncio
+async def test_supervisor_routing_continue_to_agent():
     """
     Test routing logic: When LLM decides on an agent, 
     the router (supervisor_node) should update state["next"] to that agent.
@@ -22,16 +23,17 @@ def test_supervisor_routing_continue_to_agent():
     # 2. Mock Supervisor LLM Chain
     with patch("marketing_team.nodes.supervisor_chain") as mock_chain:
         # Simulate LLM choosing 'Strategist'
-        mock_chain.invoke.return_value = AIMessage(content="Strategist")
+        mock_chain.ainvoke = AsyncMock(return_value=AIMessage(content="Strategist"))
         
         # 3. Execute Node
-        result = supervisor_node(state)
+        result = await supervisor_node(state, {})
         
         # 4. Assert Routing Decision
         assert result["next"] == "Strategist"
         # In the graph, this will trigger the conditional edge to 'Strategist'
 
-def test_supervisor_routing_finish():
+@pytest.mark.asyncio
+async def test_supervisor_routing_finish():
     """
     Test routing logic: When LLM decides to FINISH,
     the router should update state["next"] to FINISH (or END).
@@ -47,16 +49,17 @@ def test_supervisor_routing_finish():
     # 2. Mock Supervisor LLM Chain
     with patch("marketing_team.nodes.supervisor_chain") as mock_chain:
         # Simulate LLM choosing 'FINISH'
-        mock_chain.invoke.return_value = AIMessage(content="FINISH")
+        mock_chain.ainvoke = AsyncMock(return_value=AIMessage(content="FINISH"))
         
         # 3. Execute Node
-        result = supervisor_node(state)
+        result = await supervisor_node(state, {})
         
         # 4. Assert Routing Decision
         assert result["next"] == "FINISH"
         # In the graph, this "FINISH" maps to END
 
-def test_supervisor_routing_ambiguous_content():
+@pytest.mark.asyncio
+async def test_supervisor_routing_ambiguous_content():
     """
     Test routing logic: Robustness check. 
     If LLM returns text containing the keyword, it should still route correctly.
@@ -65,9 +68,9 @@ def test_supervisor_routing_ambiguous_content():
 
     with patch("marketing_team.nodes.supervisor_chain") as mock_chain:
         # Simulate verbose LLM output
-        mock_chain.invoke.return_value = AIMessage(content="I think the CampaignManager should handle this next.")
+        mock_chain.ainvoke = AsyncMock(return_value=AIMessage(content="I think the CampaignManager should handle this next."))
         
-        result = supervisor_node(state)
+        result = await supervisor_node(state, {})
         
         # Our logic checks `if "CampaignManager" in next_agent:`
         assert result["next"] == "CampaignManager"
@@ -0,0 +1,55 @@
+import subprocess
+import sys
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.core import lazy
+from app.core.lazy import LazyObject, is_built, resolve, warm_up
+
+
+class Graph:
+    async def ainvoke(self, inputs):
+        return "real"
+
+
+def test_builds_on_first_use_only_once():
+    calls = []
+    proxy = LazyObject(lambda: calls.append(1) or Graph(), "graph")
+
+    assert not is_built(proxy) and calls == []
+    proxy.ainvoke
+    proxy.ainvoke
+    assert calls == [1]
+    assert isinstance(resolve(proxy), Graph)
+    assert resolve("plain") == "plain"
+
+
+@pytest.mark.asyncio
+async def test_patching_an_attribute_patches_the_real_object():
+    graph = Graph()
+    proxy = LazyObject(lambda: graph, "graph")
+
+    with patch.object(proxy, "ainvoke", new_callable=AsyncMock, return_value="mocked"):
+        assert await graph.ainvoke({}) == "mocked"
+        assert await proxy.ainvoke({}) == "mocked"
+    assert await proxy.ainvoke({}) == "real"
+    assert "ainvoke" not in vars(graph)
+
+
+def test_warm_up_builds_objects_created_while_building(monkeypatch):
+    monkeypatch.setattr(lazy, "_instances", [])
+    inner = []
+    outer = LazyObject(lambda: inner.append(LazyObject(Graph, "inner")) or Graph(), "outer")
+
+    timings = warm_up()
+
+    assert set(timings) == {"outer", "inner"}
+    assert is_built(outer) and is_built(inner[0])
+
+
+def test_app_import_defers_graph_llm_and_mcp_modules():
+    code = ("import sys, app.main; "
+            "print(sorted(m for m in ('langgraph', 'langchain_ollama', 'mcp', 'agent') if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip().splitlines()[-1] == "[]"
@@ -0,0 +1,43 @@
+from unittest.mock import patch
+
+import pytest
+
+from app.utils import llm
+from app.utils.llm import parse_json_response
+from benchmarks.bench_llm_parsing import CASES, legacy_parse_json_response
+
+EDGE_CASES = [
+    '{"a": 1} and then {"b": 2}',
+    '{"a": 1}\n\nThe closing brace } is here',
+    '```\n{"a": 1}\n```',
+    "```json```",
+    'Answer:\n```json\n{"a": [1, 2]}\n```\n```json\n{"b": 2}\n```',
+    '```python\nprint(1)\n```\n{"a": "x"}',
+    "[1, 2] trailing",
+    '{"value": NaN}',
+    '{"big": 123456789012345678901234567890}',
+    "42",
+    "null",
+    "true story",
+    "   \n\t  ",
+    "no json here",
+    '{"broken": ',
+]
+
+
+@pytest.mark.parametrize("text", list(CASES.values()) + EDGE_CASES,
+                         ids=list(CASES) + [f"edge{i}" for i in range(len(EDGE_CASES))])
+def test_matches_the_original_implementation(text):
+    try:
+        expected = legacy_parse_json_response(text)
+    except ValueError:
+        with pytest.raises(ValueError, match="Could not parse JSON"):
+            parse_json_response(text)
+    else:
+        assert parse_json_response(text) == expected
+
+
+def test_trailing_prose_document_is_decoded_once():
+    text = '{"flags": []}\n\nAll clear.'
+    with patch.object(llm.json, "loads", side_effect=AssertionError("re-parsed")):
+        assert parse_json_response(text) == {"flags": []}
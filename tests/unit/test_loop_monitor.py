@@ -0,0 +1,66 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import loop_monitor
+from app.core.loop_monitor import LOOP_BLOCKED, LoopMonitor
+from app.main import app
+
+
+def _blocking_call():
+    time.sleep(0.3)
+
+
+@pytest.mark.asyncio
+async def test_records_the_stack_of_a_blocking_call():
+    blocked_before = LOOP_BLOCKED.value()
+    monitor = LoopMonitor(interval=0.02, threshold=0.1).start()
+    try:
+        await asyncio.sleep(0.05)
+        _blocking_call()
+        await asyncio.sleep(0.1)
+    finally:
+        await monitor.stop()
+
+    snapshot = monitor.snapshot()
+    assert LOOP_BLOCKED.value() == blocked_before + 1
+    assert len(snapshot["blocked"]) == 1
+    block = snapshot["blocked"][0]
+    assert block["durationSeconds"] >= 0.1
+    assert any("_blocking_call" in line for line in block["stack"])
+    assert snapshot["lagSeconds"]["max"] >= 0.2
+
+
+@pytest.mark.asyncio
+async def test_idle_loop_has_no_blocks():
+    monitor = LoopMonitor(interval=0.01, threshold=0.2).start()
+    try:
+        await asyncio.sleep(0.1)
+    finally:
+        await monitor.stop()
+
+    snapshot = monitor.snapshot()
+    assert snapshot["samples"] > 0
+    assert snapshot["blocked"] == []
+
+
+@pytest.mark.asyncio
+async def test_disabled_monitor_is_not_started(monkeypatch):
+    monkeypatch.setenv("LOOP_MONITOR_ENABLED", "0")
+    monkeypatch.setattr(loop_monitor, "_monitor", None)
+
+    assert loop_monitor.start_loop_monitor() is None
+    assert loop_monitor.loop_lag_snapshot() == {"enabled": False}
+
+
+def test_loop_lag_endpoint_requires_the_admin_token(monkeypatch):
+    client = TestClient(app)
+    monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+    assert client.get("/debug/loop-lag").status_code == 404
+
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    assert client.get("/debug/loop-lag").status_code == 401
+    assert client.get("/debug/loop-lag", headers={"X-Admin-Token": "wrong"}).status_code == 401
+    assert client.get("/debug/loop-lag", headers={"X-Admin-Token": "secret"}).status_code == 200
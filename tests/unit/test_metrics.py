@@ -0,0 +1,124 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langgraph.graph import END, START, StateGraph
+from typing import TypedDict
+
+from app.core.metrics import (
+    LLM_COMPLETION_TOKENS,
+    LLM_REQUESTS,
+    MCP_CALLS,
+    GRAPH_RUN_SECONDS,
+    NODE_SECONDS,
+    Registry,
+    install_callback_metrics,
+)
+from app.tools.mcp_bridge import execute_mcp_tool
+
+
+def test_registry_renders_prometheus_text():
+    registry = Registry()
+    calls = registry.counter("calls_total", "Calls.")
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1))
+    calls.inc(tool="get_record", collection='say "hi"')
+    calls.inc(2, tool="get_record", collection='say "hi"')
+    latency.observe(0.5, tool="x")
+
+    text = registry.render()
+
+    assert "# TYPE calls_total counter" in text
+    assert 'calls_total{collection="say \\"hi\\"",tool="get_record"} 3.0' in text
+    assert 'latency_seconds_bucket{tool="x",le="0.1"} 0.0' in text
+    assert 'latency_seconds_bucket{tool="x",le="1.0"} 1.0' in text
+    assert 'latency_seconds_bucket{tool="x",le="+Inf"} 1.0' in text
+    assert 'latency_seconds_sum{tool="x"} 0.5' in text
+    assert 'latency_seconds_count{tool="x"} 1.0' in text
+
+
+class _State(TypedDict):
+    answer: str
+
+
+@pytest.mark.asyncio
+async def test_callback_records_node_durations_and_llm_tokens():
+    install_callback_metrics()
+    llm = GenericFakeChatModel(messages=iter([
+        AIMessage(content="hello", usage_metadata={"input_tokens": 7, "output_tokens": 3, "total_tokens": 10}),
+    ]))
+
+    async def Writer(state):
+        result = await llm.ainvoke("hi")
+        return {"answer": result.content}
+
+    workflow = StateGraph(_State)
+    workflow.add_node("Writer", Writer)
+    workflow.add_edge(START, "Writer")
+    workflow.add_edge("Writer", END)
+    graph = workflow.compile(name="metrics_test")
+
+    nodes_before = NODE_SECONDS.count(graph="metrics_test", node="Writer", status="ok")
+    labels = {"model": "unknown", "node": "Writer"}
+    tokens_before = LLM_COMPLETION_TOKENS.value(**labels)
+
+    await graph.ainvoke({"answer": ""})
+
+    assert NODE_SECONDS.count(graph="metrics_test", node="Writer", status="ok") == nodes_before + 1
+    assert LLM_REQUESTS.value(status="ok", **labels) >= 1
+    assert LLM_COMPLETION_TOKENS.value(**labels) == tokens_before + 3
+
+
+@pytest.mark.asyncio
+async def test_graph_called_from_another_graphs_node_is_labelled_and_timed():
+    install_callback_metrics()
+
+    def Inner(state):
+        return {"answer": "inner"}
+
+    inner_workflow = StateGraph(_State)
+    inner_workflow.add_node("Inner", Inner)
+    inner_workflow.add_edge(START, "Inner")
+    inner_workflow.add_edge("Inner", END)
+    inner = inner_workflow.compile(name="metrics_inner")
+
+    async def Outer(state):
+        return await inner.ainvoke(state)
+
+    outer_workflow = StateGraph(_State)
+    outer_workflow.add_node("Outer", Outer)
+    outer_workflow.add_edge(START, "Outer")
+    outer_workflow.add_edge("Outer", END)
+    outer = outer_workflow.compile(name="metrics_outer")
+
+    counts = lambda: (GRAPH_RUN_SECONDS.count(graph="metrics_outer", status="ok"),
+                      GRAPH_RUN_SECONDS.count(graph="metrics_inner", status="ok"),
+                      NODE_SECONDS.count(graph="metrics_outer", node="Outer", status="ok"),
+                      NODE_SECONDS.count(graph="metrics_inner", node="Inner", status="ok"))
+    before = counts()
+
+    await outer.ainvoke({"answer": ""})
+
+    assert [after - b for after, b in zip(counts(), before)] == [1, 1, 1, 1]
+
+
+@pytest.mark.asyncio
+async def test_mcp_calls_are_counted_by_tool_and_collection():
+    session = MagicMock()
+    session.call_tool = AsyncMock(return_value=MagicMock(isError=False))
+    labels = {"tool": "list_records", "collection": "posts", "status": "ok"}
+    before = MCP_CALLS.value(**labels)
+
+    with patch("app.tools.mcp_bridge.shared_mcp_session") as shared:
+        shared.get.return_value = session
+        await execute_mcp_tool("list_records", {"collection": "posts"})
+
+    assert MCP_CALLS.value(**labels) == before + 1
+
+
+def test_metrics_endpoint(client):
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE graph_node_duration_seconds histogram" in response.text
+    assert "# TYPE sse_events_sent_total counter" in response.text
@@ -0,0 +1,81 @@
+import pytest
+from unittest.mock import patch
+
+from angle_strategist_agent.dedupe import drop_near_duplicate_angles
+from angle_strategist_agent.nodes import evaluator_node
+from app.utils import near_duplicates
+from app.utils.near_duplicates import NearDuplicateIndex, find_near_duplicates
+from editor_brand_guardian_agent.checks import check_duplicates
+
+POST = ("Một buổi sáng tập trung bắt đầu với tách cà phê Lumen rang mới, giao tận nhà trong 48 giờ "
+        "để bạn làm việc hiệu quả hơn mỗi ngày.")
+
+
+def test_near_duplicates_ignore_case_and_punctuation():
+    texts = [
+        ("a", POST),
+        ("b", "Đăng ký gói Lumen hôm nay và nhận ưu đãi tháng đầu tiên cho cả gia đình."),
+        ("c", POST.upper().replace(",", "!") + " Đăng ký ngay!"),
+        ("d", ""),
+    ]
+
+    pairs = find_near_duplicates(texts, threshold=0.6)
+
+    assert [(later, earlier) for later, earlier, _ in pairs] == [("c", "a")]
+    assert 0.6 <= pairs[0][2] < 1
+
+
+def test_lsh_only_compares_candidate_pairs():
+    texts = [(i, f"bài viết số {i} " + " ".join(f"chủ đề{i}x{j}" for j in range(30))) for i in range(200)]
+    texts.append(("copy", texts[7][1] + " thêm một câu"))
+
+    with patch.object(near_duplicates, "jaccard", wraps=near_duplicates.jaccard) as jaccard:
+        pairs = find_near_duplicates(texts, threshold=0.6)
+
+    assert [(later, earlier) for later, earlier, _ in pairs] == [("copy", 7)]
+    assert jaccard.call_count < 50  # vs 20,100 for all pairs
+
+
+def test_index_returns_best_match_first():
+    index = NearDuplicateIndex(threshold=0.4)
+    index.add("far", " ".join(POST.split()[:18]) + " cho bạn và đồng nghiệp")
+    index.add("close", POST + " Thử ngay.")
+    matches = index.add("new", POST)
+    assert [key for key, _ in matches] == ["close", "far"]
+
+
+def test_guardian_flags_duplicate_masters_and_same_platform_variants():
+    masters = [{"id": "m1", "core_message": POST}, {"id": "m2", "core_message": "Trà chiều cho cả nhóm."},
+               {"id": "m3", "core_message": POST, "metadata": '{"extended_message": "Thử ngay."}'}]
+    variants = [
+        {"id": "v1", "master_content_id": "m1", "platform": "facebook", "adapted_copy": POST},
+        {"id": "v2", "master_content_id": "m1", "platform": "linkedin", "adapted_copy": POST},
+        {"id": "v3", "master_content_id": "m2", "platform": "facebook", "adapted_copy": POST + " 🎉"},
+    ]
+
+    flags = check_duplicates(masters, variants)
+
+    assert [(f["type"], f["target"], f["target_id"]) for f in flags] == [
+        ("duplication", "master", "m3"), ("duplication", "variant", "v3")]
+    assert "m1" in flags[0]["message"] and "v1" in flags[1]["message"]
+
+
+def _angle(name, message):
+    return {"angle_name": name, "key_message_variation": message, "brief": f"Opening - {message} - Closing"}
+
+
+@pytest.mark.asyncio
+async def test_duplicate_angles_are_regenerated_once_then_dropped():
+    message = "Lumen giúp người làm việc tại nhà tập trung suốt buổi sáng mà không cần ra quán"
+    angles = [_angle("Focus", message), _angle("Ritual", "Một nghi thức nhỏ mỗi sáng với hạt rang mới"),
+              _angle("Focus again", message)]
+    state = {"generated_angles": angles, "context_data": {}, "num_angles": 3, "feedback": "Context OK. Proceed."}
+
+    first = await evaluator_node(state)
+    assert first["next_node"] == "Generator" and "brief #3 repeats brief #1" in first["feedback"]
+
+    second = await evaluator_node({**state, "feedback": first["feedback"]})
+    assert second["next_node"] == "FINISH"
+
+    distinct, duplicates = drop_near_duplicate_angles(angles)
+    assert [a["angle_name"] for a in distinct] == ["Focus", "Ritual"] and duplicates[0][:2] == (2, 0)
@@ -0,0 +1,96 @@
+import threading
+import time
+import tracemalloc
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import profiler as profiler_module
+from app.core.profiler import SamplingProfiler, capture_profile, cpu_mode_supported
+from app.main import app
+
+
+def _spin(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def _idle(stop: threading.Event):
+    stop.wait()
+
+
+def _profile(mode: str) -> str:
+    stop = threading.Event()
+    threads = [threading.Thread(target=_spin, args=(stop,), name="busy worker"),
+               threading.Thread(target=_idle, args=(stop,), name="idle")]
+    for thread in threads:
+        thread.start()
+    profiler = SamplingProfiler(interval=0.002, mode=mode).start()
+    time.sleep(0.2)
+    profiler.stop()
+    stop.set()
+    for thread in threads:
+        thread.join()
+    assert profiler.samples > 0
+    return profiler.collapsed()
+
+
+def test_wall_profile_collapses_stacks_per_thread():
+    collapsed = _profile("wall")
+    lines = collapsed.splitlines()
+    assert any(line.startswith("busy_worker;") and "_spin (test_profiler.py" in line for line in lines)
+    assert any(line.startswith("idle;") for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+@pytest.mark.skipif(not cpu_mode_supported(), reason="cpu mode needs /proc")
+def test_cpu_profile_skips_waiting_threads():
+    lines = _profile("cpu").splitlines()
+    assert any(line.startswith("busy_worker;") for line in lines)
+    assert not any(line.startswith("idle;") for line in lines)
+
+
+def test_profile_endpoint_requires_the_admin_token(monkeypatch):
+    client = TestClient(app)
+    monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+    assert client.get("/admin/profile").status_code == 404
+
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    assert client.get("/admin/profile", headers={"Authorization": "Bearer wrong"}).status_code == 401
+
+    response = client.get("/admin/profile?seconds=0.05", headers={"Authorization": "Bearer secret"})
+    assert response.status_code == 200
+    assert "attachment" in response.headers["content-disposition"]
+    assert response.text.strip()
+
+
+def test_profile_endpoint_returns_memory_diff_as_json(monkeypatch):
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    client = TestClient(app)
+    headers = {"X-Admin-Token": "secret"}
+
+    assert client.get("/admin/profile?memory=true", headers=headers).status_code == 400
+    body = client.get("/admin/profile?seconds=0.05&memory=true&format=json", headers=headers).json()
+    assert body["mode"] == "wall" and body["samples"] > 0
+    assert isinstance(body["memory"], list)
+
+
+@pytest.mark.asyncio
+async def test_capture_profile_keeps_blocking_work_off_the_event_loop(monkeypatch):
+    loop_thread = threading.get_ident()
+    ran_on = []
+
+    def off_loop(name, fn):
+        def wrapper(*args, **kwargs):
+            ran_on.append((name, threading.get_ident() != loop_thread))
+            return fn(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(tracemalloc, "take_snapshot", off_loop("snapshot", tracemalloc.take_snapshot))
+    monkeypatch.setattr(profiler_module, "memory_diff", off_loop("diff", profiler_module.memory_diff))
+    monkeypatch.setattr(SamplingProfiler, "stop", off_loop("stop", SamplingProfiler.stop))
+
+    result = await capture_profile(0.02, memory=True)
+
+    assert isinstance(result["memory"], list)
+    assert sorted(ran_on) == [("diff", True), ("snapshot", True), ("snapshot", True), ("stop", True)]
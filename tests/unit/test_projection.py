@@ -0,0 +1,95 @@
+import importlib
+import json
+
+import pytest
+from unittest.mock import AsyncMock, patch
+from langchain_core.messages import AIMessage
+
+from app.utils.projection import PROJECTION_TOKENS, project, project_context
+from editor_brand_guardian_agent.nodes import _serialize_content
+
+BRAND = {
+    "id": "b1", "collectionId": "pbc_1", "created": "2025-01-01 00:00:00.000Z", "updated": "2025-01-02 00:00:00.000Z",
+    "brand_name": "Lumen Coffee", "keywords": ["craft", "warm"], "mission_statement": "Coffee for home offices.",
+    "voice_and_tone": {"personality": "warm", "style": "conversational"},
+    "color_palette": ["#3B2F2F", "#C69C6D"], "slogan": "Brewed for the early hours",
+}
+PERSONA = {
+    "id": "p1", "created": "2025-01-01", "persona_name": "Remote Rachel", "summary": "Designer working from home.",
+    "goals_and_motivations": ["stay focused"], "pain_points_and_challenges": ["afternoon crash"],
+    "demographics": {"age": "28-35", "location": "Hà Nội"},
+}
+PRODUCT = {"id": "pr1", "name": "Lumen Morning", "usp": "Roasted 48h before delivery", "key_features": ["monthly"],
+           "key_benefits": ["better mornings"], "price": 19, "expand": {"brand_id": BRAND}}
+WORKSHEET = {"id": "w1", "title": "Lumen x Remote", "content": "## Strategic Overview\n" + "Chi tiết. " * 200}
+CAMPAIGN = {
+    "id": "c1", "name": "Home Office Mornings", "goal": "Grow subscriptions", "worksheet_id": "w1",
+    "kpi_targets": {"strategy": {"goal": "Grow 20%", "channels": ["facebook"]}, "budget": 1000},
+    "expand": {"product_id": PRODUCT, "worksheet_id": WORKSHEET},
+}
+CONTEXT = {"campaign": CAMPAIGN, "worksheet": WORKSHEET, "product": PRODUCT, "brandIdentity": BRAND,
+           "customerProfile": PERSONA}
+MASTER = {"id": "m1", "core_message": "Một buổi sáng tập trung", "campaign_id": "c1",
+          "metadata": json.dumps({"extended_message": "Cà phê rang mới", "tone_markers": ["warm"], "call_to_action": "Đăng ký",
+                                  "suggested_hashtags": ["#coffee"], "confidence_score": 0.9, "angle": {"angle_name": "A"}})}
+
+
+def test_project_keeps_id_and_declared_paths_decoding_json_strings():
+    projected = project(MASTER, ("core_message", "metadata.call_to_action", "metadata.tone_markers", "metadata.missing"))
+
+    assert projected == {"id": "m1", "core_message": "Một buổi sáng tập trung",
+                         "metadata": {"call_to_action": "Đăng ký", "tone_markers": ["warm"]}}
+    assert project([CAMPAIGN, {}], ("kpi_targets.strategy.goal",)) == [
+        {"id": "c1", "kpi_targets": {"strategy": {"goal": "Grow 20%"}}}, {}]
+
+
+def test_project_context_drops_unread_sections_and_counts_savings():
+    template = "MASTER_CONTENT_GENERATOR_PROMPT"
+    full_before = PROJECTION_TOKENS.value(template=template, stage="full")
+    projected_before = PROJECTION_TOKENS.value(template=template, stage="projected")
+
+    projected = project_context({**CONTEXT, "_errors": {"worksheet": "boom"}}, template)
+
+    assert set(projected) == {"campaign", "brandIdentity", "customerProfile", "_errors"}
+    assert projected["campaign"] == {"id": "c1", "name": "Home Office Mornings", "goal": "Grow subscriptions"}
+    assert "color_palette" not in projected["brandIdentity"] and "created" not in projected["brandIdentity"]
+    full = PROJECTION_TOKENS.value(template=template, stage="full") - full_before
+    kept = PROJECTION_TOKENS.value(template=template, stage="projected") - projected_before
+    assert 0 < kept < full / 5
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("module, template, state", [
+    ("master_content_agent.nodes", "MASTER_CONTENT_GENERATOR_PROMPT", {}),
+    ("angle_strategist_agent.nodes", "ANGLE_STRATEGIST_PROMPT", {"num_angles": 2}),
+    ("variant_generator_agent.nodes", "PLATFORM_VARIANT_GENERATOR_PROMPT",
+     {"platforms": ["facebook"], "current_platform_index": 0}),
+])
+async def test_projected_context_renders_the_same_prompt(module, template, state):
+    """The projection must keep every field the generator reads."""
+    context = {**CONTEXT, "masterContent": MASTER}
+    prompts = []
+    for context_data in (context, project_context(context, template)):
+        mock_llm = AsyncMock()
+        mock_llm.ainvoke.return_value = AIMessage(content="{}")
+        with patch(f"{module}.llm", mock_llm):
+            node_state = {**state, "context_data": context_data, "language": "English", "feedback": ""}
+            await importlib.import_module(module).generator_node(node_state)
+        prompts.append(mock_llm.ainvoke.call_args.args[0][0].content)
+
+    assert prompts[0] == prompts[1]
+
+
+def test_guardian_payload_keeps_copy_and_cta_only():
+    variant = {"id": "v1", "platform": "facebook", "adapted_copy": "Bài viết", "collectionName": "platform_variants",
+               "metadata": json.dumps({"hashtags": ["#a"], "call_to_action": "Mua ngay", "seo_title": "x" * 200,
+                                       "optimization_notes": "y" * 500})}
+
+    payload = _serialize_content([MASTER], [variant])
+
+    assert "Một buổi sáng" in payload  # not \u-escaped
+    data = json.loads(payload)
+    assert data["masters"][0]["metadata"] == {"extended_message": "Cà phê rang mới", "tone_markers": ["warm"],
+                                              "call_to_action": "Đăng ký"}
+    assert data["variants"][0] == {"id": "v1", "platform": "facebook", "adapted_copy": "Bài viết",
+                                   "metadata": {"call_to_action": "Mua ngay", "hashtags": ["#a"]}}
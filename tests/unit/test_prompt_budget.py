@@ -0,0 +1,100 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from langchain_core.messages import AIMessage
+
+from app.utils.prompt_budget import (
+    PROMPT_OVER_BUDGET,
+    PROMPT_SECTIONS_TRIMMED,
+    PROMPT_TOKENS,
+    TRIM_ORDER,
+    messages_tokens,
+    prompt_token_budget,
+    render_within_budget,
+    truncate_to_tokens,
+)
+from master_content_agent.nodes import generator_node
+
+TEMPLATE = "TEST_PROMPT"
+PROMPT = "Campaign: {campaign}\nNotes: {notes}\nExtra: {extra}\n"
+
+
+@pytest.fixture
+def trim_order(monkeypatch):
+    monkeypatch.setitem(TRIM_ORDER, TEMPLATE, ("extra", "notes"))
+
+
+def test_budget_precedence(monkeypatch):
+    monkeypatch.delenv("PROMPT_TOKEN_BUDGET", raising=False)
+    monkeypatch.setenv("OLLAMA_NUM_CTX", "8192")
+    monkeypatch.setenv("PROMPT_COMPLETION_RESERVE", "2000")
+    assert prompt_token_budget(TEMPLATE) == 6192
+    monkeypatch.setenv("PROMPT_TOKEN_BUDGET", "3000")
+    assert prompt_token_budget(TEMPLATE) == 3000
+    monkeypatch.setenv(f"PROMPT_TOKEN_BUDGET_{TEMPLATE}", "500")
+    assert prompt_token_budget(TEMPLATE) == 500
+
+
+def test_prompt_within_budget_is_rendered_unchanged(monkeypatch, trim_order):
+    monkeypatch.setenv("PROMPT_TOKEN_BUDGET", "1000")
+    observed = PROMPT_TOKENS.count(template=TEMPLATE)
+
+    values = {"campaign": "Spring", "notes": "short", "extra": "tiny"}
+    assert render_within_budget(TEMPLATE, PROMPT, values, suffix="\nDone") == PROMPT.format(**values) + "\nDone"
+    assert PROMPT_TOKENS.count(template=TEMPLATE) == observed + 1
+
+
+def test_lowest_priority_sections_are_trimmed_first(monkeypatch, trim_order):
+    monkeypatch.setenv("PROMPT_TOKEN_BUDGET", "150")
+    values = {"campaign": "Spring " * 20, "notes": "Ghi chú quan trọng. " * 20, "extra": "filler " * 100}
+    trimmed_extra = PROMPT_SECTIONS_TRIMMED.value(template=TEMPLATE, section="extra")
+
+    rendered = render_within_budget(TEMPLATE, PROMPT, values, other_messages=["Go."])
+
+    assert messages_tokens(rendered, "Go.") <= 150
+    assert values["campaign"] in rendered  # never trimmed
+    assert "Extra: \n" in rendered  # dropped entirely: nothing useful would fit
+    notes = rendered.split("Notes: ")[1].split("\n")[0]
+    assert notes.startswith("Ghi chú quan trọng.") and notes.endswith("…") and len(notes) < len(values["notes"])
+    assert PROMPT_SECTIONS_TRIMMED.value(template=TEMPLATE, section="extra") == trimmed_extra + 1
+
+
+def test_prompt_still_over_budget_is_counted(monkeypatch, trim_order):
+    monkeypatch.setenv("PROMPT_TOKEN_BUDGET", "20")
+    over = PROMPT_OVER_BUDGET.value(template=TEMPLATE)
+
+    rendered = render_within_budget(TEMPLATE, PROMPT, {"campaign": "x" * 400, "notes": "n" * 400, "extra": "e" * 400})
+
+    assert rendered == PROMPT.format(campaign="x" * 400, notes="", extra="")
+    assert PROMPT_OVER_BUDGET.value(template=TEMPLATE) == over + 1
+
+
+def test_truncate_to_tokens_respects_utf8_boundaries():
+    text = "Tiếng Việt có dấu " * 50
+    cut = truncate_to_tokens(text, 20)
+    assert cut.endswith("…") and len(cut.encode("utf-8")) <= 80
+    assert truncate_to_tokens("short", 20) == "short"
+
+
+@pytest.mark.asyncio
+async def test_master_generator_trims_persona_details_but_keeps_the_angle(monkeypatch):
+    monkeypatch.setenv("PROMPT_TOKEN_BUDGET_MASTER_CONTENT_GENERATOR_PROMPT", "900")
+    state = {
+        "context_data": {
+            "campaign": {"name": "Home Office Mornings", "goal": "Grow subscriptions"},
+            "brandIdentity": {"brand_name": "Lumen", "mission_statement": "Better mornings. " * 200},
+            "customerProfile": {"persona_name": "Rachel", "pain_points_and_challenges": ["afternoon crash"] * 100},
+        },
+        "angle_context": {"angle_name": "Morning ritual", "brief": "Show the first cup of the day."},
+        "language": "English",
+        "feedback": "",
+    }
+    mock_llm = AsyncMock()
+    mock_llm.ainvoke.return_value = AIMessage(content='{"core_message": "ok"}')
+
+    with patch("master_content_agent.nodes.llm", mock_llm):
+        await generator_node(state)
+
+    system, human = mock_llm.ainvoke.call_args.args[0]
+    assert messages_tokens(system.content, human.content) <= 900
+    assert "Better mornings. " * 200 not in system.content
+    assert "Home Office Mornings" in system.content and "- Angle Name: Morning ritual" in system.content
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from app.utils import sse
+from app.utils.sse import parse_sse_event, sse_event
+
+
+def _data(event):
+    return json.loads(event.split("data: ", 1)[1])
+
+
+@pytest.mark.parametrize("args,kwargs", [
+    (("chunk",), {"content": "Xin chào thế giới"}),
+    (("chunk",), {"content": "Hi", "agent": "Supervisor"}),
+    (("status",), {"status": "active", "agent": "Batch", "step": "Đang tạo..."}),
+    (("done",), {}),
+    (("done",), {"mastersCount": 1, "editorFlags": [{"type": "cta"}]}),
+    (("error",), {"error": 'quote " and \\ backslash\nnewline'}),
+])
+def test_sse_event_round_trips_payload(args, kwargs):
+    event = sse_event(*args, **kwargs)
+
+    assert event.startswith("data: ") and event.endswith("\n\n")
+    assert _data(event) == {"type": args[0], **kwargs}
+    assert parse_sse_event(event) == {"type": args[0], **kwargs}
+    assert parse_sse_event(str(event)) == {"type": args[0], **kwargs}
+
+
+def test_sse_event_writes_utf8_instead_of_escapes():
+    event = sse_event("chunk", content="Tiếng Việt")
+
+    assert "Tiếng Việt" in event
+    assert "\\u" not in event
+
+
+def test_sse_event_with_id():
+    event = sse_event("done", event_id="run-3")
+
+    assert event.startswith("id: run-3\ndata: ")
+    assert parse_sse_event(event) == {"type": "done"}
+
+
+def test_json_backends_produce_identical_events(monkeypatch):
+    if sse.orjson is None:
+        pytest.skip("orjson not installed")
+    payload = {"status": "active", "agent": "Bộ lọc", "n": 3, "flags": [1.5, None, True]}
+
+    monkeypatch.setattr(sse, "dumps", sse._select_dumps("orjson"))
+    monkeypatch.setattr(sse, "_envelopes", {})
+    fast = str(sse_event("status", **payload))
+    monkeypatch.setattr(sse, "dumps", sse._select_dumps("json"))
+    monkeypatch.setattr(sse, "_envelopes", {})
+    stdlib = str(sse_event("status", **payload))
+
+    assert fast == stdlib
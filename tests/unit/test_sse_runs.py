@@ -0,0 +1,143 @@
+import asyncio
+
+import pytest
+
+from app.utils.sse import parse_sse_event, sse_event
+from app.utils.sse_runs import RunRegistry, StreamRun, body_hash
+
+
+async def _collect(stream):
+    return [event async for event in stream]
+
+
+@pytest.mark.asyncio
+async def test_run_stamps_monotonic_event_ids():
+    async def events():
+        yield sse_event("chunk", content="a")
+        yield sse_event("done")
+
+    registry = RunRegistry()
+    run = registry.start(events())
+    received = await asyncio.wait_for(_collect(run.subscribe()), 1.0)
+
+    assert received[0].startswith(f"id: {run.id}-0\ndata: ")
+    assert received[1].startswith(f"id: {run.id}-1\ndata: ")
+    assert run.finished
+
+
+@pytest.mark.asyncio
+async def test_done_event_carries_the_run_trace_id():
+    async def events():
+        yield sse_event("chunk", content="a")
+        yield sse_event("done", result="ok")
+
+    registry = RunRegistry()
+    run = registry.start(events(), name="POST /chat")
+    received = await asyncio.wait_for(_collect(run.subscribe()), 1.0)
+
+    done = parse_sse_event(received[-1].split("\n", 1)[1])
+    assert done["type"] == "done" and done["result"] == "ok"
+    assert len(done["traceId"]) == 32
+    assert "traceId" not in parse_sse_event(received[0].split("\n", 1)[1])
+
+
+@pytest.mark.asyncio
+async def test_resume_replays_missed_events_then_follows_live_run(monkeypatch):
+    monkeypatch.setenv("SSE_COALESCE_WINDOW_MS", "0")
+    release = asyncio.Event()
+
+    async def events():
+        for i in range(3):
+            yield sse_event("chunk", content=str(i))
+        await release.wait()
+        yield sse_event("done")
+
+    registry = RunRegistry()
+    run = registry.start(events())
+    while run._next_seq < 3:
+        await asyncio.sleep(0.01)
+
+    resumed, last_seq = registry.resolve(f"{run.id}-0")
+    assert resumed is run and last_seq == 0
+
+    reader = asyncio.create_task(_collect(run.subscribe(after=last_seq)))
+    await asyncio.sleep(0.01)
+    release.set()
+    received = await asyncio.wait_for(reader, 1.0)
+
+    assert [e.split("\n")[0] for e in received] == [f"id: {run.id}-{i}" for i in (1, 2, 3)]
+
+
+def test_resolve_ignores_unknown_or_malformed_ids():
+    registry = RunRegistry()
+    assert registry.resolve(None) == (None, -1)
+    assert registry.resolve("garbage") == (None, -1)
+    assert registry.resolve("missing-3") == (None, -1)
+
+
+@pytest.mark.asyncio
+async def test_resolve_only_matches_the_request_that_started_the_run():
+    async def events():
+        yield sse_event("done")
+
+    registry = RunRegistry()
+    run = registry.start(events(), path="/chat", body_hash=body_hash({"message": "hi"}))
+    await asyncio.wait_for(run.task, 1.0)
+    last_id = f"{run.id}-0"
+
+    assert registry.resolve(last_id, path="/chat", body_hash=body_hash({"message": "hi"})) == (run, 0)
+    assert registry.resolve(last_id, path="/generate-worksheet", body_hash=body_hash({"message": "hi"})) == (None, -1)
+    assert registry.resolve(last_id, path="/chat", body_hash=body_hash({"message": "bye"})) == (None, -1)
+
+
+def test_replay_buffer_is_bounded():
+    run = StreamRun("r", buffer_size=2)
+    for i in range(5):
+        run.publish(sse_event("chunk", content=str(i)))
+
+    assert [seq for seq, _ in run._events_after(-1)] == [3, 4]
+
+
+@pytest.mark.asyncio
+async def test_unattended_run_is_cancelled_after_grace(monkeypatch):
+    monkeypatch.setenv("SSE_RESUME_GRACE_SECONDS", "0.05")
+    state = {"cancelled": False}
+
+    async def events():
+        yield sse_event("chunk", content="a")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+
+    registry = RunRegistry()
+    run = registry.start(events())
+    stream = run.subscribe()
+    await stream.__anext__()
+    await stream.aclose()
+
+    await asyncio.sleep(0.01)
+    assert state["cancelled"] is False  # still inside the grace window
+    await asyncio.sleep(0.1)
+    assert state["cancelled"] is True
+    assert run.finished
+
+
+@pytest.mark.asyncio
+async def test_finish_in_background_run_survives_without_readers(monkeypatch):
+    monkeypatch.setenv("SSE_RESUME_GRACE_SECONDS", "0")
+
+    async def events():
+        yield sse_event("chunk", content="a")
+        await asyncio.sleep(0.02)
+        yield sse_event("done")
+
+    registry = RunRegistry()
+    run = registry.start(events(), finish_in_background=True)
+    stream = run.subscribe()
+    await stream.__anext__()
+    await stream.aclose()
+
+    await asyncio.wait_for(run.task, 1.0)
+    assert run._next_seq == 2
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from app.utils.disconnect import HEARTBEAT_COMMENT, guard_disconnect
+from app.utils.sse import parse_sse_event, sse_event
+from app.utils.sse_writer import ChunkCoalescer, SSEStreamStats, sse_totals, tracked_stream
+
+
+class ConnectedRequest:
+    async def is_disconnected(self):
+        return False
+
+
+@pytest.mark.asyncio
+async def test_first_chunk_is_sent_immediately_and_burst_is_merged():
+    emitted = []
+    coalescer = ChunkCoalescer(emitted.append, window=0.05, max_chars=1000)
+
+    coalescer.push(sse_event("chunk", content="Hel"))
+    assert [parse_sse_event(e)["content"] for e in emitted] == ["Hel"]
+
+    coalescer.push(sse_event("chunk", content="lo"))
+    coalescer.push(sse_event("chunk", content=" world"))
+    assert len(emitted) == 1
+
+    await asyncio.sleep(0.1)
+    assert [parse_sse_event(e)["content"] for e in emitted] == ["Hel", "lo world"]
+
+
+@pytest.mark.asyncio
+async def test_other_events_flush_buffered_chunks_first():
+    emitted = []
+    coalescer = ChunkCoalescer(emitted.append, window=10, max_chars=1000)
+
+    coalescer.push(sse_event("chunk", content="a"))
+    coalescer.push(sse_event("chunk", content="b"))
+    coalescer.push(sse_event("chunk", content="c"))
+    coalescer.push(sse_event("done"))
+
+    assert [parse_sse_event(e) for e in emitted] == [
+        {"type": "chunk", "content": "a"},
+        {"type": "chunk", "content": "bc"},
+        {"type": "done"},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_buffer_flushes_at_max_chars_and_plain_strings_pass_through():
+    emitted = []
+    coalescer = ChunkCoalescer(emitted.append, window=10, max_chars=4)
+
+    coalescer.push(sse_event("chunk", content="x"))
+    coalescer.push(sse_event("chunk", content="ab"))
+    coalescer.push(sse_event("chunk", content="cd"))
+    assert parse_sse_event(emitted[-1])["content"] == "abcd"
+
+    coalescer.push("data: raw\n\n")
+    coalescer.push(sse_event("chunk", content="y", agent="Supervisor"))
+    coalescer.close()
+    assert emitted[-2] == "data: raw\n\n"
+    assert parse_sse_event(emitted[-1]) == {"type": "chunk", "content": "y", "agent": "Supervisor"}
+
+
+@pytest.mark.asyncio
+async def test_guard_disconnect_sends_heartbeat_while_idle():
+    async def slow():
+        await asyncio.sleep(0.12)
+        yield sse_event("done")
+
+    received = [e async for e in guard_disconnect(ConnectedRequest(), slow(), heartbeat=0.05)]
+
+    assert received.count(HEARTBEAT_COMMENT) >= 1
+    assert parse_sse_event(received[-1]) == {"type": "done"}
+
+
+@pytest.mark.asyncio
+async def test_tracked_stream_counts_events_and_bytes():
+    async def events():
+        yield "data: é\n\n"
+        yield "data: x\n\n"
+
+    before = dict(sse_totals)
+    received = [e async for e in tracked_stream(events(), label="test")]
+
+    assert received == ["data: é\n\n", "data: x\n\n"]
+    assert sse_totals["streams"] == before["streams"] + 1
+    assert sse_totals["events"] == before["events"] + 2
+    assert sse_totals["bytes"] == before["bytes"] + 19
+
+
+def test_stream_stats_summary():
+    stats = SSEStreamStats()
+    stats.record("data: {}\n\n")
+    summary = stats.summary()
+    assert summary["events"] == 1
+    assert summary["bytes"] == 10
+    assert summary["events_per_second"] > 0
@@ -0,0 +1,97 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import tool
+
+from app.services.chat import chat_event_generator
+from app.tools.mcp_bridge import get_record
+from app.utils.sse import parse_sse_event
+from marketing_team.tool_executor import ConcurrentToolExecutor
+
+
+def _calls(*calls):
+    return {"messages": [AIMessage(content="", tool_calls=[
+        {"name": name, "args": args, "id": f"call_{i}"} for i, (name, args) in enumerate(calls)
+    ])]}
+
+
+@pytest.mark.asyncio
+async def test_tool_calls_run_concurrently_up_to_the_cap():
+    state = {"running": 0, "peak": 0}
+
+    @tool
+    async def slow_lookup(key: str) -> str:
+        """Look up a key slowly."""
+        state["running"] += 1
+        state["peak"] = max(state["peak"], state["running"])
+        await asyncio.sleep(0.05)
+        state["running"] -= 1
+        return f"value of {key}"
+
+    executor = ConcurrentToolExecutor([slow_lookup], max_concurrency=2)
+    result = await executor.ainvoke(_calls(*[("slow_lookup", {"key": k}) for k in "abcd"]))
+
+    assert state["peak"] == 2
+    assert [m.content for m in result["messages"]] == [f"value of {k}" for k in "abcd"]
+    assert [m.tool_call_id for m in result["messages"]] == ["call_0", "call_1", "call_2", "call_3"]
+
+
+@pytest.mark.asyncio
+async def test_tool_errors_and_unknown_tools_become_error_messages():
+    @tool
+    async def broken(key: str) -> str:
+        """Always fails."""
+        raise RuntimeError("boom")
+
+    executor = ConcurrentToolExecutor([broken])
+    result = await executor.ainvoke(_calls(("broken", {"key": "a"}), ("missing", {})))
+
+    failed, unknown = result["messages"]
+    assert isinstance(failed, ToolMessage) and failed.status == "error" and "boom" in failed.content
+    assert unknown.status == "error" and "missing is not a valid tool" in unknown.content
+
+
+@pytest.mark.asyncio
+async def test_mcp_calls_in_one_step_share_a_session():
+    session = MagicMock()
+    session.call_tool = AsyncMock(side_effect=lambda name, args: MagicMock(content=[MagicMock(text=args["record_id"])]))
+    opened = []
+
+    @asynccontextmanager
+    async def fake_open():
+        opened.append(session)
+        yield session
+
+    with patch("app.tools.mcp_bridge.open_mcp_session", fake_open):
+        executor = ConcurrentToolExecutor([get_record])
+        result = await executor.ainvoke(_calls(
+            ("get_record", {"collection": "posts", "record_id": "r1"}),
+            ("get_record", {"collection": "posts", "record_id": "r2"}),
+        ))
+
+    assert len(opened) == 1
+    assert session.call_tool.await_count == 2
+    assert [m.content for m in result["messages"]] == ["r1", "r2"]
+
+
+@pytest.mark.asyncio
+async def test_chat_tool_end_events_report_duration():
+    async def fake_events(*args, **kwargs):
+        yield {"event": "on_tool_start", "name": "get_record", "run_id": "a", "data": {"input": {}}}
+        yield {"event": "on_tool_start", "name": "get_record", "run_id": "b", "data": {"input": {}}}
+        await asyncio.sleep(0.02)
+        yield {"event": "on_tool_end", "name": "get_record", "run_id": "b", "data": {"output": "x"}}
+        yield {"event": "on_tool_end", "name": "get_record", "run_id": "a", "data": {"output": "y"}}
+
+    graph = MagicMock()
+    graph.astream_events = fake_events
+    graph.aget_state = AsyncMock(return_value=None)
+    with patch("app.services.chat.app_graph", graph):
+        events = [parse_sse_event(e) async for e in chat_event_generator("hi", "t1")]
+
+    tool_ends = [e for e in events if e["type"] == "tool_end"]
+    assert [e["output"] for e in tool_ends] == ["x", "y"]
+    assert all(e["durationMs"] >= 15 for e in tool_ends)
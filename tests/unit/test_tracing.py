@@ -0,0 +1,177 @@
+import json
+import uuid
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+from langchain_core.tools import tool
+
+from app.core import tracing
+from app.core.tracing import (
+    JsonlSpanExporter,
+    OtlpHttpSpanExporter,
+    SpanExporter,
+    TracingCallbackHandler,
+    span,
+    stamp_trace_id,
+    start_span,
+)
+from app.utils.sse import parse_sse_event, sse_event
+
+
+class MemoryExporter(SpanExporter):
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+
+@pytest.fixture
+def exported():
+    exporter = MemoryExporter()
+    previous = tracing._processor.exporter
+    tracing._processor.configure(exporter)
+
+    def collect():
+        tracing.flush_spans()
+        return {s["name"]: s for s in exporter.spans}
+
+    yield collect
+    tracing._processor.configure(previous)
+
+
+def test_nested_spans_share_trace_and_link_parents(exported):
+    with span("request", path="/chat") as root:
+        with span("child") as child:
+            assert tracing.current_trace_id() == root.trace_id
+        assert child.parent_id == root.span_id
+    spans = exported()
+    assert spans["child"]["traceId"] == spans["request"]["traceId"]
+    assert spans["child"]["parentSpanId"] == spans["request"]["spanId"]
+    assert spans["request"]["parentSpanId"] is None
+    assert spans["request"]["attributes"] == {"path": "/chat"}
+    assert spans["request"]["durationMs"] >= 0
+
+
+def test_span_records_error_status(exported):
+    with pytest.raises(ValueError):
+        with span("failing"):
+            raise ValueError("boom")
+    failing = exported()["failing"]
+    assert failing["status"] == "error"
+    assert "boom" in failing["attributes"]["error"]
+
+
+def test_tracing_disabled_opens_no_span(monkeypatch):
+    monkeypatch.setenv("TRACING_ENABLED", "0")
+    assert start_span("anything") is None
+    with span("anything") as opened:
+        assert opened is None
+
+
+def test_stamp_trace_id_only_touches_done_events():
+    done = sse_event("done", result={"ok": True})
+    chunk = sse_event("chunk", content="hi")
+    assert stamp_trace_id(done) is done  # no active span
+    with span("request") as root:
+        stamped = stamp_trace_id(done)
+        assert stamp_trace_id(chunk) is chunk
+        assert stamp_trace_id("data: plain\n\n") == "data: plain\n\n"
+    assert parse_sse_event(stamped) == {"type": "done", "traceId": root.trace_id, "result": {"ok": True}}
+
+
+def test_callback_handler_builds_graph_node_llm_tree(exported):
+    handler = TracingCallbackHandler()
+    graph, node, llm = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    message = AIMessage(content="hi", usage_metadata={"input_tokens": 12, "output_tokens": 30, "total_tokens": 42})
+    with span("request") as root:
+        handler.on_chain_start({}, {}, run_id=graph, name="marketing_team")
+        handler.on_chain_start({}, {}, run_id=node, parent_run_id=graph, name="Researcher",
+                               metadata={"langgraph_node": "Researcher"})
+        handler.on_chat_model_start({}, [], run_id=llm, parent_run_id=node,
+                                    metadata={"ls_model_name": "qwen", "langgraph_node": "Researcher"})
+        handler.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]), run_id=llm)
+        handler.on_chain_end({}, run_id=node)
+        handler.on_chain_end({}, run_id=graph)
+
+    spans = exported()
+    assert spans["graph marketing_team"]["parentSpanId"] == root.span_id
+    assert spans["node Researcher"]["parentSpanId"] == spans["graph marketing_team"]["spanId"]
+    llm_span = spans["llm qwen"]
+    assert llm_span["parentSpanId"] == spans["node Researcher"]["spanId"]
+    assert llm_span["attributes"]["input_tokens"] == 12
+    assert llm_span["attributes"]["output_tokens"] == 30
+    assert llm_span["attributes"]["tokens_per_second"] > 0
+    assert {s["traceId"] for s in spans.values()} == {root.trace_id}
+
+
+@pytest.mark.asyncio
+async def test_mcp_span_is_parented_to_the_calling_tool(exported):
+    # Reuse the process-wide handler if app.main already installed one, so only one tool span exists.
+    handler = tracing._handler or TracingCallbackHandler()
+
+    @tool
+    async def lookup(record_id: str) -> str:
+        """Look up a record."""
+        opened = start_span("mcp get_record", kind="client")
+        opened.end()
+        return record_id
+
+    with patch.object(tracing, "_handler", handler):
+        with span("request"):
+            await lookup.ainvoke({"record_id": "1"}, {"callbacks": [handler]})
+
+    spans = exported()
+    assert spans["mcp get_record"]["parentSpanId"] == spans["tool lookup"]["spanId"]
+    assert spans["tool lookup"]["parentSpanId"] == spans["request"]["spanId"]
+
+
+def test_jsonl_exporter_appends_one_line_per_span(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    exporter = JsonlSpanExporter(str(path))
+    exporter.export([{"name": "a"}])
+    exporter.export([{"name": "b"}, {"name": "c"}])
+    assert [json.loads(line)["name"] for line in path.read_text().splitlines()] == ["a", "b", "c"]
+
+
+def test_jsonl_exporter_rotates_past_max_bytes(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    exporter = JsonlSpanExporter(str(path), max_bytes=30)
+    for name in ("a", "b", "c"):
+        exporter.export([{"name": name, "pad": "x" * 10}])
+    assert [json.loads(line)["name"] for line in path.read_text().splitlines()] == ["c"]
+    assert [json.loads(line)["name"] for line in (tmp_path / "traces.jsonl.1").read_text().splitlines()] == ["b"]
+
+
+def test_default_config_exports_nothing(monkeypatch, tmp_path):
+    monkeypatch.delenv("TRACE_EXPORTER", raising=False)
+    monkeypatch.setenv("TRACE_JSONL_PATH", str(tmp_path / "traces.jsonl"))
+    previous = tracing._processor.exporter
+    tracing._processor.configure(tracing.create_exporter())
+    try:
+        with span("request") as root:
+            assert root is not None  # still traced, for the done event's traceId
+        tracing.flush_spans()
+    finally:
+        tracing._processor.configure(previous)
+    assert tracing.create_exporter() is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_otlp_exporter_posts_resource_spans():
+    opened = start_span("request", kind="server", path="/chat", events=3)
+    opened.end_ns = opened.start_ns + 1000
+    exporter = OtlpHttpSpanExporter("http://collector:4318/v1/traces")
+    with patch("app.core.tracing.urllib.request.urlopen", MagicMock()) as urlopen:
+        exporter.export([opened.to_dict()])
+
+    request = urlopen.call_args.args[0]
+    assert request.full_url == "http://collector:4318/v1/traces"
+    body = json.loads(request.data)
+    otlp_span = body["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert otlp_span["traceId"] == opened.trace_id
+    assert otlp_span["kind"] == 2
+    assert "parentSpanId" not in otlp_span
+    assert {"key": "events", "value": {"intValue": "3"}} in otlp_span["attributes"]
@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import warmup as warmup_module
+from app.core.warmup import Warmup, warmup_steps
+from app.main import app
+from benchmarks.fakes import fake_backends
+
+
+@pytest.mark.asyncio
+async def test_failed_steps_are_retried_until_ready(monkeypatch):
+    monkeypatch.setenv("WARMUP_RETRY_SECONDS", "0")
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("ollama not up yet")
+
+    async def fine():
+        pass
+
+    warmup = Warmup()
+    warmup.start({"ollama": flaky, "graphs": fine})
+    assert warmup.status == "warming"
+    await asyncio.wait_for(warmup._task, timeout=2)
+
+    assert warmup.ready and len(attempts) == 3
+    assert warmup.checks["ollama"]["ok"] and warmup.checks["graphs"]["ok"]
+
+
+@pytest.mark.asyncio
+async def test_disabled_warmup_is_ready_immediately(monkeypatch):
+    monkeypatch.delenv("WARMUP_ON_STARTUP", raising=False)
+    warmup = Warmup()
+    warmup.start()
+    assert warmup.ready and warmup._task is None
+
+
+@pytest.mark.asyncio
+async def test_warmup_steps_pass_against_fake_backends(monkeypatch):
+    monkeypatch.setenv("WARMUP_OLLAMA_MODELS", "model-a,model-b")
+    with fake_backends(tokens_per_sec=0, ttft="0") as fakes:
+        steps = warmup_steps()
+        assert sorted(steps) == sorted(["graphs", "mcp", f"ollama {fakes.ollama.url} model-a",
+                                        f"ollama {fakes.ollama.url} model-b"])
+        # Building the graphs here would bind the process-wide LLM clients to the fake's URL.
+        steps.pop("graphs")
+        warmup = Warmup()
+        warmup.start(steps)
+        await asyncio.wait_for(warmup._task, timeout=30)
+
+        assert warmup.ready, warmup.checks
+        assert fakes.llm_requests == 2
+
+
+def test_ready_endpoint_gates_on_warmup(monkeypatch):
+    client = TestClient(app)
+    monkeypatch.setattr(warmup_module.warmup, "status", "warming")
+    response = client.get("/ready")
+    assert response.status_code == 503 and response.json()["status"] == "warming"
+
+    monkeypatch.setattr(warmup_module.warmup, "status", "ready")
+    assert client.get("/ready").status_code == 200
+    assert client.get("/health").json() == {"status": "ok"}
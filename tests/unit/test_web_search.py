@@ -0,0 +1,96 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from app.tools.web_search import (
+    OfflineSearchBackend,
+    SearchBackend,
+    SearchCache,
+    cached_search,
+    normalize_query,
+    search_tool,
+)
+
+
+def test_normalize_query():
+    assert normalize_query("  Coffee   Trends\tVietnam ") == "coffee trends vietnam"
+    assert normalize_query("Cà phê") == normalize_query("Cà phê")
+
+
+@pytest.mark.asyncio
+async def test_repeated_query_is_served_from_cache(tmp_path):
+    backend = OfflineSearchBackend({"coffee trends": "Cold brew is growing."})
+    cache = SearchCache(str(tmp_path), ttl=60)
+
+    first = await cached_search("Coffee trends", backend, cache)
+    second = await cached_search("  coffee   TRENDS ", backend, cache)
+
+    assert first == second == "Cold brew is growing."
+    assert backend.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_are_refetched(tmp_path):
+    backend = OfflineSearchBackend()
+    cache = SearchCache(str(tmp_path), ttl=60)
+    await cached_search("tea", backend, cache)
+
+    path = cache._path(backend.name, "tea")
+    entry = json.loads(path.read_text())
+    entry["created"] = time.time() - 120
+    path.write_text(json.dumps(entry))
+    await cached_search("tea", backend, cache)
+
+    assert backend.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_is_keyed_per_backend_and_can_be_disabled(tmp_path):
+    cache = SearchCache(str(tmp_path), ttl=60)
+    cache.set("offline", "q", "offline answer")
+    assert cache.get("duckduckgo", "q") is None
+
+    disabled = SearchCache(str(tmp_path / "off"), ttl=0)
+    disabled.set("offline", "q", "x")
+    assert disabled.get("offline", "q") is None
+    assert not (tmp_path / "off").exists()
+
+
+def test_backend_without_search_fails_at_construction():
+    class Incomplete(SearchBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_concurrent_writers_of_one_key_leave_a_whole_entry(tmp_path):
+    cache = SearchCache(str(tmp_path), ttl=60)
+
+    def write(n):
+        for i in range(20):
+            cache.set("offline", "q", f"writer {n} #{i} " + "x" * 2000)
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert os.listdir(tmp_path) == [cache._path("offline", "q").name]
+    assert cache.get("offline", "q").endswith("x" * 2000)
+
+
+@pytest.mark.asyncio
+async def test_search_tool_uses_configured_backend(tmp_path, monkeypatch):
+    monkeypatch.setenv("SEARCH_BACKEND", "offline")
+    monkeypatch.setenv("SEARCH_CACHE_DIR", str(tmp_path))
+
+    result = await search_tool.ainvoke({"query": "Tết marketing"})
+
+    assert search_tool.name == "duckduckgo_search"
+    assert "tết marketing" in result
+    assert len(os.listdir(tmp_path)) == 1
@@ -71,4 +71,4 @@ workflow.add_conditional_edges(
 
 # 4. Compile the graph
 memory = MemorySaver()
-variant_generator_graph = workflow.compile(checkpointer=memory)
+variant_generator_graph = workflow.compile(checkpointer=memory, name="variant_generator")
@@ -5,17 +5,19 @@ from datetime import datetime
 
 from langchain_core.messages import HumanMessage, SystemMessage
 
-from app.core.llm_factory import get_ollama_llm
+from app.core.llm_factory import lazy_ollama_llm
 from app.tools.mcp_bridge import execute_mcp_tool, parse_mcp_result
 from app.services.context_fetcher import fetch_campaign_context
 from app.utils.llm import parse_json_response
+from app.utils.projection import project_context
+from app.utils.prompt_budget import render_within_budget
 from app.prompts import PLATFORM_VARIANT_GENERATOR_PROMPT, PLATFORM_GUIDELINES
 
 from .state import VariantGeneratorState
 
 logger = logging.getLogger(__name__)
 
-llm = get_ollama_llm(temperature=0.7)
+llm = lazy_ollama_llm(temperature=0.7)
 
 async def retriever_node(state: VariantGeneratorState) -> Dict[str, Any]:
     """
@@ -60,7 +62,7 @@ async def retriever_node(state: VariantGeneratorState) -> Dict[str, Any]:
         context["_errors"] = errors
 
     return {
-        "context_data": context,
+        "context_data": project_context(context, "PLATFORM_VARIANT_GENERATOR_PROMPT"),
         "current_platform_index": 0,
         "generated_variants": [],
     }
@@ -114,7 +116,7 @@ async def generator_node(state: VariantGeneratorState) -> Dict[str, Any]:
             return ", ".join(str(v) for v in val)
         return str(val) if val else ""
 
-    prompt_text = PLATFORM_VARIANT_GENERATOR_PROMPT.format(
+    values = dict(
         platform=platform.capitalize(),
         core_message=core_message,
         extended_message=extended_message,
@@ -129,12 +131,18 @@ async def generator_node(state: VariantGeneratorState) -> Dict[str, Any]:
         content_format=content_format,
     )
 
+    suffix = ""
     if feedback and "RETRY" in feedback.upper():
-        prompt_text += f"\n\n**Previous feedback (please address this):** {feedback}"
+        suffix = f"\n\n**Previous feedback (please address this):** {feedback}"
+
+    instruction = f"Generate the {platform} variant now."
+    prompt_text = render_within_budget(
+        "PLATFORM_VARIANT_GENERATOR_PROMPT", PLATFORM_VARIANT_GENERATOR_PROMPT, values, suffix, [instruction]
+    )
 
     response = await llm.ainvoke([
         SystemMessage(content=prompt_text),
-        HumanMessage(content=f"Generate the {platform} variant now."),
+        HumanMessage(content=instruction),
     ])
 
     try: